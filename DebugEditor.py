@@ -25,30 +25,18 @@ import maya.cmds as cmds
 def editor() -> None:
     if cmds.workspaceControl("NCCA_Script_EditorWorkspaceControl", exists=True):
         cmds.deleteUI("NCCA_Script_EditorWorkspaceControl", control=True)
-    # if you add a new module to the project add it here
-    modules = (
-        "MayaEditorCore.EditorDialog",
-        "MayaEditorCore",
-        "MayaEditorCore.PythonTextEdit",
-        "MayaEditorCore.PythonHighlighter",
-        "MayaEditorCore.MelHighlighter",
-        "MayaEditorCore.Workspace",
-        "MayaEditorCore.EditorToolBar",
-        "MayaEditorCore.OutputToolBar",
-        "MayaEditorCore.TextEdit",
-        "MayaEditorCore.LineNumberArea",
-        "MayaEditorCore.MelTextEdit",
-        "MayaEditorCore.SidebarModels",
-        "MayaEditorCore.FindDialog",
-        "MayaEditorCore.EditorIcons",
-    )
     # query the MayaEditor module file for location of source
     root_path = cmds.moduleInfo(path=True, moduleName="MayaEditor")
     # add this to our python path to we can access the modules
     sys.path.insert(0, root_path + "/plug-ins")
     # if the module is already loaded remove the modules then reload
     if "MayaEditorCore.EditorDialog" in sys.modules.keys():
-        for module in modules:
+        # every module in the package is removed so new modules don't need listing here
+        for module in [
+            name
+            for name in sys.modules
+            if name == "MayaEditorCore" or name.startswith("MayaEditorCore.")
+        ]:
             del sys.modules[module]
         print("deleting and reloading module")
     import MayaEditorCore
@@ -1,4 +1,13 @@
 #!/Applications/Autodesk/maya2024/Maya.app/Contents/bin/mayapy
+"""Run the editor outside of Maya using maya.standalone.
+
+With --headless no window is created, the files / workspaces given are run in order
+and a json report of the timing, output and profile of each is written, for example
+
+mayapy EditorStandalone.py --headless build_rig.py tools.json --mode profile --output report.json
+"""
+import argparse
+import json
 import os
 import sys
 from contextlib import redirect_stdout
@@ -16,9 +25,16 @@ from PySide2.QtWidgets import *
 
 
 class OutputWrapper(QObject):
+    """Redirect stdout / stderr to the editor output window.
+
+    Writes can come from any thread and are often a single character, so text is collected in a
+    LineBuffer and only complete lines are queued. A timer on the GUI thread then flushes everything
+    queued as one signal rather than one signal (and one html insert) per write.
+    """
+
     output_write = Signal(object, object)
 
-    def __init__(self, parent, stdout=True):
+    def __init__(self, parent, stdout=True, interval=50):
         super().__init__(parent)
         if stdout:
             self._stream = sys.stdout
@@ -27,9 +43,29 @@ class OutputWrapper(QObject):
             self._stream = sys.stderr
             sys.stderr = self
         self._stdout = stdout
+        self._buffer = LineBuffer()
+        # timer is created on the GUI thread so timeout is always processed there
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.flush_to_output)
+        self._timer.start(interval)
 
     def write(self, text):
-        self.output_write.emit(text, self._stdout)
+        self._buffer.write(text)
+        return len(text)
+
+    def flush(self):
+        """Queue any partial line, the timer will send it to the output."""
+        self._buffer.flush()
+
+    def isatty(self):
+        return False
+
+    @Slot()
+    def flush_to_output(self):
+        """Send everything queued as a single batch, called on the GUI thread."""
+        text = self._buffer.take()
+        if text:
+            self.output_write.emit(text, self._stdout)
 
 
 class MainWindow(QMainWindow):
@@ -125,7 +161,12 @@ class MainWindow(QMainWindow):
         return filename
 
     def write_output(self, text, stdout):
-        self.editor.output_window.append_html(text)
+        if stdout:
+            self.editor.output_window.append_plain_text(text)
+        else:
+            self.editor.output_window.append_message(
+                text, OpenMaya.MCommandMessage.kError
+            )
 
     def save(self) -> None:
         if self.scene_format.currentIndex() == 0:
@@ -144,7 +185,80 @@ class MainWindow(QMainWindow):
         return super().resizeEvent(event)
 
 
+def load_run_modes():
+    """Load MayaEditorCore/RunModes.py on its own so --mode is checked before Maya is initialized.
+
+    Importing anything from the MayaEditorCore package imports the editor, which needs Maya.
+    """
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "plug-ins",
+        "MayaEditorCore",
+        "RunModes.py",
+    )
+    spec = importlib.util.spec_from_file_location("RunModes", path)
+    run_modes = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(run_modes)
+    return run_modes
+
+
+headless_modes = load_run_modes().run_modes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="NCCA Maya Editor standalone")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run the files without the UI and write a json report",
+    )
+    parser.add_argument("files", nargs="*", help="python / mel files or workspaces")
+    parser.add_argument(
+        "--mode",
+        default="normal",
+        choices=headless_modes,
+        help="run mode for --headless",
+    )
+    parser.add_argument("--scene", help="scene to open before running")
+    parser.add_argument("--output", help="json report file, default stdout")
+    parser.add_argument(
+        "--stop-on-error",
+        action="store_true",
+        help="don't run the remaining files once one fails",
+    )
+    return parser.parse_args()
+
+
+def run_headless(args) -> int:
+    """Run the files with maya.standalone and no Qt window, returns the exit code."""
+    # keep stdout for the report, anything Maya or the scripts print goes to stderr
+    report_stream = sys.stdout
+    sys.stdout = sys.stderr
+    maya.standalone.initialize(name="python")
+    try:
+        import maya.cmds as cmds
+
+        root_path = cmds.moduleInfo(path=True, moduleName="MayaEditor")
+        if root_path:
+            sys.path.insert(0, root_path + "/plug-ins")
+        from MayaEditorCore.HeadlessRunner import run_files
+
+        report = run_files(args.files, args.mode, args.scene, args.stop_on_error)
+        if args.output:
+            with open(args.output, "w") as report_file:
+                json.dump(report, report_file, indent=4)
+        else:
+            json.dump(report, report_stream, indent=4)
+            report_stream.write("\n")
+    finally:
+        maya.standalone.uninitialize()
+    return 1 if report["errors"] else 0
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.headless:
+        sys.exit(run_headless(args))
 
     QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
@@ -153,6 +267,7 @@ if __name__ == "__main__":
 
     # I know all imports should be at the top but this needs to be done after
     # Maya is initialize else you just get stubs that don't work.
+    import maya.api.OpenMaya as OpenMaya
     import maya.cmds as cmds
     import maya.OpenMayaUI as omui
     from shiboken2 import wrapInstance  # type: ignore
@@ -163,6 +278,7 @@ if __name__ == "__main__":
     sys.path.insert(0, root_path + "/plug-ins")
     # Again a late import but relies on Maya so needs to be done here.
     import MayaEditorCore
+    from MayaEditorCore.LineBuffer import LineBuffer
 
     # Now construct our main window. This will stand in for the Maya Main window
     window = MainWindow()
@@ -0,0 +1,89 @@
+#!/Applications/Autodesk/maya2024/Maya.app/Contents/bin/mayapy
+"""Benchmark the output window message paths.
+
+Compares the old html path (message_callback building html and append_html wrapping it again) with
+the cached QTextCharFormat path used by append_message. Run with mayapy from the root of the project
+
+mayapy OutputBenchmark.py --count 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd() + "/plug-ins/")
+
+import maya.standalone
+from PySide2.QtCore import *
+from PySide2.QtWidgets import *
+
+colours = {
+    "kHistory": ("lightblue", "History : "),
+    "kDisplay": ("yellow", ""),
+    "kInfo": ("white", "Info : "),
+    "kWarning": ("green", "Warning : "),
+    "kError": ("red", "Error : "),
+    "kResult": ("lightblue", "Result :"),
+}
+
+
+def html_path(output, messages) -> None:
+    """This is the same html the message_callback used to generate."""
+    for message, mtype in messages:
+        colour, message_prefix = html_colours[mtype]
+        html = f'<p style="color:{colour}"><pre>{message_prefix}{message}</pre></p>'
+        output.append_html(html)
+
+
+def format_path(output, messages) -> None:
+    for message, mtype in messages:
+        output.append_message(message, mtype)
+
+
+def run_benchmark(name, function, output, messages) -> float:
+    output.clear()
+    start = time.perf_counter()
+    function(output, messages)
+    # make sure layout is done so both paths pay for it
+    QApplication.processEvents()
+    elapsed = time.perf_counter() - start
+    rate = len(messages) / elapsed
+    print(
+        f"{name:<16} {len(messages)} messages in {elapsed:.3f}s {rate:,.0f} messages/s"
+    )
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark output window message paths"
+    )
+    parser.add_argument(
+        "--count", "-c", type=int, default=10000, help="number of messages"
+    )
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    maya.standalone.initialize(name="python")
+    import maya.api.OpenMaya as OpenMaya
+
+    # late import as the module needs maya to be initialized
+    from MayaEditorCore.TextEdit import TextEdit
+
+    html_colours = {
+        getattr(OpenMaya.MCommandMessage, name): value
+        for name, value in colours.items()
+    }
+    types = list(html_colours.keys())
+    messages = [
+        (
+            f"Cycle on 'pCube{i % 7}.translate' may not evaluate as expected.\n",
+            types[i % len(types)],
+        )
+        for i in range(args.count)
+    ]
+    output = TextEdit(read_only=True, show_line_numbers=False)
+    html_rate = run_benchmark("append_html", html_path, output, messages)
+    format_rate = run_benchmark("append_message", format_path, output, messages)
+    print(f"speedup {format_rate / html_rate:.1f}x")
+    maya.standalone.uninitialize()
@@ -0,0 +1,251 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Run editor code on a worker thread so Maya's UI stays responsive.
+
+Maya is not thread safe so while a background run is active every maya.cmds command (and
+maya.mel.eval) is replaced with a proxy which marshals the call to the main thread with
+utils.executeInMainThreadWithResult. OpenMaya objects can't be proxied method by method so
+scripts wrap that code with the main_thread decorator, or queue several calls in a
+main_thread_batch, which are both added to the script namespace along with report_progress.
+
+The Stop button raises KeyboardInterrupt in the worker at the next bytecode boundary.
+"""
+import __main__
+import ctypes
+import functools
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+import maya.cmds as cmds
+import maya.mel as mel
+from maya import utils
+from PySide2.QtCore import QObject, QTimer, Signal, Slot
+
+from .CodeRunner import code_cache
+from .ExecutionTimer import ExecutionTimer, execution_record
+from .OutputCapture import BufferedOutputStream
+
+
+def in_main_thread(function: Callable, *args, **kwargs) -> Any:
+    """Call function on the main thread (directly if we are already on it)."""
+    if threading.current_thread() is threading.main_thread():
+        return function(*args, **kwargs)
+    return utils.executeInMainThreadWithResult(function, *args, **kwargs)
+
+
+def main_thread(function: Callable) -> Callable:
+    """Decorator to run the whole function on the main thread, use for OpenMaya code."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return in_main_thread(function, *args, **kwargs)
+
+    return wrapper
+
+
+class main_thread_batch:
+    """Queue calls and run them all in one trip to the main thread when the block exits.
+
+    with main_thread_batch() as batch:
+        for i in range(1000):
+            batch.call(cmds.setAttr, "pCube1.tx", i)
+    print(batch.results)
+    """
+
+    def __init__(self):
+        self.calls: List = []
+        self.results: List[Any] = []
+
+    def call(self, function: Callable, *args, **kwargs) -> None:
+        self.calls.append((function, args, kwargs))
+
+    def _run_all(self) -> List[Any]:
+        return [function(*args, **kwargs) for function, args, kwargs in self.calls]
+
+    def __enter__(self) -> "main_thread_batch":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None and self.calls:
+            self.results = in_main_thread(self._run_all)
+        return False
+
+
+class BackgroundRunner(QObject):
+    """Runs one script at a time on a worker thread."""
+
+    started = Signal()
+    # percent done, or -1 if the script hasn't reported any progress
+    progress = Signal(int)
+    finished = Signal(object)
+    stdout = Signal(str)
+    stderr = Signal(str)
+
+    # names added to __main__ for the script, removed again when the run ends
+    script_names = ("report_progress", "main_thread", "main_thread_batch")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thread: Optional[threading.Thread] = None
+        self._originals: Dict[str, Callable] = {}
+        self._old_streams = (sys.stdout, sys.stderr)
+        # values the script_names had in __main__ before the run
+        self._old_names: Dict[str, Any] = {}
+        self._result: Any = None
+        # only interrupt the worker while it is running the script, see stop
+        self._lock = threading.Lock()
+        self._evaluating = False
+        self._interrupted = False
+        # worker output is flushed to the output window on the GUI thread by this timer,
+        # which also finishes the run once the worker thread has exited
+        self._stdout = BufferedOutputStream(self.stdout.emit, process_events=False)
+        self._stderr = BufferedOutputStream(self.stderr.emit, process_events=False)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self.poll)
+
+    def is_running(self) -> bool:
+        """True until cleanup has run on the GUI thread, not just until the worker exits."""
+        return self.thread is not None
+
+    def run(
+        self,
+        source: str,
+        filename: str,
+        first_line: int = 1,
+        on_finish: Optional[Callable[[execution_record], None]] = None,
+    ) -> bool:
+        """Start running the source on the worker thread.
+
+        Parameters :
+        source (str) : the code to run
+        filename (str) : the editor filename used to compile the code
+        first_line (int) : the editor line the source starts at
+        on_finish (callable) : passed to the ExecutionTimer for the timing footer
+        Returns : False if a script is already running
+        """
+        if self.is_running():
+            return False
+        code = code_cache.get(source, filename, first_line)
+        namespace = __main__.__dict__
+        self._old_names = {
+            name: namespace[name] for name in self.script_names if name in namespace
+        }
+        namespace["report_progress"] = self.report_progress
+        namespace["main_thread"] = main_thread
+        namespace["main_thread_batch"] = main_thread_batch
+        self._marshal_commands()
+        self._old_streams = (sys.stdout, sys.stderr)
+        sys.stdout, sys.stderr = self._stdout, self._stderr
+        self._result = None
+        self._interrupted = False
+        self._poll_timer.start(100)
+        timer = ExecutionTimer(filename, "python", source, on_finish, "background")
+        self.thread = threading.Thread(
+            target=self._worker, args=(code, namespace, timer), daemon=True
+        )
+        self.started.emit()
+        self.progress.emit(-1)
+        self.thread.start()
+        return True
+
+    def _worker(self, code, namespace, timer: ExecutionTimer) -> None:
+        # everything is restored by poll on the GUI thread once this thread exits, so an
+        # interrupt landing anywhere in here can't leave maya.cmds or the streams replaced
+        try:
+            with timer:
+                try:
+                    with self._lock:
+                        self._evaluating = True
+                    self._result = eval(code, namespace)
+                finally:
+                    self._end_evaluation()
+                timer.set_result(self._result)
+        except KeyboardInterrupt:
+            sys.stderr.write("Background run stopped\n")
+        except Exception:
+            traceback.print_exc()
+
+    def _end_evaluation(self) -> None:
+        with self._lock:
+            self._evaluating = False
+            if self._interrupted:
+                # cancel an interrupt sent as the script finished but not yet delivered
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(threading.get_ident()), None
+                )
+
+    @Slot()
+    def poll(self) -> None:
+        """Send the worker output and finish the run once the worker has exited."""
+        if self.thread is not None and not self.thread.is_alive():
+            self.cleanup()
+            self.finished.emit(self._result)
+        else:
+            self.flush_output()
+
+    def cleanup(self) -> None:
+        """Restore maya.cmds, the streams and __main__, called on the GUI thread."""
+        self._poll_timer.stop()
+        sys.stdout, sys.stderr = self._old_streams
+        self._restore_commands()
+        namespace = __main__.__dict__
+        for name in self.script_names:
+            namespace.pop(name, None)
+        namespace.update(self._old_names)
+        self._old_names = {}
+        self._stdout.flush()
+        self._stderr.flush()
+        self.flush_output()
+        self.thread = None
+
+    def stop(self) -> None:
+        """Raise KeyboardInterrupt in the worker at the next bytecode boundary.
+
+        Only done while the script is being evaluated, not while the worker is setting up or
+        reporting the result.
+        """
+        with self._lock:
+            if self.thread is None or not self._evaluating or self._interrupted:
+                return
+            self._interrupted = True
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(self.thread.ident), ctypes.py_object(KeyboardInterrupt)
+            )
+
+    def report_progress(self, percent: int) -> None:
+        """Called by the script (from the worker) to update the progress bar."""
+        self.progress.emit(int(percent))
+
+    @Slot()
+    def flush_output(self) -> None:
+        self._stdout.send_lines()
+        self._stderr.send_lines()
+
+    def _marshal_commands(self) -> None:
+        """Replace maya.cmds commands and mel.eval with main thread proxies."""
+        for name, function in list(vars(cmds).items()):
+            if callable(function) and not name.startswith("_"):
+                self._originals[name] = function
+                setattr(cmds, name, main_thread(function))
+        self._originals["mel.eval"] = mel.eval
+        mel.eval = main_thread(mel.eval)
+
+    def _restore_commands(self) -> None:
+        mel.eval = self._originals.pop("mel.eval", mel.eval)
+        for name, function in self._originals.items():
+            setattr(cmds, name, function)
+        self._originals.clear()
@@ -0,0 +1,298 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Batch scene runner.
+
+Runs the script from an editor tab over lots of .ma / .mb files using a WorkerPool of mayapy
+processes, each job opens the scene with cmds.file(open=True) then runs the script. Every finished
+job is appended to a json lines journal so if Maya (or the batch) crashes the run can be resumed
+and only the scenes not yet done successfully are run again. Entries record the hash of the script
+so running a different script over the same scenes doesn't skip them.
+"""
+import glob
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+from PySide2.QtWidgets import *
+
+from .ExecutionTimer import source_hash
+from .PythonTextEdit import PythonTextEdit
+from .WorkerPool import WorkerPool
+
+
+class BatchJournal:
+    """Append only json lines record of finished batch jobs."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._needs_newline = False
+
+    def load(self) -> Dict[Tuple[str, str], dict]:
+        """Load the journal returning the last entry for each scene and script source hash."""
+        entries: Dict[Tuple[str, str], dict] = {}
+        if not Path(self.filename).is_file():
+            return entries
+        with open(self.filename, "r") as journal:
+            for line in journal:
+                self._needs_newline = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a partly written last line from a crash
+                    continue
+                entries[(entry["scene"], entry.get("source_hash", ""))] = entry
+        return entries
+
+    def append(self, entry: dict) -> None:
+        with open(self.filename, "a") as journal:
+            if self._needs_newline:
+                journal.write("\n")
+                self._needs_newline = False
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def clear(self) -> None:
+        self._needs_newline = False
+        if Path(self.filename).is_file():
+            os.remove(self.filename)
+
+
+class BatchRunner(QDialog):
+    """Panel to run a script tab over a list of scenes in parallel."""
+
+    columns = ["Scene", "Status", "Time (s)", "Result / Error"]
+
+    def __init__(self, editor_dialog, parent=None):
+        """
+        Parameters :
+        editor_dialog (EditorDialogCore) : used to find the script tabs and settings
+        parent (QWidget) : parent widget
+        """
+        super().__init__(parent)
+        self.editor_dialog = editor_dialog
+        self.setWindowTitle("Batch Scene Runner")
+        self.resize(900, 600)
+        self.pool = None
+        self.rows: Dict[int, int] = {}
+        self.scene_rows: Dict[str, int] = {}
+        self.journal = None
+        self.script_hash = ""
+        self.start_time = 0.0
+        layout = QGridLayout()
+        self.setLayout(layout)
+
+        layout.addWidget(QLabel("Scenes (glob)"), 0, 0)
+        self.pattern = QLineEdit()
+        self.pattern.setToolTip(
+            "glob pattern for scenes for example /jobs/shots/**/*.ma"
+        )
+        self.pattern.returnPressed.connect(self.add_glob)
+        layout.addWidget(self.pattern, 0, 1, 1, 2)
+        add_files = QPushButton("Add Files")
+        add_files.clicked.connect(self.add_files)
+        layout.addWidget(add_files, 0, 3)
+
+        layout.addWidget(QLabel("Script"), 1, 0)
+        self.script_tab = QComboBox()
+        layout.addWidget(self.script_tab, 1, 1)
+        layout.addWidget(QLabel("Workers"), 1, 2)
+        self.worker_count = QSpinBox()
+        self.worker_count.setRange(1, max(1, os.cpu_count() or 1))
+        self.worker_count.setValue(min(4, self.worker_count.maximum()))
+        layout.addWidget(self.worker_count, 1, 3)
+
+        layout.addWidget(QLabel("Journal"), 2, 0)
+        self.journal_name = QLineEdit(str(Path.home() / "maya_batch_journal.jsonl"))
+        layout.addWidget(self.journal_name, 2, 1, 1, 2)
+        self.resume = QCheckBox("Resume")
+        self.resume.setToolTip(
+            "skip scenes the journal has as completed by this script"
+        )
+        self.resume.setChecked(True)
+        layout.addWidget(self.resume, 2, 3)
+
+        self.table = QTableWidget(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table, 3, 0, 1, 4)
+
+        # stdout / stderr of the jobs prefixed with their scene
+        self.output = QPlainTextEdit()
+        self.output.setReadOnly(True)
+        self.output.setMaximumBlockCount(10000)
+        layout.addWidget(self.output, 4, 0, 1, 4)
+
+        self.summary = QLabel("")
+        layout.addWidget(self.summary, 5, 0, 1, 2)
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.run)
+        layout.addWidget(self.run_button, 5, 2)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.stop)
+        layout.addWidget(self.stop_button, 5, 3)
+        self.update_script_tabs()
+
+    def update_script_tabs(self) -> None:
+        """Fill the script combo with the open python tabs."""
+        self.script_tab.clear()
+        tab = self.editor_dialog.ui.editor_tab
+        for index in range(tab.count()):
+            if isinstance(tab.widget(index), PythonTextEdit):
+                self.script_tab.addItem(tab.tabText(index), index)
+
+    def add_scene(self, scene: str) -> None:
+        if scene in self.scene_rows:
+            return
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, 0, QTableWidgetItem(scene))
+        self.table.setItem(row, 1, QTableWidgetItem("waiting"))
+        self.scene_rows[scene] = row
+
+    def add_glob(self) -> None:
+        for scene in sorted(glob.glob(self.pattern.text(), recursive=True)):
+            if Path(scene).suffix in (".ma", ".mb"):
+                self.add_scene(scene)
+
+    def add_files(self) -> None:
+        files, _ = QFileDialog.getOpenFileNames(
+            self, "Select Scenes", "", "Maya Scenes (*.ma *.mb)"
+        )
+        for scene in files:
+            self.add_scene(scene)
+
+    def set_row(self, row: int, status: str, wall: str = "", text: str = "") -> None:
+        self.table.setItem(row, 1, QTableWidgetItem(status))
+        item = QTableWidgetItem()
+        if wall:
+            item.setData(Qt.DisplayRole, round(float(wall), 3))
+        self.table.setItem(row, 2, item)
+        self.table.setItem(row, 3, QTableWidgetItem(text))
+
+    def run(self) -> None:
+        """Schedule every scene not already done over the worker pool."""
+        if self.script_tab.count() == 0:
+            return
+        tab = self.editor_dialog.ui.editor_tab
+        editor = tab.widget(self.script_tab.currentData())
+        source = editor.toPlainText() + "\n"
+        self.script_hash = source_hash(source)
+        self.journal = BatchJournal(self.journal_name.text())
+        done = self.journal.load() if self.resume.isChecked() else {}
+        if not self.resume.isChecked():
+            self.journal.clear()
+        settings = self.editor_dialog.settings
+        self.pool = WorkerPool(
+            settings.value("worker-interpreter", "", type=str),
+            self.worker_count.value(),
+            self,
+        )
+        self.pool.job_finished.connect(self.job_finished)
+        self.pool.output.connect(self.job_output)
+        self.output.clear()
+        self.rows.clear()
+        for scene, row in self.scene_rows.items():
+            entry = done.get((scene, self.script_hash))
+            if entry is not None and entry.get("status") == "ok":
+                self.set_row(
+                    row, "ok (journal)", entry["wall"], entry.get("result", "")
+                )
+                continue
+            job_id = self.pool.submit(source, editor.filename, scene)
+            self.rows[job_id] = row
+            self.set_row(row, "queued")
+        self.start_time = time.perf_counter()
+        self.run_button.setEnabled(not self.rows)
+        self.stop_button.setEnabled(bool(self.rows))
+        self.update_summary()
+
+    @Slot(int, dict)
+    def job_finished(self, job_id: int, message: dict) -> None:
+        row = self.rows.pop(job_id, None)
+        if row is None:
+            return
+        scene = self.table.item(row, 0).text()
+        error = message.get("error")
+        status = "failed" if error else "ok"
+        text = error.strip().splitlines()[-1] if error else message.get("result") or ""
+        wall = f"{message.get('wall', 0.0)}"
+        self.set_row(row, status, wall, text)
+        if error:
+            self.table.item(row, 3).setToolTip(error)
+        self.journal.append(
+            {
+                "scene": scene,
+                "source_hash": self.script_hash,
+                "status": status,
+                "wall": message.get("wall", 0.0),
+                "result": text,
+                "time": time.time(),
+            }
+        )
+        self.update_summary()
+        if not self.rows:
+            self.finish()
+
+    @Slot(int, str, str)
+    def job_output(self, job_id: int, stream: str, text: str) -> None:
+        """Show a job's output in the output pane, prefixed with its scene."""
+        row = self.rows.get(job_id)
+        name = "worker" if row is None else Path(self.table.item(row, 0).text()).name
+        prefix = f"[{name}{' stderr' if stream == 'stderr' else ''}] "
+        self.output.appendPlainText(
+            "\n".join(prefix + line for line in text.rstrip("\n").split("\n"))
+        )
+
+    def update_summary(self) -> None:
+        statuses: List[str] = [
+            self.table.item(row, 1).text() for row in range(self.table.rowCount())
+        ]
+        ok = sum(status.startswith("ok") for status in statuses)
+        failed = statuses.count("failed")
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        self.summary.setText(
+            f"{ok} ok {failed} failed {len(self.rows)} remaining of {len(statuses)} "
+            f"elapsed {elapsed:.1f}s"
+        )
+
+    def stop(self) -> None:
+        """Stop the batch, the running jobs are terminated."""
+        for row in self.rows.values():
+            self.set_row(row, "stopped")
+        self.rows.clear()
+        self.finish(terminate=True)
+
+    def finish(self, terminate: bool = False) -> None:
+        if self.pool is not None:
+            # the next run's pool reuses job ids so ignore anything still to come from this one
+            self.pool.job_finished.disconnect(self.job_finished)
+            self.pool.output.disconnect(self.job_output)
+            # workers exit in the background, WorkerPool.worker_exited handles them
+            self.pool.shutdown(terminate)
+            self.pool = None
+        self.run_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.update_summary()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self.stop()
+        super().closeEvent(event)
@@ -0,0 +1,144 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Profiler for maya.cmds calls.
+
+Most slow scripts are slow because of lots of small maya.cmds calls. While the CmdsProfiler is
+active every command in the maya.cmds module is replaced with a proxy that counts and times the
+call and records the line it was called from. As scripts do "import maya.cmds as cmds" they get
+the same module so see the proxies.
+"""
+import functools
+import sys
+import time
+from collections import Counter, defaultdict, namedtuple
+from typing import Callable, Dict, List, Optional
+
+import maya.cmds as cmds
+
+cmds_call_data = namedtuple("CmdsCallData", "command calls total_time lines")
+
+# commands which take a node.attribute and are often called in loops on the same node
+attribute_commands = ("setAttr", "getAttr", "connectAttr", "addAttr", "setKeyframe")
+
+
+class CmdsProfiler:
+    """Context manager which wraps maya.cmds with counting and timing proxies."""
+
+    def __init__(
+        self,
+        on_finish: Optional[Callable[[str], None]] = None,
+        batch_threshold: int = 20,
+    ):
+        """
+        Parameters :
+        on_finish (callable) : called with the text report when the block exits
+        batch_threshold (int) : number of calls before we suggest batching
+        """
+        self.on_finish = on_finish
+        self.batch_threshold = batch_threshold
+        self.calls: Counter = Counter()
+        self.times: Dict[str, float] = defaultdict(float)
+        # command : Counter of (filename, line)
+        self.lines: Dict[str, Counter] = defaultdict(Counter)
+        # command : Counter of node names for the attribute commands
+        self.nodes: Dict[str, Counter] = defaultdict(Counter)
+        self._originals: Dict[str, Callable] = {}
+
+    def __enter__(self) -> "CmdsProfiler":
+        for name, function in list(vars(cmds).items()):
+            if callable(function) and not name.startswith("_"):
+                self._originals[name] = function
+                setattr(cmds, name, self._proxy(name, function))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        for name, function in self._originals.items():
+            setattr(cmds, name, function)
+        self._originals.clear()
+        if self.on_finish is not None:
+            self.on_finish(self.report())
+        return False
+
+    def _proxy(self, name: str, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def proxy(*args, **kwargs):
+            caller = sys._getframe(1)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.times[name] += time.perf_counter() - start
+                self.calls[name] += 1
+                self.lines[name][(caller.f_code.co_filename, caller.f_lineno)] += 1
+                if name in attribute_commands and args and isinstance(args[0], str):
+                    self.nodes[name][args[0].split(".")[0]] += 1
+
+        return proxy
+
+    def results(self) -> List[cmds_call_data]:
+        """Get the call data for each command used sorted by total time."""
+        results = [
+            cmds_call_data(
+                command=name,
+                calls=calls,
+                total_time=self.times[name],
+                lines=self.lines[name],
+            )
+            for name, calls in self.calls.items()
+        ]
+        results.sort(key=lambda data: data.total_time, reverse=True)
+        return results
+
+    def suggestions(self) -> List[str]:
+        """Look for places where batching the calls would help."""
+        suggestions = []
+        for name, nodes in self.nodes.items():
+            for node, count in nodes.most_common():
+                if count < self.batch_threshold:
+                    break
+                suggestions.append(
+                    f"{name} called {count} times on {node}, set / get the attributes in "
+                    "fewer calls (compound values or OpenMaya MPlugs)"
+                )
+        for name, lines in self.lines.items():
+            for (filename, line), count in lines.most_common(3):
+                if count < self.batch_threshold:
+                    break
+                suggestions.append(
+                    f"{name} called {count} times from {filename}:{line}, many commands "
+                    "accept a list of objects so could be called once outside the loop"
+                )
+        return suggestions
+
+    def report(self, count: int = 20) -> str:
+        """Create a text report of the count slowest commands and suggestions."""
+        results = self.results()
+        if not results:
+            return "maya.cmds profile : no commands called\n"
+        report = [
+            f"maya.cmds profile : {sum(self.calls.values())} calls to {len(results)} commands",
+            f"{'command':<24}{'calls':>10}{'total ms':>12}{'mean us':>12}  called from",
+        ]
+        for data in results[:count]:
+            lines = ", ".join(
+                f"{line} ({calls})" for (_, line), calls in data.lines.most_common(3)
+            )
+            report.append(
+                f"{data.command:<24}{data.calls:>10}{data.total_time * 1000.0:>12.3f}"
+                f"{data.total_time / data.calls * 1e6:>12.1f}  lines {lines}"
+            )
+        for suggestion in self.suggestions():
+            report.append(f"Suggestion : {suggestion}")
+        return "\n".join(report) + "\n"
@@ -0,0 +1,112 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Notebook style cells for the editors.
+
+A line starting with the cell marker (# %% for python, // %% for mel) starts a new cell, any text
+after the marker is used as the cell title. The marker line is part of the cell it starts so line
+numbers in tracebacks still match the editor. The CellCache keeps the run time and result summary
+of the last run of each cell, keyed by the cell title and source hash, so Run Changed Cells can skip
+the ones which haven't been edited since they last ran without error even if other cells have been
+added or moved around them.
+"""
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from .ExecutionTimer import execution_record, source_hash
+
+code_cell = namedtuple("CodeCell", "index title first_line last_line source")
+cell_result = namedtuple("CellResult", "source_hash wall summary error")
+
+cell_markers = {"python": "# %%", "mel": "// %%"}
+
+
+def split_cells(text: str, marker: str) -> List[code_cell]:
+    """Split the editor text into cells.
+
+    Parameters :
+    text (str) : the editor text
+    marker (str) : the cell marker for the language
+    Returns : list of code_cell, text before the first marker is a cell if it isn't blank
+    """
+    lines = text.split("\n")
+    starts = [
+        number for number, line in enumerate(lines) if line.lstrip().startswith(marker)
+    ]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    cells = []
+    for position, start in enumerate(starts):
+        end = starts[position + 1] if position + 1 < len(starts) else len(lines)
+        source = "\n".join(lines[start:end]).rstrip() + "\n"
+        first = lines[start].lstrip()
+        if first.startswith(marker):
+            title = first[len(marker) :].strip()
+        elif not source.strip():
+            # nothing before the first marker
+            continue
+        else:
+            title = ""
+        cells.append(code_cell(len(cells), title, start + 1, end, source))
+    return cells
+
+
+def cell_at_line(cells: List[code_cell], line: int) -> Optional[code_cell]:
+    """Find the cell containing the 1 based line number."""
+    for cell in cells:
+        if cell.first_line <= line <= cell.last_line:
+            return cell
+    return cells[-1] if cells else None
+
+
+def cell_name(cell: code_cell) -> str:
+    return f"cell {cell.index + 1}" + (f" '{cell.title}'" if cell.title else "")
+
+
+def cell_key(cell: code_cell) -> Tuple[str, str]:
+    """The CellCache key of a cell, its title and source hash."""
+    return cell.title, source_hash(cell.source)
+
+
+class CellCache:
+    """Results of the last run of each cell, keyed by cell_key."""
+
+    def __init__(self):
+        self.results: Dict[Tuple[str, str], cell_result] = {}
+
+    def is_changed(self, cell: code_cell) -> bool:
+        """True if the cell hasn't run, has been edited since or raised last time."""
+        result = self.results.get(cell_key(cell))
+        return result is None or result.error
+
+    def store(self, cell: code_cell, record: execution_record, summary: str) -> None:
+        key = cell_key(cell)
+        self.results[key] = cell_result(key[1], record.wall, summary, record.error)
+
+    def prune(self, cells: List[code_cell]) -> None:
+        """Forget the results of cells which are no longer in the editor."""
+        keys = {cell_key(cell) for cell in cells}
+        self.results = {
+            key: result for key, result in self.results.items() if key in keys
+        }
+
+    def clear(self) -> None:
+        self.results.clear()
+
+    def skipped_message(self, cell: code_cell) -> str:
+        result = self.results[cell_key(cell)]
+        text = f"{cell_name(cell)} unchanged, skipped (last run {result.wall:.3f}s"
+        if result.summary:
+            text += f" -> {result.summary}"
+        return text + ")"
@@ -0,0 +1,89 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""cProfile support for the Run with Profiler mode.
+
+The CodeProfiler wraps a run and produces a list of profile_data for the hottest functions which
+is displayed in the Profiler sidebar model.
+"""
+import cProfile
+import pstats
+from collections import namedtuple
+from typing import Callable, List, Optional
+
+profile_data = namedtuple(
+    "ProfileData", "function filename line_number calls self_time cumulative_time"
+)
+
+
+class CodeProfiler:
+    """Context manager to profile a block of code with cProfile."""
+
+    def __init__(
+        self,
+        on_finish: Optional[Callable[[List[profile_data]], None]] = None,
+        count: int = 100,
+    ):
+        """
+        Parameters :
+        on_finish (callable) : called with the top functions when the block exits
+        count (int) : how many functions to keep
+        """
+        self.profiler = cProfile.Profile()
+        self.on_finish = on_finish
+        self.count = count
+        self.results: List[profile_data] = []
+
+    def __enter__(self) -> "CodeProfiler":
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.profiler.disable()
+        self.results = self.top_functions(self.count)
+        if self.on_finish is not None:
+            self.on_finish(self.results)
+        return False
+
+    def top_functions(self, count: int = 100) -> List[profile_data]:
+        """Get the functions with the highest cumulative time.
+
+        Parameters :
+        count (int) : maximum number of functions to return
+        Returns : list of profile_data sorted by cumulative time
+        """
+        stats = pstats.Stats(self.profiler)
+        results = []
+        for (filename, line_number, function), (
+            _,
+            calls,
+            self_time,
+            cumulative_time,
+            _,
+        ) in stats.stats.items():  # type: ignore
+            # don't report the profiler switching itself off
+            if "_lsprof.Profiler" in function:
+                continue
+            results.append(
+                profile_data(
+                    function=function,
+                    filename=filename,
+                    line_number=line_number,
+                    calls=calls,
+                    self_time=self_time,
+                    cumulative_time=cumulative_time,
+                )
+            )
+        results.sort(key=lambda data: data.cumulative_time, reverse=True)
+        return results[:count]
@@ -0,0 +1,103 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Compile and run editor code in the Maya __main__ namespace.
+
+utils.executeInMainThreadWithResult compiles text as "<maya console>" so profilers and tracebacks
+can't be mapped back to the editor. Here we compile with the editor filename ourselves and run the
+code object in the same namespace Maya uses. Compiled code objects are kept in the code_cache so
+running an unchanged file again doesn't parse or compile it.
+"""
+import __main__
+from collections import OrderedDict
+from types import CodeType
+from typing import Any
+
+from maya import utils
+
+from .ExecutionTimer import ExecutionTimer, source_hash
+
+
+class CodeCache:
+    """Cache of compiled code objects keyed by filename and source hash.
+
+    Repeated runs of a large unchanged file skip parsing and compiling, the oldest entries are
+    dropped once max_size is reached.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.code_objects: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: str, filename: str, first_line: int = 1) -> CodeType:
+        """Get the compiled code for source, compiling if not in the cache.
+
+        Parameters :
+        source (str) : the code to compile
+        filename (str) : the filename used in the code object and tracebacks
+        first_line (int) : line in the editor the source starts at
+        Returns : the compiled code object
+        """
+        key = (filename, first_line, source_hash(source))
+        code = self.code_objects.get(key)
+        if code is not None:
+            self.hits += 1
+            ExecutionTimer.count_cache_hit()
+            self.code_objects.move_to_end(key)
+            return code
+        self.misses += 1
+        code = compile_source(source, filename, first_line)
+        self.code_objects[key] = code
+        if len(self.code_objects) > self.max_size:
+            self.code_objects.popitem(last=False)
+        return code
+
+    def clear(self) -> None:
+        self.code_objects.clear()
+
+
+code_cache = CodeCache()
+
+
+def compile_source(source: str, filename: str, first_line: int = 1) -> CodeType:
+    """Compile the source as an expression if possible (so we get a value back) else as statements.
+
+    Parameters :
+    source (str) : the code to compile
+    filename (str) : the filename used in the code object and tracebacks
+    first_line (int) : line in the editor the source starts at, used when running a selection
+    Returns : the compiled code object
+    """
+    # pad with new lines so line numbers match the editor for selections
+    source = "\n" * (first_line - 1) + source
+    try:
+        return compile(source, filename, "eval")
+    except SyntaxError:
+        return compile(source, filename, "exec")
+
+
+def run_code(code: CodeType) -> Any:
+    """Run a code object in the Maya __main__ namespace.
+
+    eval of an "exec" code object returns None so this works for both modes.
+    """
+    return eval(code, __main__.__dict__)
+
+
+def execute_source(source: str, filename: str, first_line: int = 1) -> Any:
+    """Compile (or get from the code_cache) and run the source on the main thread."""
+    code = code_cache.get(source, filename, first_line)
+    return utils.executeInMainThreadWithResult(run_code, code)
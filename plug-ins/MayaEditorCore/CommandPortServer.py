@@ -0,0 +1,94 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Pure python stand in for a Maya python commandPort.
+
+Used to test remote execution without a second Maya session, run with any python
+
+python CommandPortServer.py --port 7002
+
+Like Maya each line received is evaluated (or executed if it isn't an expression) in a shared
+__main__ style namespace and the result is sent back as text followed by a new line and a null
+byte. This doesn't import the MayaEditorCore package so it can be run as a script.
+"""
+import argparse
+import socketserver
+import threading
+import traceback
+from typing import Any, Dict, Optional
+
+
+class CommandPortHandler(socketserver.StreamRequestHandler):
+    """Handle one client connection, commands are run one at a time like Maya."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            command = line.decode("utf-8").strip()
+            if not command:
+                continue
+            reply = self.server.run_command(command)  # type: ignore
+            self.wfile.write(reply.encode("utf-8") + b"\n\x00")
+            self.wfile.flush()
+
+
+class CommandPortServer(socketserver.ThreadingTCPServer):
+    """Local server which runs python commands like a Maya commandPort."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 7002, host: str = "localhost"):
+        super().__init__((host, port), CommandPortHandler)
+        self.namespace: Dict[str, Any] = {"__name__": "__main__"}
+        # Maya runs commandPort commands on its main thread so only one at a time
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_command(self, command: str) -> str:
+        with self._lock:
+            try:
+                try:
+                    code = compile(command, "<commandPort>", "eval")
+                except SyntaxError:
+                    code = compile(command, "<commandPort>", "exec")
+                result = eval(code, self.namespace)
+            except Exception:
+                return "# Error: " + traceback.format_exc().strip().splitlines()[-1]
+        return "" if result is None else str(result)
+
+    def start(self) -> None:
+        """Serve from a daemon thread, use stop to shut down."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maya commandPort stand in")
+    parser.add_argument("--port", type=int, default=7002, help="port to listen on")
+    parser.add_argument("--host", default="localhost", help="address to listen on")
+    args = parser.parse_args()
+    with CommandPortServer(args.port, args.host) as server:
+        print(f"commandPort stand in listening on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -17,10 +17,11 @@
 This is the core Dialog class where all other elements are created and controlled. This can work stand alone as well as part of a plugin.
 """
 from pathlib import Path
-from typing import Any
+from typing import Any, List
 
 import maya.api.OpenMaya as OpenMaya
 import maya.cmds as cmds
+import maya.mel as mel
 import maya.OpenMayaUI as omui
 from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
 
@@ -32,14 +33,39 @@ from PySide2.QtWidgets import *
 # Note this is from Maya not pyside so type hints not generated
 from shiboken2 import wrapInstance  # type: ignore
 
+from .BackgroundRunner import BackgroundRunner
+from .BatchRunner import BatchRunner
+from .CodeRunner import execute_source
 from .EditorToolBar import EditorToolBar
+from .ExecutionQueue import ExecutionQueue
+from .ExecutionTimer import ExecutionTimer, source_hash
+from .ExecutionWatchdog import ExecutionWatchdog, watchdog_settings
+from .HistoryPanel import HistoryPanel
+from .HistoryStore import HistoryStore
 from .MainUI import Ui_editor_dialog
+from .MelProcCache import proc_cache
 from .MelTextEdit import MelTextEdit
+from .ModuleReloader import ModuleReloader, format_report
+from .OutputFormats import timing_message
 from .OutputToolBar import OutputToolBar
 from .PythonTextEdit import PythonTextEdit
-from .SidebarModels import SideBarModels
+from .RemoteExecution import RemoteExecutor
+from .ResultViewer import ResultViewer, result_store
+from .SidebarModels import (
+    SideBarModels,
+    added_pages,
+    code_page,
+    file_system_page,
+    imports_page,
+    memory_page,
+    profiler_page,
+    queue_page,
+    sortable_pages,
+    workspace_page,
+)
 from .TextEdit import TextEdit
 from .Workspace import Workspace
+from .WorkerPool import WorkerPool, default_interpreter
 
 
 def get_main_window() -> Any:
@@ -63,8 +89,11 @@ class EditorDialogCore(QDialog):
 
     update_output = Signal(str)
     update_output_html = Signal(str)
+    update_output_message = Signal(str, int)
     update_fonts = Signal(QFont)
     toggle_line_numbers = Signal(bool)
+    toggle_capture_output = Signal(bool)
+    update_watchdog = Signal(object)
     editor_name = "NCCA_Script_Editor"
 
     def __init__(self, parent=None):
@@ -94,27 +123,89 @@ class EditorDialogCore(QDialog):
 
         # This should make the window stay on top
         self.setWindowFlags(Qt.Tool)
+        # python editors capture stdout / stderr when set, toggled from the settings menu
+        self.capture_output = False
+        # reload changed workspace modules before a run, toggled from the settings menu
+        self.reload_modules = self.settings.value("reload-modules", False, type=bool)
+        self.module_reloader = ModuleReloader()
+        # samples the main thread while python runs and can interrupt stalled runs
+        self.settings.beginGroup("Watchdog")
+        self.watchdog = watchdog_settings(
+            self.settings.value("enabled", False, type=bool),
+            self.settings.value("interval-ms", 10, type=int),
+            self.settings.value("limit", 30, type=int),
+            self.settings.value("auto-interrupt", False, type=bool),
+        )
+        self.settings.endGroup()
+        # stalled runs are offered an interrupt from a separate mayapy process
+        self.watchdog = self.watchdog._replace(
+            prompt_interpreter=self.settings.value("worker-interpreter", "", type=str)
+            or default_interpreter()
+        )
+        # every run is recorded in the history store rather than kept in the output window
+        self.history_store = HistoryStore(
+            cmds.internalVar(userAppDir=True) + "NCCA_Maya_Editor/history"
+        )
+        ExecutionTimer.on_record = self.history_store.add
+        # editor runs are serialised through the queue rather than nesting
+        self.execution_queue = ExecutionQueue(self)
+        TextEdit.execution_queue = self.execution_queue
+        # reload changed modules as each queued run starts rather than when it is submitted
+        TextEdit.before_run = self.reload_changed_modules
+        TextEdit.after_run = self.snapshot_modules
         # as other things may depend on this create early
         self.create_output_window()
         self.create_tool_bar()
         self.create_menu_bar()
         self.sidebar_models = SideBarModels(self)
+        for page in sorted(added_pages):
+            self.ui.sidebar_selector.addItem(added_pages[page])
+        self.execution_queue.changed.connect(
+            lambda: self.sidebar_models.generate_queue_model(
+                self.execution_queue.jobs()
+            )
+        )
         self.ui.sidebar_treeview.setModel(self.sidebar_models.active_model)
         self.ui.sidebar_selector.currentIndexChanged.connect(self.change_active_model)
 
         # connect tab close event
         self.ui.editor_tab.tabCloseRequested.connect(self.tab_close_requested)
+        # tab context menu for per tab run options
+        tab_bar = self.ui.editor_tab.tabBar()
+        tab_bar.setContextMenuPolicy(Qt.CustomContextMenu)
+        tab_bar.customContextMenuRequested.connect(self.tab_context_menu)
         self.ui.editor_tab.currentChanged.connect(
             self.sidebar_models.code_model_needs_update
         )
         # setup  view sidebar
         self.ui.sidebar_treeview.setHeaderHidden(True)
         self.ui.sidebar_treeview.clicked.connect(self.sidebar_view_changed)
+        self.ui.sidebar_treeview.doubleClicked.connect(self.sidebar_view_double_clicked)
         # create workspace
         self.workspace = Workspace()
+        # mayapy worker processes, created when first used
+        self.worker_pool = None
+        # other Maya sessions' commandPorts, selected with the toolbar target
+        self.remote_executor = RemoteExecutor(self)
+        self.remote_executor.output.connect(self.remote_output)
+        self.remote_executor.finished.connect(self.remote_finished)
+        for target in self.settings.value("remote-targets", [], type=list):
+            self.tool_bar.add_execution_target(target)
+        # worker thread for the Background run mode
+        self.background_runner = BackgroundRunner(self)
+        self.background_runner.started.connect(self.tool_bar.background_started)
+        self.background_runner.progress.connect(self.tool_bar.set_background_progress)
+        self.background_runner.finished.connect(self.tool_bar.background_finished)
+        self.background_runner.stdout.connect(self.output_window.append_plain_text)
+        self.background_runner.stderr.connect(
+            lambda text: self.output_window.append_message(
+                text, OpenMaya.MCommandMessage.kError
+            )
+        )
         # connect output window signals
         self.update_output.connect(self.output_window.append_plain_text)
         self.update_output_html.connect(self.output_window.append_html)
+        self.update_output_message.connect(self.output_window.append_message)
         # Finally load in settings and create live editors
         self.load_settings()
         self.create_live_editors()
@@ -179,32 +270,10 @@ class EditorDialogCore(QDialog):
         mtype (int) : type of message
         client_data : not used
         """
-        colour = "white"
-        message_prefix = ""
-        if mtype == OpenMaya.MCommandMessage.kHistory:
-            colour = "lightblue"
-            message_prefix = "History : "
-        elif mtype == OpenMaya.MCommandMessage.kDisplay:
-            colour = "yellow"
-        elif mtype == OpenMaya.MCommandMessage.kInfo:
-            colour = "white"
-            message_prefix = "Info : "
-
-        elif mtype == OpenMaya.MCommandMessage.kWarning:
-            colour = "green"
-            message_prefix = "Warning : "
-        elif mtype == OpenMaya.MCommandMessage.kError:
-            colour = "red"
-            message_prefix = "Error : "
-
-        elif mtype == OpenMaya.MCommandMessage.kResult:
-            colour = "lightblue"
-            message_prefix = "Result :"
-
-        # this moves to the end so we don't get double new lines etc
-        # self.output_window.moveCursor(QTextCursor.End)
-        html = f'<p style="color:{colour}"><pre>{message_prefix}{message}</pre></p>'
-        self.update_output_html.emit(html)
+        # count messages so the ExecutionTimer can report how many a run produced
+        ExecutionTimer.count_message()
+        # formats are cached per type in OutputFormats so no html is generated here
+        self.update_output_message.emit(message, mtype)
 
     def closeEvent(self, event: QCloseEvent) -> None:
         """Event called when the Dialog closeEvent is  triggered.
@@ -214,6 +283,13 @@ class EditorDialogCore(QDialog):
         event (QCloseEvent) : event passed in to close
         """
         OpenMaya.MMessage.removeCallback(self.callback_id)
+        ExecutionTimer.on_record = None
+        TextEdit.before_run = None
+        TextEdit.after_run = None
+        self.background_runner.stop()
+        self.remote_executor.shutdown()
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
         self.save_settings()
         self.workspace.close()
         super(EditorDialog, self).closeEvent(event)
@@ -257,6 +333,12 @@ class EditorDialogCore(QDialog):
 
         self.menu_bar.addMenu(workspace_menu)
 
+        history_menu = QMenu("&History")
+        show_history = QAction("Show History", self)
+        show_history.triggered.connect(self.show_history)  # type: ignore
+        history_menu.addAction(show_history)
+        self.menu_bar.addMenu(history_menu)
+
         settings_menu = QMenu("&Settings")
         # Add settings Menu
 
@@ -273,6 +355,37 @@ class EditorDialogCore(QDialog):
         show_line_numbers_action.setCheckable(True)
         show_line_numbers_action.setChecked(True)
 
+        # capture python stdout / stderr to the output window while running
+        capture_output_action = QAction("Capture Python Output", self)
+        settings_menu.addAction(capture_output_action)
+        capture_output_action.setCheckable(True)
+        capture_output_action.setChecked(self.capture_output)
+        capture_output_action.toggled.connect(self.set_capture_output)
+
+        # watchdog sampling the main thread stack while python runs
+        watchdog_action = QAction("Execution Watchdog", self)
+        settings_menu.addAction(watchdog_action)
+        watchdog_action.setCheckable(True)
+        watchdog_action.setChecked(self.watchdog.enabled)
+        watchdog_action.toggled.connect(
+            lambda state: self.set_watchdog(self.watchdog._replace(enabled=state))
+        )
+        watchdog_settings_action = QAction("Watchdog Settings", self)
+        settings_menu.addAction(watchdog_settings_action)
+        watchdog_settings_action.triggered.connect(self.edit_watchdog_settings)
+
+        # reload changed workspace modules (and their dependents) before running
+        reload_modules_action = QAction("Reload Changed Modules Before Run", self)
+        settings_menu.addAction(reload_modules_action)
+        reload_modules_action.setCheckable(True)
+        reload_modules_action.setChecked(self.reload_modules)
+        reload_modules_action.toggled.connect(self.set_reload_modules)
+
+        # interpreter used by the mayapy worker pool
+        worker_interpreter_action = QAction("Set Worker Interpreter", self)
+        settings_menu.addAction(worker_interpreter_action)
+        worker_interpreter_action.triggered.connect(self.set_worker_interpreter)
+
         # show output window
         show_output_window_action = QAction("Show Output Window", self)
         settings_menu.addAction(show_output_window_action)
@@ -410,9 +523,118 @@ class EditorDialogCore(QDialog):
         self.ui.sidebar_treeview.clear()
         self.create_live_editors()
 
+    def set_worker_interpreter(self) -> None:
+        """Choose mayapy (or any python) for the worker pool and the watchdog stall prompt."""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Select mayapy or python interpreter", "", "All Files (*)"
+        )
+        if file_name:
+            self.settings.setValue("worker-interpreter", file_name)
+            self.set_watchdog(self.watchdog._replace(prompt_interpreter=file_name))
+            if self.worker_pool is not None:
+                self.worker_pool.shutdown()
+                self.worker_pool = None
+
     def show_line_numbers(self, state):
         self.toggle_line_numbers.emit(state)
 
+    def set_capture_output(self, state: bool) -> None:
+        self.capture_output = state
+        self.toggle_capture_output.emit(state)
+
+    def set_watchdog(self, settings: watchdog_settings) -> None:
+        self.watchdog = settings
+        self.settings.beginGroup("Watchdog")
+        self.settings.setValue("enabled", settings.enabled)
+        self.settings.setValue("interval-ms", settings.interval_ms)
+        self.settings.setValue("limit", settings.limit)
+        self.settings.setValue("auto-interrupt", settings.auto_interrupt)
+        self.settings.endGroup()
+        self.update_watchdog.emit(settings)
+
+    def edit_watchdog_settings(self) -> None:
+        """Dialog to set the watchdog sample interval, stall limit and auto interrupt."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Watchdog Settings")
+        layout = QFormLayout(dialog)
+        interval = QSpinBox()
+        interval.setRange(1, 1000)
+        interval.setSuffix(" ms")
+        interval.setValue(self.watchdog.interval_ms)
+        layout.addRow("Sample Interval", interval)
+        limit = QSpinBox()
+        limit.setRange(1, 24 * 60 * 60)
+        limit.setSuffix(" s")
+        limit.setValue(self.watchdog.limit)
+        layout.addRow("Stall Limit", limit)
+        auto_interrupt = QCheckBox("Interrupt runs over the limit")
+        auto_interrupt.setChecked(self.watchdog.auto_interrupt)
+        layout.addRow(auto_interrupt)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addRow(buttons)
+        if dialog.exec_() == QDialog.Accepted:
+            self.set_watchdog(
+                self.watchdog._replace(
+                    interval_ms=interval.value(),
+                    limit=limit.value(),
+                    auto_interrupt=auto_interrupt.isChecked(),
+                )
+            )
+
+    def set_console_mode(self, state: bool) -> None:
+        """Switch the Python live window to / from the incremental console."""
+        self.live_python_editor.set_console_mode(state)
+        self.settings.setValue("console-mode", state)
+
+    def set_reload_modules(self, state: bool) -> None:
+        self.reload_modules = state
+        self.settings.setValue("reload-modules", state)
+
+    def reload_changed_modules(self, editor: TextEdit) -> None:
+        """Reload the modules under the workspace folders which changed since the last run."""
+        if not self.reload_modules or not isinstance(editor, PythonTextEdit):
+            return
+        # live editors have no file so only use real paths
+        files = [Path(file) for file in self.workspace.files + [editor.filename]]
+        self.module_reloader.set_roots(
+            str(file.parent) for file in files if file.is_absolute() and file.is_file()
+        )
+        report = self.module_reloader.reload_changed()
+        if report is not None:
+            self.output_window.append_message(format_report(report), timing_message)
+
+    def snapshot_modules(self, editor: TextEdit) -> None:
+        """Record the modules imported by the run so edits before the next run are reloaded."""
+        if self.reload_modules and isinstance(editor, PythonTextEdit):
+            self.module_reloader.snapshot()
+
+    def show_history(self) -> None:
+        history_panel = HistoryPanel(self, self.history_store, self)
+        history_panel.setAttribute(Qt.WA_DeleteOnClose)
+        history_panel.show()
+
+    def rerun_history_entry(self, entry, source: str) -> None:
+        """Run a source from the HistoryPanel again, timed and recorded as a new run."""
+        self.execution_queue.submit(
+            entry.name,
+            (entry.name, "history", source_hash(source)),
+            lambda: self.run_history_source(entry, source),
+        )
+
+    def run_history_source(self, entry, source: str) -> None:
+        with ExecutionTimer(
+            entry.name, entry.language, source, self.output_window.show_timing
+        ) as timer:
+            if entry.language == "mel":
+                value = mel.eval(source)
+            else:
+                value = execute_source(source, entry.name)
+            timer.set_result(value)
+        if value is not None:
+            self.output_window.show_result(value)
+
     def open_workspace(self) -> None:
         """Open a new workspace.
 
@@ -510,7 +732,207 @@ class EditorDialogCore(QDialog):
     @Slot()
     def tool_bar_run_clicked(self):
         """Slot used by the Toolbar run button."""
-        self.ui.editor_tab.currentWidget().execute_code()
+        editor = self.ui.editor_tab.currentWidget()
+        target = self.tool_bar.current_execution_target()
+        if target:
+            self.run_remote(editor, target)
+            return
+        editor.execute_code()
+
+    @Slot()
+    def tool_bar_run_profiler_clicked(self):
+        """Slot used by the Toolbar run with profiler button."""
+        editor = self.ui.editor_tab.currentWidget()
+        if isinstance(editor, PythonTextEdit):
+            editor.execute_code(run_mode="profile")
+            # show the results
+            self.ui.sidebar_selector.setCurrentIndex(profiler_page)
+        else:
+            self.output_window.appendHtml(
+                '<b><p style="color:red">Error :</p></b><p>Profiling is only available for Python editors</p>'
+            )
+
+    def tool_bar_run_mode(self, run_mode: str) -> None:
+        """Called from the Toolbar Run Mode menu to run the current editor in run_mode."""
+        editor = self.ui.editor_tab.currentWidget()
+        if isinstance(editor, PythonTextEdit) and run_mode == "background":
+            self.run_in_background(editor)
+        elif isinstance(editor, PythonTextEdit):
+            editor.execute_code(run_mode=run_mode)
+            # show the results
+            if run_mode == "memory":
+                self.ui.sidebar_selector.setCurrentIndex(memory_page)
+            elif run_mode == "import_profile":
+                self.ui.sidebar_selector.setCurrentIndex(imports_page)
+        else:
+            self.output_window.appendHtml(
+                '<b><p style="color:red">Error :</p></b><p>This run mode is only available for Python editors</p>'
+            )
+
+    def run_in_background(self, editor: PythonTextEdit) -> None:
+        """Run the editor code on the BackgroundRunner worker thread."""
+        text, first_line = editor.code_to_run()
+        if not self.background_runner.run(
+            text, editor.filename, first_line, editor.show_timing
+        ):
+            self.output_window.appendHtml(
+                '<b><p style="color:red">Error :</p></b><p>A background run is already active</p>'
+            )
+
+    def tab_context_menu(self, pos: QPoint) -> None:
+        """Show the run options for the tab under pos."""
+        tab = self.ui.editor_tab  # type: ignore
+        index = tab.tabBar().tabAt(pos)
+        editor = tab.widget(index)
+        if not isinstance(editor, TextEdit):
+            return
+        menu = QMenu(self)
+        fast_mode = menu.addAction("Fast Mode")
+        fast_mode.setToolTip(
+            "suspend refresh and use one undo chunk for every run of this tab"
+        )
+        fast_mode.setCheckable(True)
+        fast_mode.setChecked(editor.fast_mode)
+        fast_mode.toggled.connect(lambda state: setattr(editor, "fast_mode", state))
+        if editor.cell_runner is not None:
+            self.add_cell_actions(menu, editor)
+        if isinstance(editor, MelTextEdit):
+            cache_procs = menu.addAction("Cache MEL Procs")
+            cache_procs.setToolTip("only re-source procs changed since the last run")
+            cache_procs.setCheckable(True)
+            cache_procs.setChecked(editor.cache_procs)
+            cache_procs.toggled.connect(
+                lambda state: setattr(editor, "cache_procs", state)
+            )
+            clear_procs = menu.addAction("Clear MEL Proc Cache")
+            clear_procs.setToolTip("source every proc on the next run")
+            clear_procs.triggered.connect(proc_cache.clear)
+        if isinstance(editor, PythonTextEdit) and editor.live:
+            console_mode = menu.addAction("Console Mode")
+            console_mode.setToolTip(
+                "run each cell statement by statement and echo the last value"
+            )
+            console_mode.setCheckable(True)
+            console_mode.setChecked(editor.console is not None)
+            console_mode.toggled.connect(self.set_console_mode)
+        if isinstance(editor, PythonTextEdit):
+            self.add_python_tab_actions(menu, editor, index)
+        menu.exec_(tab.tabBar().mapToGlobal(pos))
+
+    def add_cell_actions(self, menu: QMenu, editor: TextEdit) -> None:
+        """Add the # %% cell actions, the cell run is the one the cursor is in."""
+        menu.addSeparator()
+        run_cell = menu.addAction("Run Cell")
+        run_cell.triggered.connect(lambda: editor.run_cell())
+        run_and_advance = menu.addAction("Run Cell and Advance")
+        run_and_advance.triggered.connect(lambda: editor.run_cell(advance=True))
+        run_changed = menu.addAction("Run Changed Cells")
+        run_changed.setToolTip("skip cells unchanged since they last ran without error")
+        run_changed.triggered.connect(editor.run_changed_cells)
+        clear_cache = menu.addAction("Clear Cell Results")
+        clear_cache.triggered.connect(editor.cell_cache.clear)
+        menu.addSeparator()
+
+    def add_python_tab_actions(
+        self, menu: QMenu, editor: PythonTextEdit, index: int
+    ) -> None:
+        """Add the tab context menu actions only available to python editors."""
+        run_in_worker = menu.addAction("Run in mayapy worker")
+        run_in_worker.triggered.connect(lambda: self.run_in_worker(editor))
+        batch_run = menu.addAction("Batch Run over Scenes...")
+        batch_run.triggered.connect(lambda: self.open_batch_runner(index))
+
+    def run_in_worker(self, editor: PythonTextEdit) -> None:
+        """Send the editor code to the mayapy WorkerPool, output is streamed back."""
+        if self.worker_pool is None:
+            self.worker_pool = WorkerPool(
+                self.settings.value("worker-interpreter", "", type=str),
+                self.settings.value("worker-count", 2, type=int),
+                self,
+            )
+            self.worker_pool.output.connect(self.worker_output)
+            self.worker_pool.job_finished.connect(self.worker_job_finished)
+        text, _ = editor.code_to_run()
+        job_id = self.worker_pool.submit(text, editor.filename)
+        self.output_window.append_message(
+            f"[worker job {job_id}] {editor.filename} queued on {self.worker_pool.interpreter}",
+            timing_message,
+        )
+
+    def open_batch_runner(self, index: int) -> None:
+        """Show the BatchRunner with the tab at index selected as the script."""
+        batch_runner = BatchRunner(self, self)
+        batch_runner.setAttribute(Qt.WA_DeleteOnClose)
+        batch_runner.script_tab.setCurrentIndex(batch_runner.script_tab.findData(index))
+        batch_runner.show()
+
+    def tool_bar_execution_targets_changed(self, targets: List[str]) -> None:
+        self.settings.setValue("remote-targets", targets)
+
+    def run_remote(self, editor: TextEdit, target: str) -> None:
+        """Send the editor code to another Maya session's commandPort."""
+        if isinstance(editor, PythonTextEdit):
+            text, _ = editor.code_to_run()
+            language = "python"
+        else:
+            text = editor.toPlainText()
+            if editor.execute_selected:
+                text = editor.textCursor().selectedText().replace("\u2029", "\n")
+            language = "mel"
+        self.remote_executor.run(target, text, editor.filename, language)
+        self.output_window.append_message(
+            f"[{target}] {editor.filename} sent", timing_message
+        )
+
+    @Slot(str, str, str)
+    def remote_output(self, target: str, stream: str, text: str) -> None:
+        if stream == "stderr":
+            self.output_window.append_message(text, OpenMaya.MCommandMessage.kError)
+        else:
+            self.output_window.append_plain_text(text)
+
+    @Slot(str, str, dict)
+    def remote_finished(self, target: str, name: str, reply: dict) -> None:
+        if reply.get("error"):
+            self.output_window.append_message(
+                reply["error"], OpenMaya.MCommandMessage.kError
+            )
+        elif reply.get("result") is not None:
+            self.output_window.append_plain_text(f"{reply['result']}\n")
+        self.output_window.append_message(
+            f"[{target}] {name} wall {reply.get('wall', 0.0):.3f}s"
+            + (" (error)" if reply.get("error") else ""),
+            timing_message,
+        )
+
+    @Slot(int, str, str)
+    def worker_output(self, job_id: int, stream: str, text: str) -> None:
+        if stream == "stderr":
+            self.output_window.append_message(text, OpenMaya.MCommandMessage.kError)
+        else:
+            self.output_window.append_plain_text(text)
+
+    @Slot(int, dict)
+    def worker_job_finished(self, job_id: int, message: dict) -> None:
+        name = self.worker_pool.job_names.pop(job_id, "")
+        if message.get("error"):
+            self.output_window.append_message(
+                message["error"], OpenMaya.MCommandMessage.kError
+            )
+        elif message.get("result") is not None:
+            self.output_window.append_plain_text(f"{message['result']}\n")
+        self.output_window.append_message(
+            f"[worker job {job_id}] {name} wall {message.get('wall', 0.0):.3f}s"
+            + (" (error)" if message.get("error") else ""),
+            timing_message,
+        )
+
+    @Slot()
+    def tool_bar_stop_clicked(self):
+        """Slot used by the Toolbar stop button."""
+        self.background_runner.stop()
+        self.execution_queue.cancel_pending()
+        ExecutionWatchdog.interrupt_active()
 
     @Slot(int)
     def tool_bar_goto_changed(self, line: int):
@@ -530,12 +952,13 @@ class EditorDialogCore(QDialog):
             if file_to_run == tab.tabText(t):
                 index = t
                 break
-        self.ui.editor_tab.widget(index).execute_code()
+        editor = self.ui.editor_tab.widget(index)
+        editor.execute_code()
 
     def sidebar_view_changed(self, index):
         """Update the sidebar model based on the index"""
         selector_index = self.ui.sidebar_selector.currentIndex()
-        if selector_index == 0:
+        if selector_index == workspace_page:
             item = self.sidebar_models.workspace.itemFromIndex(index)  # item.text(0)
             text = item.text()
             # first find the index of the active tab
@@ -546,13 +969,41 @@ class EditorDialogCore(QDialog):
                     index = t
                     break
             tab.setCurrentIndex(t)
-        elif selector_index == 1:  # file system view
+        elif selector_index == file_system_page:  # file system view
             path = self.sidebar_models.file_system_model.filePath(index)
             self.create_editor_and_load_files(path)
-        elif selector_index == 2:  # Code_model_view
+        elif selector_index == code_page:  # Code_model_view
             item = self.sidebar_models.code_system_model.itemFromIndex(index)
             self.ui.editor_tab.currentWidget().goto_line(item.data())
 
+    def sidebar_view_double_clicked(self, index):
+        """Jump to the source of a profiler or memory entry."""
+        if self.ui.sidebar_selector.currentIndex() in (profiler_page, memory_page):
+            model = self.sidebar_models.active_model
+            item = model.itemFromIndex(index.siblingAtColumn(0))
+            self.goto_source(item.data(Qt.UserRole + 1), item.data(Qt.UserRole + 2))
+
+    def goto_source(self, filename: str, line: int) -> None:
+        """Show the editor for filename at line, loading the file if it isn't open.
+
+        Parameters :
+        filename (str) : the full filename used by the editor
+        line (int) : the line to goto
+        """
+        tab = self.ui.editor_tab  # type: ignore
+        for t in range(0, tab.count()):
+            editor = tab.widget(t)
+            if isinstance(editor, PythonTextEdit) and editor.filename == filename:
+                tab.setCurrentIndex(t)
+                break
+        else:
+            # builtins and c functions have no file to go to
+            if not Path(filename).is_file():
+                return
+            self.create_editor_and_load_files(filename)
+        if line > 0:
+            tab.currentWidget().goto_line(line)
+
     def remove_from_open_files(self, filename: str) -> None:
         """Remove filename from sidebar.
         Parameters :
@@ -572,6 +1023,8 @@ class EditorDialogCore(QDialog):
             parent=self.ui.editor_tab,
         )
         self.connect_editor_slots(editor)
+        editor.set_console_mode(self.settings.value("console-mode", False, type=bool))
+        self.live_python_editor = editor
 
         self.ui.editor_tab.insertTab(0, editor, self.python_icon, "Python live_window")  # type: ignore
         self.ui.editor_tab.setCurrentIndex(0)
@@ -593,12 +1046,30 @@ class EditorDialogCore(QDialog):
         self.ui.editor_tab.widget(0).setFocus()
         self.sidebar_models.append_to_workspace("Mel live_window", self.mel_icon)
 
+    def show_result_viewer(self, key: int) -> None:
+        """Open the viewer for a large result clicked in the output window."""
+        value = result_store.get(key)
+        if value is None:
+            self.output_window.append_message(
+                "result no longer available, only the last few are kept",
+                OpenMaya.MCommandMessage.kWarning,
+            )
+            return
+        ResultViewer(value, self.font, self).show()
+
     def create_output_window(self) -> None:
         self.output_window = TextEdit(
             parent=self, read_only=True, show_line_numbers=False
         )
         self.update_fonts.connect(self.output_window.set_editor_fonts)
         self.update_fonts.emit(self.font)
+        # show_timing and show_result for runs not from an editor, like history re-runs
+        self.output_window.update_output.connect(self.output_window.append_plain_text)
+        self.output_window.update_output_html.connect(self.output_window.append_html)
+        self.output_window.update_output_message.connect(
+            self.output_window.append_message
+        )
+        self.output_window.result_clicked.connect(self.show_result_viewer)
         #  create a splitter for the help / output
         self.output_splitter = QSplitter()
         self.output_splitter.addWidget(self.output_window)
@@ -654,17 +1125,28 @@ class EditorDialogCore(QDialog):
     def connect_editor_slots(self, editor):
         editor.update_output.connect(self.output_window.append_plain_text)
         editor.update_output_html.connect(self.output_window.append_html)
+        editor.update_output_message.connect(self.output_window.append_message)
         editor.draw_line.connect(self.output_window.append_line)
         self.update_fonts.connect(editor.set_editor_fonts)
         self.toggle_line_numbers.connect(editor.toggle_line_number)
+        if isinstance(editor, PythonTextEdit):
+            editor.profile_finished.connect(self.sidebar_models.generate_profiler_model)
+            editor.memory_finished.connect(self.sidebar_models.generate_memory_model)
+            editor.imports_finished.connect(self.sidebar_models.generate_import_model)
+            editor.set_capture_output(self.capture_output)
+            self.toggle_capture_output.connect(editor.set_capture_output)
+            editor.set_watchdog(self.watchdog)
+            self.update_watchdog.connect(editor.set_watchdog)
 
     @Slot(int)
     def change_active_model(self, index):
         self.sidebar_models.change_active_model(index)
-        if index == 0:  # workspace files
+        # only the profiler, memory and import tables are sortable
+        self.ui.sidebar_treeview.setSortingEnabled(index in sortable_pages)
+        if index == workspace_page:  # workspace files
             self.ui.sidebar_treeview.setModel(self.sidebar_models.workspace)
             self.ui.sidebar_treeview.setHeaderHidden(True)
-        elif index == 1:  # filesystem mode
+        elif index == file_system_page:  # filesystem mode
 
             self.ui.sidebar_treeview.setModel(self.sidebar_models.file_system_model)
             self.ui.sidebar_treeview.setHeaderHidden(False)
@@ -672,10 +1154,25 @@ class EditorDialogCore(QDialog):
             self.ui.sidebar_treeview.setRootIndex(
                 self.sidebar_models.file_system_model.index(QDir.currentPath())
             )
-        elif index == 2:  # Code Outline
+        elif index == code_page:  # Code Outline
             self.ui.sidebar_treeview.setModel(self.sidebar_models.code_system_model)
             self.sidebar_models.generate_code_model()
             self.ui.sidebar_treeview.setHeaderHidden(True)
+        elif index == profiler_page:  # Profiler results
+            self.ui.sidebar_treeview.setModel(self.sidebar_models.profiler_model)
+            self.ui.sidebar_treeview.setHeaderHidden(False)
+            self.ui.sidebar_treeview.sortByColumn(3, Qt.DescendingOrder)
+        elif index == memory_page:  # Memory tracking results
+            self.ui.sidebar_treeview.setModel(self.sidebar_models.memory_model)
+            self.ui.sidebar_treeview.setHeaderHidden(False)
+            self.ui.sidebar_treeview.sortByColumn(1, Qt.DescendingOrder)
+        elif index == queue_page:  # pending, active and finished runs
+            self.ui.sidebar_treeview.setModel(self.sidebar_models.queue_model)
+            self.ui.sidebar_treeview.setHeaderHidden(False)
+        elif index == imports_page:  # import profiler tree
+            self.ui.sidebar_treeview.setModel(self.sidebar_models.import_model)
+            self.ui.sidebar_treeview.setHeaderHidden(False)
+            self.ui.sidebar_treeview.expandToDepth(0)
 
 class EditorDialog(MayaQWidgetDockableMixin,EditorDialogCore):
     def __init__(self):
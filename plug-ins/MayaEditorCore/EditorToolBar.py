@@ -17,7 +17,7 @@
 This file contains the class to produce the main toolbar and buttons for the editor, most functions will connect to the parent 
 """
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from PySide2.QtCore import *
 from PySide2.QtGui import *
@@ -53,6 +53,72 @@ class EditorToolBar(QToolBar):
         run_button = QPushButton("Run Current")
         run_button.clicked.connect(parent.tool_bar_run_clicked)
         self.addWidget(run_button)
+        run_profiler = QPushButton("Run with Profiler")
+        run_profiler.setToolTip(
+            "run the current editor with cProfile, see Profiler sidebar"
+        )
+        run_profiler.clicked.connect(parent.tool_bar_run_profiler_clicked)
+        self.addWidget(run_profiler)
+        # other ways of running the current editor, see add_run_mode
+        self.run_mode_menu = QMenu(self)
+        run_mode_button = QToolButton()
+        run_mode_button.setText("Run Mode")
+        run_mode_button.setMenu(self.run_mode_menu)
+        run_mode_button.setPopupMode(QToolButton.InstantPopup)
+        self.addWidget(run_mode_button)
+        self.add_run_mode(
+            "Line Profiler", "line_profile", "show line hits and time in the gutter"
+        )
+        self.add_run_mode(
+            "Memory Tracking",
+            "memory",
+            "diff tracemalloc snapshots before and after the run, see Memory sidebar",
+        )
+        self.add_run_mode(
+            "Import Profiler",
+            "import_profile",
+            "time each import and show the tree of import costs, see Imports sidebar",
+        )
+        self.add_run_mode(
+            "maya.cmds Profiler",
+            "cmds_profile",
+            "count and time maya.cmds calls and suggest where to batch them",
+        )
+        self.add_run_mode(
+            "Fast",
+            "fast",
+            "suspend viewport refresh and record the run as one undo chunk",
+        )
+        self.add_run_mode(
+            "Fast (no undo)",
+            "fast_no_undo",
+            "suspend viewport refresh and turn undo off while running",
+        )
+        self.add_run_mode(
+            "Background",
+            "background",
+            "run on a worker thread, maya.cmds calls are sent to the main thread",
+        )
+        # where Run Current sends the code, this Maya or another session's commandPort
+        self.addWidget(QLabel("Target :"))
+        self.execution_target = QComboBox()
+        self.execution_target.setToolTip(
+            "run in this Maya or send to another Maya session's commandPort"
+        )
+        self.execution_target.addItem("This Maya", "")
+        self.execution_target.addItem("Add Target...", None)
+        self.execution_target.activated.connect(self.execution_target_activated)
+        self.addWidget(self.execution_target)
+        # progress and stop for background runs
+        self.background_progress = QProgressBar()
+        self.background_progress.setMaximumWidth(120)
+        self.background_progress.setVisible(False)
+        self.addWidget(self.background_progress)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setToolTip("stop the background run")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(parent.tool_bar_stop_clicked)
+        self.addWidget(self.stop_button)
         # add goto section
         self.addSeparator()
         label = QLabel("Goto :")
@@ -81,6 +147,72 @@ class EditorToolBar(QToolBar):
         )
         self.addWidget(self.quick_load_edit)
 
+    def add_run_mode(self, name: str, run_mode: str, tool_tip: str = "") -> QAction:
+        """Add a run mode to the Run Mode menu.
+
+        Parameters :
+        name (str) : text for the menu
+        run_mode (str) : the mode passed to the editor execute_code
+        tool_tip (str) : help for the mode
+        Returns : the action created
+        """
+        action = self.run_mode_menu.addAction(name)
+        action.setToolTip(tool_tip)
+        action.triggered.connect(lambda: self.parent.tool_bar_run_mode(run_mode))
+        return action
+
+    def add_execution_target(self, target: str) -> None:
+        """Add a commandPort target ("host:port") before the Add Target... item."""
+        if self.execution_target.findData(target) == -1:
+            index = self.execution_target.count() - 1
+            self.execution_target.insertItem(index, target, target)
+
+    def current_execution_target(self) -> str:
+        """The selected "host:port" or an empty string for this Maya."""
+        return self.execution_target.currentData() or ""
+
+    def execution_targets(self) -> List[str]:
+        return [
+            self.execution_target.itemData(index)
+            for index in range(1, self.execution_target.count() - 1)
+        ]
+
+    @Slot(int)
+    def execution_target_activated(self, index: int) -> None:
+        if self.execution_target.itemData(index) is not None:
+            return
+        target, ok = QInputDialog.getText(
+            self, "Add Target", "commandPort (host:port)", text="localhost:7002"
+        )
+        host, _, port = target.rpartition(":")
+        if ok and port.isdigit():
+            self.add_execution_target(target)
+            self.execution_target.setCurrentIndex(
+                self.execution_target.findData(target)
+            )
+            self.parent.tool_bar_execution_targets_changed(self.execution_targets())
+        else:
+            self.execution_target.setCurrentIndex(0)
+
+    @Slot()
+    def background_started(self) -> None:
+        self.stop_button.setEnabled(True)
+        self.background_progress.setVisible(True)
+
+    @Slot(int)
+    def set_background_progress(self, percent: int) -> None:
+        """Show percent done, -1 shows a busy indicator."""
+        if percent < 0:
+            self.background_progress.setRange(0, 0)
+        else:
+            self.background_progress.setRange(0, 100)
+            self.background_progress.setValue(percent)
+
+    @Slot(object)
+    def background_finished(self, result=None) -> None:
+        self.stop_button.setEnabled(False)
+        self.background_progress.setVisible(False)
+
     def quick_load(self) -> None:
         """Load the file from the quick load text edit."""
         filename = self.quick_load_edit.text()
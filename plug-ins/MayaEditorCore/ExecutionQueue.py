@@ -0,0 +1,112 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Queue which runs editor code one job at a time.
+
+Pressing F5 again or clicking Run Project while code is running used to start another run inside
+the first one. Runs are now submitted to the ExecutionQueue which starts each job from the event
+loop once the previous one has finished, so the UI updates and the editors can be used between
+jobs. Submitting a job identical to one still waiting (same editor, run mode and source) is
+ignored. The pending, active and recently finished jobs are shown in the Run Queue sidebar.
+"""
+import time
+from collections import deque, namedtuple
+from typing import Callable, Deque, List, Optional
+
+from PySide2.QtCore import *
+
+queue_job = namedtuple(
+    "QueueJob",
+    "job_id name key run state queued started wall error",
+    defaults=("pending", 0.0, 0.0, 0.0, False),
+)
+
+
+class ExecutionQueue(QObject):
+    """Serialises runs, jobs are callables run on the main thread."""
+
+    # emitted whenever a job is added, starts or finishes
+    changed = Signal()
+
+    def __init__(self, parent=None, history_size: int = 20):
+        """
+        Parameters :
+        parent (QObject) : parent object
+        history_size (int) : number of finished jobs kept for the sidebar
+        """
+        super().__init__(parent)
+        self.pending: Deque[queue_job] = deque()
+        self.active: Optional[queue_job] = None
+        self.finished: Deque[queue_job] = deque(maxlen=history_size)
+        self.next_id = 0
+
+    def submit(self, name: str, key: tuple, run: Callable[[], None]) -> int:
+        """Add a job to the queue.
+
+        Parameters :
+        name (str) : shown in the sidebar, normally the editor filename
+        key (tuple) : identifies identical runs, (filename, run mode, source hash)
+        run (callable) : does the run
+        Returns : the job id, or the id of the identical job already waiting
+        """
+        for job in self.pending:
+            if job.key == key:
+                return job.job_id
+        self.next_id += 1
+        self.pending.append(
+            queue_job(self.next_id, name, key, run, queued=time.perf_counter())
+        )
+        self.changed.emit()
+        if self.active is None:
+            QTimer.singleShot(0, self.run_next)
+        return self.next_id
+
+    def jobs(self) -> List[queue_job]:
+        """Finished jobs oldest first, then the active and pending jobs."""
+        jobs = list(self.finished)
+        if self.active is not None:
+            jobs.append(self.active)
+        return jobs + list(self.pending)
+
+    def cancel_pending(self) -> None:
+        self.pending.clear()
+        self.changed.emit()
+
+    @Slot()
+    def run_next(self) -> None:
+        # a job which processes events can get here while it is running
+        if self.active is not None or not self.pending:
+            return
+        job = self.pending.popleft()
+        started = time.perf_counter()
+        self.active = job._replace(state="running", started=started)
+        self.changed.emit()
+        error = True
+        try:
+            job.run()
+            error = False
+        finally:
+            self.finished.append(
+                self.active._replace(
+                    state="error" if error else "done",
+                    wall=time.perf_counter() - started,
+                    error=error,
+                    run=None,
+                )
+            )
+            self.active = None
+            self.changed.emit()
+            if self.pending:
+                # back to the event loop first so the UI can update
+                QTimer.singleShot(0, self.run_next)
@@ -0,0 +1,217 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Timing of code executed from the editors.
+
+Each run from an editor is wrapped in an ExecutionTimer which records the wall clock and CPU time
+plus the number of Maya output messages produced. The records are kept in the execution_history
+so they can be queried later to spot scripts getting slower.
+"""
+import hashlib
+import reprlib
+import time
+from collections import deque, namedtuple
+from typing import Any, Callable, Dict, List, Optional
+
+execution_record = namedtuple(
+    "ExecutionRecord",
+    "name language source_hash started wall cpu messages error cached mode",
+    defaults=(False, "normal"),
+)
+
+
+def source_hash(source: str) -> str:
+    """Hash used to identify the source that was run."""
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def format_footer(record: execution_record) -> str:
+    """Create the compact footer line shown in the output window after a run.
+
+    Parameters :
+    record (ExecutionRecord) : the record to format
+    Returns : the footer text
+    """
+    started = time.strftime("%H:%M:%S", time.localtime(record.started))
+    footer = (
+        f"[{started}] {record.name} ({record.language}) "
+        f"wall {record.wall:.3f}s cpu {record.cpu:.3f}s {record.messages} messages"
+    )
+    if record.mode != "normal":
+        footer += f" [{record.mode}]"
+    if record.cached:
+        footer += " (cached code)"
+    if record.error:
+        footer += " (error)"
+    return footer
+
+
+class ExecutionHistory:
+    """In memory history of the ExecutionRecords, oldest are dropped after max_size runs."""
+
+    def __init__(self, max_size: int = 1000):
+        self.records: deque = deque(maxlen=max_size)
+
+    def add(self, record: execution_record) -> None:
+        self.records.append(record)
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    def query(
+        self,
+        name: Optional[str] = None,
+        language: Optional[str] = None,
+        source_hash: Optional[str] = None,
+        errors: Optional[bool] = None,
+        mode: Optional[str] = None,
+    ) -> List[execution_record]:
+        """Find the records matching all of the parameters passed in, None matches anything.
+
+        Parameters :
+        name (str) : the filename of the editor
+        language (str) : python or mel
+        source_hash (str) : hash of the source run
+        errors (bool) : only runs that did / didn't raise
+        mode (str) : the run mode, normal, profile, fast etc.
+        Returns : list of records oldest first
+        """
+        return [
+            record
+            for record in self.records
+            if (name is None or record.name == name)
+            and (language is None or record.language == language)
+            and (source_hash is None or record.source_hash == source_hash)
+            and (errors is None or record.error == errors)
+            and (mode is None or record.mode == mode)
+        ]
+
+    def last(self, name: Optional[str] = None) -> Optional[execution_record]:
+        records = self.query(name=name)
+        return records[-1] if records else None
+
+    def slowest(self, count: int = 10) -> List[execution_record]:
+        records = sorted(self.records, key=lambda record: record.wall, reverse=True)
+        return records[:count]
+
+    def stats(self, name: str) -> Dict[str, float]:
+        """Get wall time stats for a script so a slow run stands out.
+
+        Parameters :
+        name (str) : the name of the editor / file
+        Returns : dictionary of runs, mean, min, max and last wall clock times
+        """
+        times = [record.wall for record in self.query(name=name, errors=False)]
+        if not times:
+            return {}
+        return {
+            "runs": len(times),
+            "mean": sum(times) / len(times),
+            "min": min(times),
+            "max": max(times),
+            "last": times[-1],
+        }
+
+
+execution_history = ExecutionHistory()
+
+
+class ExecutionTimer:
+    """Context manager to time a run and add it to the execution_history.
+
+    with ExecutionTimer("test.py", "python", text, on_finish=show_footer) as timer:
+        timer.set_result(eval(text))
+    """
+
+    # incremented by the EditorDialog message_callback for every Maya message
+    message_count = 0
+    # incremented by the CodeRunner code_cache when compiling is skipped
+    cache_hits = 0
+    # called with (record, source, result summary) after every run, set to the HistoryStore add
+    on_record: Optional[Callable[[execution_record, str, str], None]] = None
+
+    def __init__(
+        self,
+        name: str,
+        language: str,
+        source: str,
+        on_finish: Optional[Callable[[execution_record], None]] = None,
+        mode: str = "normal",
+    ):
+        """
+        Parameters :
+        name (str) : the filename of the editor being run
+        language (str) : python or mel
+        source (str) : the code being run
+        on_finish (callable) : called with the record when the run finishes even if it raised
+        mode (str) : the run mode used, so only like for like runs are compared
+        """
+        self.name = name
+        self.language = language
+        self.source = source
+        self.source_hash = source_hash(source)
+        self.result_summary = ""
+        # set for runs which report their own errors rather than raising
+        self.error = False
+        self.on_finish = on_finish
+        self.mode = mode
+        self.record: Optional[execution_record] = None
+
+    @classmethod
+    def count_message(cls) -> None:
+        cls.message_count += 1
+
+    @classmethod
+    def count_cache_hit(cls) -> None:
+        cls.cache_hits += 1
+
+    def set_result(self, value: Any) -> None:
+        """Keep a short repr of the value the run returned for the history."""
+        if value is not None:
+            self.result_summary = reprlib.repr(value)
+
+    def set_error(self) -> None:
+        """Record the run as failed even though no exception leaves the block."""
+        self.error = True
+
+    def __enter__(self) -> "ExecutionTimer":
+        self.started = time.time()
+        self.messages = ExecutionTimer.message_count
+        self.start_cache_hits = ExecutionTimer.cache_hits
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        self.record = execution_record(
+            name=self.name,
+            language=self.language,
+            source_hash=self.source_hash,
+            started=self.started,
+            wall=wall,
+            cpu=cpu,
+            messages=ExecutionTimer.message_count - self.messages,
+            error=self.error or exc_type is not None,
+            cached=ExecutionTimer.cache_hits > self.start_cache_hits,
+            mode=self.mode,
+        )
+        execution_history.add(self.record)
+        if ExecutionTimer.on_record is not None:
+            ExecutionTimer.on_record(self.record, self.source, self.result_summary)
+        if self.on_finish is not None:
+            self.on_finish(self.record)
+        # never swallow the exception
+        return False
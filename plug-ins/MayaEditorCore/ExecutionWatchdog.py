@@ -0,0 +1,219 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Watchdog for code running on the main thread.
+
+While editor code runs Maya's UI is frozen so a hung script can't be stopped from the editor. The
+ExecutionWatchdog runs a thread which samples the main thread's python stack every interval_ms,
+which also makes it a poor man's sampling profiler. Once the run is over limit seconds it reports
+the stall to the terminal, as the UI can't update. With auto_interrupt set (Interrupt runs over the
+limit in the Watchdog Settings) KeyboardInterrupt is raised in the main thread, otherwise
+StallPrompt.py is started with prompt_interpreter to ask whether to interrupt, as the editor can't
+show a dialog or see the Stop button while the main thread is stuck. interrupt() does the same from
+any thread. The sampled stacks are summarised when a run of a second or more finishes or is aborted.
+"""
+import ctypes
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+watchdog_settings = namedtuple(
+    "WatchdogSettings",
+    "enabled interval_ms limit auto_interrupt prompt_interpreter",
+    defaults=(False, 10, 30, False, ""),
+)
+
+# frames from the editor itself are left out of the samples
+_editor_folder = str(Path(__file__).parent)
+prompt_script = str(Path(__file__).parent / "StallPrompt.py")
+
+
+class ExecutionWatchdog:
+    """Context manager which watches the thread entering it.
+
+    with ExecutionWatchdog(settings, report=print):
+        run_code()
+    """
+
+    # the watchdog of the current run so the Stop button can interrupt it
+    active: Optional["ExecutionWatchdog"] = None
+
+    def __init__(
+        self,
+        settings: watchdog_settings,
+        report: Callable[[str], None],
+    ):
+        """
+        Parameters :
+        settings (WatchdogSettings) : sample interval, stall limit (seconds), auto interrupt and
+        the python used to ask whether to interrupt, no prompt is shown if it is empty
+        report (callable) : called with the summary text when the run finishes
+        """
+        self.settings = settings
+        self.report = report
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.interrupted = False
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = 0
+        self._outer_frames: set = set()
+        self._started = 0.0
+
+    def __enter__(self) -> "ExecutionWatchdog":
+        self._thread_id = threading.get_ident()
+        # frames already on the stack belong to the editor not the run
+        frame = sys._getframe()
+        while frame is not None:
+            self._outer_frames.add(id(frame))
+            frame = frame.f_back
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+        ExecutionWatchdog.active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        with self._lock:
+            self._stop.set()
+            if self.interrupted:
+                # the run may have finished, or raised something else, before the interrupt was
+                # delivered so cancel it rather than have it raised later in the editor
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._thread_id), None
+                )
+        self._thread.join()  # type: ignore
+        ExecutionWatchdog.active = None
+        elapsed = time.perf_counter() - self._started
+        if self.sample_count and (exc_type is not None or elapsed >= 1.0):
+            self.report(self.summary(elapsed))
+        # never swallow the exception
+        return False
+
+    @classmethod
+    def interrupt_active(cls) -> bool:
+        """Interrupt the current run if there is one, returns True if there was."""
+        watchdog = cls.active
+        if watchdog is None:
+            return False
+        watchdog.interrupt()
+        return True
+
+    def interrupt(self) -> None:
+        """Raise KeyboardInterrupt in the watched thread at the next bytecode boundary.
+
+        Code blocked inside a Maya command or other C code is interrupted once it returns.
+        """
+        with self._lock:
+            if self.interrupted or self._stop.is_set():
+                return
+            self.interrupted = True
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(self._thread_id), ctypes.py_object(KeyboardInterrupt)
+            )
+
+    def _watch(self) -> None:
+        interval = self.settings.interval_ms / 1000.0
+        reported = False
+        while not self._stop.wait(interval):
+            self._sample()
+            elapsed = time.perf_counter() - self._started
+            if not reported and elapsed > self.settings.limit:
+                reported = True
+                self._report_stall(elapsed)
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self._thread_id)
+        stack: List[Tuple[str, int, str]] = []
+        while frame is not None and id(frame) not in self._outer_frames:
+            code = frame.f_code
+            if not code.co_filename.startswith(_editor_folder):
+                stack.append((code.co_filename, frame.f_lineno, code.co_name))
+            frame = frame.f_back
+        if stack:
+            self.samples[tuple(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def _report_stall(self, elapsed: float) -> None:
+        # the editor can't update while the main thread is stuck so use the terminal too
+        if self.settings.auto_interrupt:
+            action = "interrupting"
+        elif self.settings.prompt_interpreter:
+            action = "asking whether to interrupt it"
+        else:
+            action = "turn on Interrupt runs over the limit in the Watchdog Settings to stop it"
+        sys.__stderr__.write(
+            f"MayaEditor watchdog : run has taken {elapsed:.1f}s, {action}\n"
+            + self.summary(elapsed, 3)
+            + "\n"
+        )
+        sys.__stderr__.flush()
+        if self.settings.auto_interrupt:
+            self.interrupt()
+        elif self.settings.prompt_interpreter:
+            self._offer_interrupt(elapsed)
+
+    def _offer_interrupt(self, elapsed: float) -> None:
+        """Ask in another process whether to interrupt, sampling carries on while it is open."""
+        try:
+            prompt = subprocess.Popen(
+                [self.settings.prompt_interpreter, prompt_script, f"{elapsed:.0f}"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as error:
+            sys.__stderr__.write(
+                f"MayaEditor watchdog : can't ask to interrupt : {error}\n"
+            )
+            return
+        interval = self.settings.interval_ms / 1000.0
+        while prompt.poll() is None and not self._stop.wait(interval):
+            self._sample()
+        if prompt.poll() is None:
+            # the run finished first so the question is no longer needed
+            prompt.terminate()
+            prompt.wait()
+        elif prompt.returncode == 0:
+            self.interrupt()
+
+    def summary(self, elapsed: float, count: int = 10) -> str:
+        """Summarise the samples as the hottest lines and stacks.
+
+        Parameters :
+        elapsed (float) : run time in seconds
+        count (int) : number of lines and stacks to show
+        Returns : the report text
+        """
+        lines: Counter = Counter()
+        for stack, hits in self.samples.items():
+            lines[stack[-1]] += hits
+        total = max(1, self.sample_count)
+        text = [
+            f"watchdog : {self.sample_count} samples every {self.settings.interval_ms}ms "
+            f"over {elapsed:.3f}s" + (" (interrupted)" if self.interrupted else "")
+        ]
+        text.append("hottest lines :")
+        for (filename, line, name), hits in lines.most_common(count):
+            text.append(f"{100.0 * hits / total:6.1f}% {filename}:{line} {name}")
+        text.append("hottest stacks :")
+        for stack, hits in self.samples.most_common(min(count, 5)):
+            frames = " > ".join(f"{name}:{line}" for _, line, name in stack)
+            text.append(f"{100.0 * hits / total:6.1f}% {frames}")
+        return "\n".join(text) + "\n"
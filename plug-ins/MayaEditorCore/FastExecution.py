@@ -0,0 +1,104 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Fast run mode for scripts which make lots of scene changes.
+
+The viewport refresh is suspended and every command goes into one undo chunk (so a single undo
+reverts the whole run), or undo is switched off completely. Maya's state is always restored even
+if the script raises.
+"""
+from typing import Optional
+
+import maya.cmds as cmds
+
+from .ExecutionTimer import execution_history, execution_record
+from .RunModes import fast_modes
+
+
+class FastExecution:
+    """Context manager to suspend refresh and chunk (or disable) undo.
+
+    with FastExecution(chunk_name="test.py"):
+        for i in range(10000):
+            cmds.polyCube()
+    """
+
+    def __init__(self, chunk_name: str = "", disable_undo: bool = False):
+        """
+        Parameters :
+        chunk_name (str) : name of the undo chunk shown in the undo queue
+        disable_undo (bool) : turn undo off rather than chunk it
+        """
+        self.chunk_name = chunk_name
+        self.disable_undo = disable_undo
+        self.undo_state = True
+        self.chunk_open = False
+        self.was_suspended = False
+
+    def __enter__(self) -> "FastExecution":
+        self.undo_state = cmds.undoInfo(query=True, state=True)
+        if self.disable_undo:
+            # stateWithoutFlush keeps the existing undo queue
+            cmds.undoInfo(stateWithoutFlush=False)
+        elif self.undo_state:
+            cmds.undoInfo(openChunk=True, chunkName=self.chunk_name)
+            self.chunk_open = True
+        try:
+            self.was_suspended = cmds.refresh(query=True, suspend=True)
+        except (RuntimeError, TypeError):
+            self.was_suspended = False
+        try:
+            cmds.refresh(suspend=True)
+        except BaseException:
+            # __exit__ isn't called if __enter__ raises so put undo back here
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        try:
+            cmds.refresh(suspend=self.was_suspended)
+            if not self.was_suspended:
+                cmds.refresh(force=True)
+        finally:
+            if self.chunk_open:
+                cmds.undoInfo(closeChunk=True)
+                self.chunk_open = False
+            if self.disable_undo:
+                cmds.undoInfo(stateWithoutFlush=self.undo_state)
+        # never swallow the exception
+        return False
+
+
+def fast_execution(run_mode: str, chunk_name: str) -> Optional[FastExecution]:
+    """Create the FastExecution for run_mode or None if it isn't a fast mode."""
+    if run_mode not in fast_modes:
+        return None
+    return FastExecution(chunk_name, disable_undo=run_mode == "fast_no_undo")
+
+
+def speedup(record: execution_record) -> str:
+    """Compare a fast run with the last normal run of the same source.
+
+    Parameters :
+    record (ExecutionRecord) : the record of the fast run
+    Returns : text for the timing footer, empty if there is no normal run to compare with
+    """
+    normal_runs = execution_history.query(
+        name=record.name, source_hash=record.source_hash, errors=False, mode="normal"
+    )
+    if not normal_runs or record.wall <= 0.0:
+        return ""
+    baseline = normal_runs[-1].wall
+    return f" {baseline / record.wall:.1f}x faster than normal run ({baseline:.3f}s)"
@@ -0,0 +1,238 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Run editor files without the UI, used by EditorStandalone.py --headless.
+
+Files are run the same way as from an editor, compiled with their filename through the CodeRunner
+code_cache into __main__ and timed with an ExecutionTimer, using the same profiling and fast run
+modes. Each file gives a json friendly dictionary of its timing, output, result and profile.
+"""
+import io
+import json
+import time
+import traceback
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import maya.api.OpenMaya as OpenMaya
+import maya.cmds as cmds
+import maya.mel as mel
+
+from .CmdsProfiler import CmdsProfiler, cmds_call_data
+from .CodeProfiler import CodeProfiler
+from .CodeRunner import execute_source
+from .ExecutionTimer import ExecutionTimer
+from .FastExecution import fast_execution
+from .ImportProfiler import ImportProfiler, import_data
+from .LineProfiler import LineProfiler
+from .MemoryTracker import MemoryTracker
+from .RunModes import fast_modes, run_modes
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Replace any workspace (.json) files with the files they contain.
+
+    Parameters :
+    paths (list) : editor files and / or workspace files
+    Returns : the list of files to run in order
+    """
+    files = []
+    for path in paths:
+        if path.endswith(".json"):
+            with open(path, "r") as workspace_file:
+                files.extend(json.load(workspace_file).get("files", []))
+        else:
+            files.append(path)
+    return files
+
+
+def hot_lines(filename: str, hits, times, count: int = 20) -> List[Dict[str, Any]]:
+    """The slowest lines from the LineProfiler arrays."""
+    lines = sorted(range(len(times)), key=lambda line: times[line], reverse=True)
+    return [
+        {
+            "filename": filename,
+            "line": line + 1,
+            "hits": hits[line],
+            "time": times[line],
+        }
+        for line in lines[:count]
+        if hits[line]
+    ]
+
+
+def run_file(filename: str, run_mode: str = "normal") -> Dict[str, Any]:
+    """Run one editor file and collect the results.
+
+    Parameters :
+    filename (str) : the python or mel file
+    run_mode (str) : one of run_modes, the profiling modes only apply to python
+    Returns : dictionary of the timing, output, result and any profile data
+    """
+    language = "mel" if filename.endswith(".mel") else "python"
+    result: Dict[str, Any] = {"file": filename, "language": language, "mode": run_mode}
+    try:
+        source = Path(filename).read_text()
+    except OSError as error:
+        result.update(error=True, traceback=str(error))
+        return result
+    stdout, stderr = io.StringIO(), io.StringIO()
+    profile: Dict[str, Any] = {}
+    timer = ExecutionTimer(filename, language, source, mode=run_mode)
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(redirect_stdout(stdout))
+            stack.enter_context(redirect_stderr(stderr))
+            stack.enter_context(timer)
+            if language == "python":
+                enter_profiler(stack, run_mode, filename, source, profile)
+            if run_mode in fast_modes:
+                stack.enter_context(fast_execution(run_mode, filename))
+            if language == "mel":
+                value = mel.eval(source)
+            else:
+                value = execute_source(source, filename)
+            timer.set_result(value)
+    except Exception:
+        result["traceback"] = traceback.format_exc()
+    record = timer.record
+    result.update(
+        wall=record.wall,
+        cpu=record.cpu,
+        messages=record.messages,
+        cached=record.cached,
+        error=record.error,
+        result=timer.result_summary,
+        stdout=stdout.getvalue(),
+        stderr=stderr.getvalue(),
+        source_hash=record.source_hash,
+    )
+    result.update(profile)
+    return result
+
+
+def import_json(data: import_data) -> Dict[str, Any]:
+    """The ImportProfiler tree as nested dictionaries."""
+    return dict(
+        data._asdict(), children=[import_json(child) for child in data.children]
+    )
+
+
+def cmds_call_json(data: cmds_call_data) -> Dict[str, Any]:
+    """The CmdsProfiler call data with the (filename, line) counts as a list."""
+    return dict(
+        data._asdict(),
+        lines=[
+            {"filename": filename, "line": line, "calls": calls}
+            for (filename, line), calls in data.lines.most_common()
+        ],
+    )
+
+
+def enter_profiler(
+    stack: ExitStack, run_mode: str, filename: str, source: str, profile: dict
+) -> None:
+    """Add the profiler for run_mode to the stack, results are stored in profile on exit."""
+    if run_mode == "profile":
+        stack.enter_context(
+            CodeProfiler(
+                lambda results: profile.update(
+                    profile=[data._asdict() for data in results]
+                )
+            )
+        )
+    elif run_mode == "line_profile":
+        stack.enter_context(
+            LineProfiler(
+                filename,
+                source.count("\n") + 1,
+                lambda hits, times: profile.update(
+                    line_profile=hot_lines(filename, hits, times)
+                ),
+            )
+        )
+    elif run_mode == "memory":
+        stack.enter_context(
+            MemoryTracker(
+                lambda results: profile.update(
+                    memory=[data._asdict() for data in results]
+                )
+            )
+        )
+    elif run_mode == "import_profile":
+        stack.enter_context(
+            ImportProfiler(
+                lambda results: profile.update(
+                    imports=[import_json(data) for data in results]
+                )
+            )
+        )
+    elif run_mode == "cmds_profile":
+        profiler: CmdsProfiler = CmdsProfiler(
+            lambda report: profile.update(
+                cmds_profile=[cmds_call_json(data) for data in profiler.results()],
+                suggestions=profiler.suggestions(),
+            )
+        )
+        stack.enter_context(profiler)
+
+
+def run_files(
+    paths: List[str],
+    run_mode: str = "normal",
+    scene: Optional[str] = None,
+    stop_on_error: bool = False,
+) -> Dict[str, Any]:
+    """Run the files (or workspaces) in order in this Maya session.
+
+    Parameters :
+    paths (list) : editor and / or workspace files
+    run_mode (str) : one of run_modes
+    scene (str) : optional scene to open first, if it can't be opened the error is reported as
+    scene_error and counted in errors
+    stop_on_error (bool) : don't run the remaining files once one (or the scene) has failed
+    Returns : dictionary with the maya version, total wall time and the result of each file
+    """
+    started = time.perf_counter()
+    report: Dict[str, Any] = {
+        "maya": cmds.about(version=True),
+        "mode": run_mode,
+        "scene": scene,
+        "results": [],
+    }
+    # count Maya messages like the editor does
+    callback_id = OpenMaya.MCommandMessage.addCommandOutputCallback(
+        lambda *args: ExecutionTimer.count_message()
+    )
+    try:
+        if scene:
+            try:
+                cmds.file(scene, open=True, force=True)
+            except Exception:
+                # still report (and unless stopping on errors run) the files
+                report["scene_error"] = traceback.format_exc()
+        if not (stop_on_error and "scene_error" in report):
+            for filename in expand_paths(paths):
+                result = run_file(filename, run_mode)
+                report["results"].append(result)
+                if stop_on_error and result["error"]:
+                    break
+    finally:
+        OpenMaya.MMessage.removeCallback(callback_id)
+    report["wall"] = time.perf_counter() - started
+    report["errors"] = sum(1 for result in report["results"] if result["error"])
+    if "scene_error" in report:
+        report["errors"] += 1
+    return report
@@ -0,0 +1,148 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Panel to search, re-run and diff the runs in the HistoryStore."""
+import time
+from typing import List
+
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+from PySide2.QtWidgets import *
+
+from .HistoryStore import HistoryStore, history_entry
+
+
+class HistoryPanel(QDialog):
+    """Searchable table of past runs with a preview of the source."""
+
+    columns = ["Started", "Name", "Language", "Mode", "Wall (s)", "Error", "Result"]
+
+    def __init__(self, editor_dialog, store: HistoryStore, parent=None):
+        """
+        Parameters :
+        editor_dialog (EditorDialogCore) : used to re-run entries and for the font
+        store (HistoryStore) : the history to show
+        parent (QWidget) : parent widget
+        """
+        super().__init__(parent)
+        self.editor_dialog = editor_dialog
+        self.store = store
+        self.entries: List[history_entry] = []
+        self.setWindowTitle("Execution History")
+        self.resize(900, 700)
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("search source, name or result")
+        self.search.setClearButtonEnabled(True)
+        # search after typing stops rather than on every key
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.update_table)
+        self.search.textChanged.connect(self.search_timer.start)
+        layout.addWidget(self.search)
+
+        splitter = QSplitter(Qt.Vertical)
+        self.table = QTableWidget(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.itemSelectionChanged.connect(self.selection_changed)
+        splitter.addWidget(self.table)
+        self.preview = QPlainTextEdit()
+        self.preview.setReadOnly(True)
+        self.preview.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.preview.setFont(editor_dialog.font)
+        splitter.addWidget(self.preview)
+        layout.addWidget(splitter)
+
+        buttons = QHBoxLayout()
+        self.summary = QLabel("")
+        buttons.addWidget(self.summary)
+        buttons.addStretch()
+        self.rerun_button = QPushButton("Re-run")
+        self.rerun_button.setToolTip("run the selected entry again")
+        self.rerun_button.clicked.connect(self.rerun)
+        buttons.addWidget(self.rerun_button)
+        self.diff_button = QPushButton("Diff")
+        self.diff_button.setToolTip(
+            "diff two selected entries, or one entry against the current editor"
+        )
+        self.diff_button.clicked.connect(self.diff)
+        buttons.addWidget(self.diff_button)
+        layout.addLayout(buttons)
+        self.update_table()
+
+    def update_table(self) -> None:
+        start = time.perf_counter()
+        self.entries = self.store.search(self.search.text())
+        self.table.setRowCount(len(self.entries))
+        for row, entry in enumerate(self.entries):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.started))
+            values = [
+                started,
+                entry.name,
+                entry.language,
+                entry.mode,
+                f"{entry.wall:.3f}",
+                "yes" if entry.error else "",
+                entry.result,
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.summary.setText(
+            f"{len(self.entries)} of {len(self.store.entries)} runs "
+            f"({len(self.store.offsets)} distinct sources) "
+            f"found in {time.perf_counter() - start:.3f}s"
+        )
+        self.selection_changed()
+
+    def selected_entries(self) -> List[history_entry]:
+        rows = sorted({index.row() for index in self.table.selectedIndexes()})
+        return [self.entries[row] for row in rows]
+
+    def selection_changed(self) -> None:
+        selected = self.selected_entries()
+        self.rerun_button.setEnabled(len(selected) == 1)
+        self.diff_button.setEnabled(len(selected) in (1, 2))
+        if len(selected) == 1:
+            self.preview.setPlainText(self.store.source(selected[0].source_hash) or "")
+        elif len(selected) == 2:
+            # table is newest first so diff from the older run
+            self.preview.setPlainText(self.store.diff(selected[1], selected[0]))
+        else:
+            self.preview.clear()
+
+    def rerun(self) -> None:
+        selected = self.selected_entries()
+        if len(selected) == 1:
+            entry = selected[0]
+            source = self.store.source(entry.source_hash)
+            if source is not None:
+                self.editor_dialog.rerun_history_entry(entry, source)
+                self.update_table()
+
+    def diff(self) -> None:
+        selected = self.selected_entries()
+        if len(selected) == 2:
+            self.preview.setPlainText(self.store.diff(selected[1], selected[0]))
+        elif len(selected) == 1:
+            editor = self.editor_dialog.ui.editor_tab.currentWidget()
+            self.preview.setPlainText(
+                self.store.diff_source(
+                    selected[0], editor.toPlainText(), f"{editor.filename} (editor)"
+                )
+            )
@@ -0,0 +1,221 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Persistent history of everything run from the editors.
+
+Two append only json lines files are kept in the store folder :
+
+runs.jsonl      one line per run (hash, name, language, mode, started, wall, cpu, error, result)
+sources.jsonl   one line per distinct source {"hash": ..., "source": ...}
+
+Sources are only written the first time a hash is seen so running the same file hundreds of times
+costs a few bytes a run. Source text isn't kept in memory, only the file offset of each source and
+a trigram index (built when the store is opened) used to narrow substring searches.
+"""
+import difflib
+import json
+import threading
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .ExecutionTimer import execution_record
+
+history_entry = namedtuple(
+    "HistoryEntry", "source_hash name language mode started wall cpu error result"
+)
+
+
+def trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[index : index + 3] for index in range(len(text) - 2)}
+
+
+class HistoryStore:
+    """Append only on disk store of runs and the de-duplicated sources."""
+
+    def __init__(self, folder: str):
+        """Open the store, creating the folder if needed.
+
+        Parameters :
+        folder (str) : where runs.jsonl and sources.jsonl are kept
+        """
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.runs_file = self.folder / "runs.jsonl"
+        self.sources_file = self.folder / "sources.jsonl"
+        self.entries: List[history_entry] = []
+        # source hash -> byte offset of the line in sources.jsonl
+        self.offsets: Dict[str, int] = {}
+        self.index: Dict[str, Set[str]] = {}
+        # a crash can leave a partly written last line, the next append starts a new line
+        self._sources_need_newline = False
+        self._runs_need_newline = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Read the runs and build the source offsets and search index."""
+        self.entries.clear()
+        self.offsets.clear()
+        self.index.clear()
+        self._sources_need_newline = self._runs_need_newline = False
+        if self.sources_file.is_file():
+            with open(self.sources_file, "rb") as sources:
+                offset = 0
+                for source_line in sources:
+                    self._sources_need_newline = not source_line.endswith(b"\n")
+                    try:
+                        source = json.loads(source_line)
+                        self._index_source(source["hash"], source["source"], offset)
+                    except (ValueError, KeyError):
+                        # partly written line from a crash
+                        pass
+                    offset += len(source_line)
+        if self.runs_file.is_file():
+            with open(self.runs_file, "r", encoding="utf-8") as runs:
+                for run_line in runs:
+                    self._runs_need_newline = not run_line.endswith("\n")
+                    try:
+                        self.entries.append(history_entry(**json.loads(run_line)))
+                    except (ValueError, TypeError):
+                        pass
+
+    def _index_source(self, hash: str, source: str, offset: int) -> None:
+        self.offsets[hash] = offset
+        for trigram in trigrams(source):
+            self.index.setdefault(trigram, set()).add(hash)
+
+    def add(self, record: execution_record, source: str, result: str = "") -> None:
+        """Add a run, used as the ExecutionTimer.on_record callback so may be called from any thread.
+
+        Parameters :
+        record (ExecutionRecord) : the timing record of the run
+        source (str) : the code that was run
+        result (str) : short summary of the value returned
+        """
+        entry = history_entry(
+            record.source_hash,
+            record.name,
+            record.language,
+            record.mode,
+            record.started,
+            record.wall,
+            record.cpu,
+            record.error,
+            result[:200],
+        )
+        with self._lock:
+            if entry.source_hash not in self.offsets:
+                with open(self.sources_file, "ab") as sources:
+                    if self._sources_need_newline:
+                        sources.write(b"\n")
+                        self._sources_need_newline = False
+                    offset = sources.tell()
+                    line = json.dumps({"hash": entry.source_hash, "source": source})
+                    sources.write(line.encode("utf-8") + b"\n")
+                self._index_source(entry.source_hash, source, offset)
+            with open(self.runs_file, "a", encoding="utf-8") as runs:
+                if self._runs_need_newline:
+                    runs.write("\n")
+                    self._runs_need_newline = False
+                runs.write(json.dumps(entry._asdict()) + "\n")
+            self.entries.append(entry)
+
+    def source(self, hash: str) -> Optional[str]:
+        """Read the source for a hash from disk, None if it isn't in the store."""
+        offset = self.offsets.get(hash)
+        if offset is None:
+            return None
+        with open(self.sources_file, "rb") as sources:
+            sources.seek(offset)
+            source: str = json.loads(sources.readline())["source"]
+        return source
+
+    def _read_sources(self, offsets: Dict[str, int]) -> Iterator[Tuple[str, str]]:
+        """Read the sources at the offsets in file order, opening sources.jsonl once."""
+        if not offsets:
+            return
+        with open(self.sources_file, "rb") as sources:
+            for hash, offset in sorted(offsets.items(), key=lambda item: item[1]):
+                sources.seek(offset)
+                try:
+                    yield hash, json.loads(sources.readline())["source"]
+                except (ValueError, KeyError):
+                    pass
+
+    def search(self, text: str = "", limit: int = 500) -> List[history_entry]:
+        """Find runs whose source, name or result contains text (case insensitive).
+
+        Parameters :
+        text (str) : the substring to find, empty matches everything
+        limit (int) : maximum number of entries
+        Returns : list of matching entries newest first
+        """
+        text = text.lower()
+        matching_sources: Optional[Set[str]] = None
+        # add() updates the index from the background thread, copy what is needed under the lock
+        with self._lock:
+            entries = list(self.entries)
+            if len(text) >= 3:
+                candidates = set.intersection(
+                    *[set(self.index.get(trigram, ())) for trigram in trigrams(text)]
+                )
+            else:
+                candidates = set(self.offsets) if text else set()
+            offsets = {hash: self.offsets[hash] for hash in candidates}
+        if text:
+            # the trigrams can all match without the text being in the source
+            matching_sources = {
+                hash
+                for hash, source in self._read_sources(offsets)
+                if text in source.lower()
+            }
+        found: List[history_entry] = []
+        for entry in reversed(entries):
+            if (
+                matching_sources is None
+                or entry.source_hash in matching_sources
+                or text in entry.name.lower()
+                or text in entry.result.lower()
+            ):
+                found.append(entry)
+                if len(found) == limit:
+                    break
+        return found
+
+    def diff(self, old: history_entry, new: history_entry) -> str:
+        """Unified diff of the sources of two entries."""
+        return self.diff_source(
+            old, self.source(new.source_hash) or "", f"{new.name} {new.source_hash[:8]}"
+        )
+
+    def diff_source(self, old: history_entry, source: str, name: str) -> str:
+        """Unified diff of the source of an entry against some other source.
+
+        Parameters :
+        old (HistoryEntry) : the entry to diff from
+        source (str) : the text to diff to, for example the current editor
+        name (str) : the name used for source in the diff header
+        Returns : the diff text
+        """
+        return "\n".join(
+            difflib.unified_diff(
+                (self.source(old.source_hash) or "").splitlines(),
+                source.splitlines(),
+                f"{old.name} {old.source_hash[:8]}",
+                name,
+                lineterm="",
+            )
+        )
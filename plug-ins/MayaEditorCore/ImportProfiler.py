@@ -0,0 +1,113 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Import time profiler for the Import Profiler run mode.
+
+Like python -X importtime, builtins.__import__ is replaced while the run is active so every import
+statement executed by the run (and the imports those modules do) is timed. The results are a tree
+of import_data with the cumulative and self time of each import. An import is flagged as new if it
+loaded modules which weren't in sys.modules, otherwise it was already cached in this session.
+Imports done with importlib.import_module don't use __import__ so aren't seen.
+"""
+import builtins
+import sys
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, List, Optional
+
+import_data = namedtuple(
+    "ImportData", "name cumulative self_time new_modules first_import children"
+)
+
+
+class ImportProfiler:
+    """Context manager which times the imports done by the thread entering it."""
+
+    def __init__(
+        self,
+        on_finish: Optional[Callable[[List[import_data]], None]] = None,
+        report: Optional[Callable[[str], None]] = None,
+        min_cached_time: float = 0.001,
+    ):
+        """
+        Parameters :
+        on_finish (callable) : called with the top level imports when the block exits
+        report (callable) : called with a one line summary of the totals
+        min_cached_time (float) : cached imports quicker than this (seconds) are left out
+        """
+        self.on_finish = on_finish
+        self.report = report
+        self.min_cached_time = min_cached_time
+        self.results: List[import_data] = []
+        # children of each import in progress, the first entry holds the top level imports
+        self._stack: List[List[import_data]] = [[]]
+        self._thread_id = 0
+        self._original_import: Callable = builtins.__import__
+
+    def __enter__(self) -> "ImportProfiler":
+        self._thread_id = threading.get_ident()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        builtins.__import__ = self._original_import
+        self.results = sorted(
+            self._stack[0], key=lambda data: data.cumulative, reverse=True
+        )
+        if self.report is not None:
+            total = sum(data.cumulative for data in self.results)
+            new_modules = sum(data.new_modules for data in self.results)
+            self.report(
+                f"import profile : {total * 1000.0:.1f}ms importing, "
+                f"{new_modules} modules loaded for the first time\n"
+            )
+        if self.on_finish is not None:
+            self.on_finish(self.results)
+        # never swallow the exception
+        return False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != self._thread_id:
+            return self._original_import(name, globals, locals, fromlist, level)
+        display_name = name
+        if level and globals:
+            # show relative imports with the package they are relative to
+            package = globals.get("__package__") or ""
+            display_name = "." * level + name + f" ({package})"
+        children: List[import_data] = []
+        self._stack.append(children)
+        module_count = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            self._stack.pop()
+            new_modules = len(sys.modules) - module_count
+            # modules loaded by this import rather than the imports inside it
+            own_modules = new_modules - sum(data.new_modules for data in children)
+            if own_modules > 0 or children or cumulative >= self.min_cached_time:
+                self._stack[-1].append(
+                    import_data(
+                        name=display_name,
+                        cumulative=cumulative,
+                        self_time=cumulative
+                        - sum(data.cumulative for data in children),
+                        new_modules=new_modules,
+                        first_import=own_modules > 0,
+                        children=children,
+                    )
+                )
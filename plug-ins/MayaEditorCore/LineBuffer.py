@@ -0,0 +1,55 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Line buffering shared by the output streams.
+
+Writes are often a single character and can come from any thread, so text is held until a newline
+and only complete lines are handed on. This has no Qt or Maya imports as WorkerMain.py runs it in
+a plain python process.
+"""
+import threading
+from typing import List
+
+
+class LineBuffer:
+    """Thread safe buffer which collects written text as complete lines."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # text written since the last newline
+        self._partial = ""
+        # complete lines not yet taken
+        self._lines: List[str] = []
+
+    def write(self, text: str) -> bool:
+        """Add text to the buffer, returns True if it completed at least one line."""
+        with self._lock:
+            lines, newline, self._partial = (self._partial + text).rpartition("\n")
+            if newline:
+                self._lines.append(lines + newline)
+        return bool(newline)
+
+    def flush(self) -> None:
+        """Treat any partial line as complete so the next take includes it."""
+        with self._lock:
+            if self._partial:
+                self._lines.append(self._partial)
+                self._partial = ""
+
+    def take(self) -> str:
+        """Remove and return all the complete lines as one string."""
+        with self._lock:
+            text = "".join(self._lines)
+            self._lines.clear()
+        return text
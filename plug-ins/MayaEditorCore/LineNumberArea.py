@@ -15,7 +15,7 @@
 
 from PySide2.QtCore import *
 from PySide2.QtGui import *
-from PySide2.QtWidgets import QWidget
+from PySide2.QtWidgets import QToolTip, QWidget
 
 
 # Based on the Qt Editor Demo
@@ -42,3 +42,14 @@ class LineNumberArea(QWidget):
         """Override the paint event to allow number drawing."""
         self.code_editor.lineNumberAreaPaintEvent(event)
 
+    def event(self, event: QEvent) -> bool:
+        """Show the line profiler results for the line as a tooltip."""
+        if event.type() == QEvent.ToolTip:
+            text = self.code_editor.line_heat_tooltip(event.pos())
+            if text:
+                QToolTip.showText(event.globalPos(), text)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
@@ -0,0 +1,88 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Line level profiler for the code in an editor.
+
+Only frames whose code was compiled from the editor (matched by filename) get a line tracer, every
+other call returns straight away from the global trace function which keeps the overhead low.
+Results are stored in two arrays indexed by block (line) number so they can be drawn in the
+LineNumberArea.
+"""
+import sys
+import time
+from array import array
+from typing import Callable, Dict, Optional
+
+
+class LineProfiler:
+    """Context manager which counts hits and cumulative time for each line of an editor."""
+
+    def __init__(
+        self,
+        filename: str,
+        line_count: int,
+        on_finish: Optional[Callable[[array, array], None]] = None,
+    ):
+        """
+        Parameters :
+        filename (str) : the filename the editor code is compiled with
+        line_count (int) : number of lines in the editor
+        on_finish (callable) : called with the (hits, times) arrays when the block exits
+        """
+        self.filename = filename
+        self.hits = array("L", [0] * line_count)
+        self.times = array("d", [0.0] * line_count)
+        self.on_finish = on_finish
+        # frame : (line number, time the line started)
+        self._current: Dict = {}
+        self._old_trace = None
+
+    def __enter__(self) -> "LineProfiler":
+        self._old_trace = sys.gettrace()
+        sys.settrace(self._trace_calls)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        sys.settrace(self._old_trace)
+        self._current.clear()
+        if self.on_finish is not None:
+            self.on_finish(self.hits, self.times)
+        return False
+
+    def _trace_calls(self, frame, event, arg):
+        """Global trace function, only trace frames from our editor."""
+        if frame.f_code.co_filename == self.filename:
+            return self._trace_lines
+        return None
+
+    def _charge(self, frame, now: float) -> None:
+        """Add the time since the last line event in frame to that line."""
+        last = self._current.get(frame)
+        if last is not None:
+            line, started = last
+            if 0 < line <= len(self.times):
+                self.times[line - 1] += now - started
+
+    def _trace_lines(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == "line":
+            self._charge(frame, now)
+            line = frame.f_lineno
+            if 0 < line <= len(self.hits):
+                self.hits[line - 1] += 1
+            self._current[frame] = (line, now)
+        elif event == "return":
+            self._charge(frame, now)
+            self._current.pop(frame, None)
+        return self._trace_lines
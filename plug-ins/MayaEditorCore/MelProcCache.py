@@ -0,0 +1,133 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Only re-source the MEL procs which have changed.
+
+Running a large MEL file makes Maya parse and define every proc in it again. With proc caching on
+the top level proc definitions are split out and hashed, only procs which are new or have changed
+since they were last defined in this session are sent to mel.eval, then the remaining top level
+statements are run. Procs are global to the Maya session so the cache is shared by all editors.
+"""
+import re
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ExecutionTimer import source_hash
+
+mel_proc = namedtuple("MelProc", "name start end source")
+proc_report = namedtuple("ProcReport", "sourced skipped")
+
+_proc_start = re.compile(r"(?<![\w$])(global\s+)?proc\b")
+_proc_name = re.compile(r"([A-Za-z_]\w*)\s*\(")
+
+
+def _skip_literal(text: str, index: int) -> int:
+    """If a string or comment starts at index return the index after it, else index."""
+    if text.startswith("//", index):
+        end = text.find("\n", index)
+        return len(text) if end == -1 else end
+    if text.startswith("/*", index):
+        end = text.find("*/", index + 2)
+        return len(text) if end == -1 else end + 2
+    if text[index] == '"':
+        index += 1
+        while index < len(text) and text[index] != '"':
+            index += 2 if text[index] == "\\" else 1
+        return index + 1
+    return index
+
+
+def split_procs(text: str) -> Tuple[List[mel_proc], str]:
+    """Split MEL source into its top level proc definitions and the other statements.
+
+    Parameters :
+    text (str) : the MEL source
+    Returns : (procs, statements) where statements is the source with the procs replaced by
+    blank lines so line numbers stay the same
+    """
+    procs: List[mel_proc] = []
+    depth = 0
+    proc_start: Optional[int] = None
+    index = 0
+    while index < len(text):
+        skipped = _skip_literal(text, index)
+        if skipped != index:
+            index = skipped
+            continue
+        char = text[index]
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0 and proc_start is not None:
+                source = text[proc_start : index + 1]
+                match = _proc_name.search(source)
+                if match is not None:
+                    procs.append(
+                        mel_proc(match.group(1), proc_start, index + 1, source)
+                    )
+                proc_start = None
+        elif depth == 0 and proc_start is None and char in "gp":
+            match = _proc_start.match(text, index)
+            if match is not None:
+                proc_start = index
+                index = match.end()
+                continue
+        index += 1
+    statements = []
+    previous = 0
+    for proc in procs:
+        statements.append(text[previous : proc.start])
+        statements.append("\n" * proc.source.count("\n"))
+        previous = proc.end
+    statements.append(text[previous:])
+    return procs, "".join(statements)
+
+
+class MelProcCache:
+    """Hash of the source of each proc defined in this session, keyed by proc name."""
+
+    def __init__(self):
+        self.hashes: Dict[str, str] = {}
+
+    def run(
+        self, text: str, evaluate: Callable[[str], object]
+    ) -> Tuple[object, proc_report]:
+        """Define the changed procs then run the rest of text.
+
+        Parameters :
+        text (str) : the MEL source
+        evaluate (callable) : mel.eval
+        Returns : (value of the top level statements, ProcReport of procs sourced and skipped)
+        """
+        procs, statements = split_procs(text)
+        sourced = skipped = 0
+        for proc in procs:
+            proc_hash = source_hash(proc.source)
+            if self.hashes.get(proc.name) == proc_hash:
+                skipped += 1
+                continue
+            # forget the proc first so it is sourced again next time if this fails
+            self.hashes.pop(proc.name, None)
+            evaluate(proc.source)
+            self.hashes[proc.name] = proc_hash
+            sourced += 1
+        value = evaluate(statements) if statements.strip() else None
+        return value, proc_report(sourced, skipped)
+
+    def clear(self) -> None:
+        self.hashes.clear()
+
+
+proc_cache = MelProcCache()
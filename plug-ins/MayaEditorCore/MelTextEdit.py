@@ -30,8 +30,14 @@ from PySide2.QtWidgets import (
     QWidget,
 )
 
+from .CodeCells import cell_markers, code_cell
+from .ExecutionTimer import ExecutionTimer
+from .FastExecution import FastExecution
+
 # from .LineNumberArea import LineNumberArea
 from .MelHighlighter import MelHighlighter
+from .MelProcCache import proc_cache
+from .OutputFormats import timing_message
 from .TextEdit import TextEdit
 
 
@@ -45,6 +51,8 @@ class MelTextEdit(TextEdit):
 
     code_model_changed = Signal()
     code_model_data = namedtuple("CodeModel", "scope line_number function_name")
+    cell_marker = cell_markers["mel"]
+    language = "mel"
 
     def __init__(
         self,
@@ -70,6 +78,9 @@ class MelTextEdit(TextEdit):
         self.highlighter.setDocument(self.document())
         self.execute_selected = False
         self.live = live
+        # only re-source procs changed since the last run, see MelProcCache
+        self.cache_procs = False
+        self.cell_runner = self.run_cell_source
         self.copyAvailable.connect(self.selection_changed)
         self.code_model = list()
         self.generate_code_model()
@@ -149,21 +160,51 @@ class MelTextEdit(TextEdit):
             text = text.replace("\u2029", "\n")
             if self.live:
                 self.update_output.emit(self.toPlainText() + "\n")
-
-            value = mel.eval(text)
-            if self.live and value != None:
-                value = str(value) + "\n"
-                self.update_output_html.emit(value)
         else:
-            text_to_run = self.toPlainText()
+            text = self.toPlainText()
             if self.live:
-                self.update_output.emit(text_to_run)
+                self.update_output.emit(text)
                 self.clear()
-            value = mel.eval(text_to_run)
-            # if we are a live window clear the editor
-            if self.live and value != None:
-                value = str(value)
-                self.update_output.emit(value)
+        run_mode = "fast" if self.fast_mode else "normal"
+        self.queue_run(text, run_mode, lambda: self.run_and_show(text))
+
+    def run_and_show(self, text: str) -> None:
+        value = self.run_mel(text)
+        # if we are a live window output the results
+        if self.live and value != None:
+            self.show_result(value)
+
+    def run_mel(self, text: str) -> Any:
+        """Time and run the mel, in one undo chunk with refresh suspended if fast_mode is set."""
+        run_mode = "fast" if self.fast_mode else "normal"
+        with ExecutionTimer(
+            self.filename, "mel", text, self.show_timing, run_mode
+        ) as timer:
+            if self.fast_mode:
+                with FastExecution(self.filename):
+                    value = self.evaluate(text)
+            else:
+                value = self.evaluate(text)
+            timer.set_result(value)
+        return value
+
+    def evaluate(self, text: str) -> Any:
+        """mel.eval the text, with cache_procs set unchanged procs aren't sourced again."""
+        if not self.cache_procs:
+            return mel.eval(text)
+        value, report = proc_cache.run(text, mel.eval)
+        if report.sourced or report.skipped:
+            self.update_output_message.emit(
+                f"mel procs : {report.sourced} sourced, {report.skipped} unchanged skipped",
+                timing_message,
+            )
+        return value
+
+    def run_cell_source(self, cell: code_cell) -> Any:
+        if self.fast_mode:
+            with FastExecution(self.filename):
+                return mel.eval(cell.source)
+        return mel.eval(cell.source)
 
     def selection_changed(self, state):
         """Signal called when text is selected.
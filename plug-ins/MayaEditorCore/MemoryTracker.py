@@ -0,0 +1,118 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""tracemalloc support for the Memory Tracking run mode.
+
+A snapshot is taken before and after the run and the difference grouped by file:line, so what is
+left is memory the script allocated and didn't free (caches, globals, callbacks etc.). The results
+are displayed in the Memory sidebar model.
+"""
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable, List, Optional
+
+memory_data = namedtuple(
+    "MemoryData", "filename line_number size_diff count_diff size count"
+)
+
+# allocations from the editor, tracemalloc itself and the import machinery are noise
+_filters = [
+    tracemalloc.Filter(False, str(Path(__file__).parent / "*")),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class MemoryTracker:
+    """Context manager to find the memory a block of code allocated and kept."""
+
+    def __init__(
+        self,
+        on_finish: Optional[Callable[[List[memory_data]], None]] = None,
+        report: Optional[Callable[[str], None]] = None,
+        count: int = 100,
+    ):
+        """
+        Parameters :
+        on_finish (callable) : called with the top allocation sites when the block exits
+        report (callable) : called with a one line summary of the totals
+        count (int) : how many allocation sites to keep
+        """
+        self.on_finish = on_finish
+        self.report = report
+        self.count = count
+        self.results: List[memory_data] = []
+        self._started_tracing = False
+        self._before: Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> "MemoryTracker":
+        # tracing slows python down a lot so only trace while the block runs
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot().filter_traces(_filters)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        after = tracemalloc.take_snapshot().filter_traces(_filters)
+        _, peak = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+        differences = after.compare_to(self._before, "lineno")
+        self.results = self.top_allocations(differences, self.count)
+        if self.report is not None:
+            size = sum(stat.size_diff for stat in differences)
+            count = sum(stat.count_diff for stat in differences)
+            self.report(
+                f"memory tracking : {size / 1024:+.1f} KiB in {count:+d} blocks kept, "
+                f"peak {peak / 1024:.1f} KiB traced\n"
+            )
+        if self.on_finish is not None:
+            self.on_finish(self.results)
+        # never swallow the exception
+        return False
+
+    @staticmethod
+    def top_allocations(
+        differences: List[tracemalloc.StatisticDiff], count: int = 100
+    ) -> List[memory_data]:
+        """Get the allocation sites which grew the most.
+
+        Parameters :
+        differences (list) : the snapshot comparison grouped by lineno
+        count (int) : maximum number of sites to return
+        Returns : list of memory_data sorted by size difference
+        """
+        results = []
+        for stat in differences:
+            if stat.size_diff == 0 and stat.count_diff == 0:
+                continue
+            frame = stat.traceback[0]
+            results.append(
+                memory_data(
+                    filename=frame.filename,
+                    line_number=frame.lineno,
+                    size_diff=stat.size_diff,
+                    count_diff=stat.count_diff,
+                    size=stat.size,
+                    count=stat.count,
+                )
+            )
+        results.sort(key=lambda data: abs(data.size_diff), reverse=True)
+        return results[:count]
@@ -0,0 +1,239 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Reload only the modules which changed since the last run.
+
+Modules loaded from files under the workspace roots are tracked with their file mtime and the
+modules they import (found by parsing the source with ast, so nothing is executed). Before a run
+the changed modules and every module that depends on them are reloaded, dependencies first, so
+a package is picked up without deleting everything from sys.modules and importing it all again.
+
+The mtime a module is compared against is the one it had when it was imported. After each run
+snapshot() records the modules the run imported, and a module imported some other way is checked
+against the source mtime stored in its .pyc when it was compiled.
+"""
+import ast
+import importlib
+import importlib.util
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+reload_report = namedtuple("ReloadReport", "modules errors elapsed")
+
+
+class ModuleReloader:
+    """Tracks modules under the workspace roots and reloads the changed ones."""
+
+    def __init__(self, exclude: Iterable[str] = ("MayaEditorCore",)):
+        """
+        Parameters :
+        exclude (iterable) : top level packages never reloaded (the editor itself)
+        """
+        self.roots: List[Path] = []
+        self.exclude = set(exclude)
+        # module name -> mtime of the file when last loaded / reloaded
+        self.mtimes: Dict[str, float] = {}
+        # module name -> (mtime parsed at, names imported)
+        self._imports: Dict[str, Tuple[float, Set[str]]] = {}
+
+    def set_roots(self, roots: Iterable[str]) -> None:
+        """Set the directories whose modules are tracked, usually the workspace file folders."""
+        self.roots = sorted({Path(root).resolve() for root in roots if root})
+
+    def tracked_modules(self) -> Dict[str, Path]:
+        """Find the loaded modules with a source file under one of the roots."""
+        modules: Dict[str, Path] = {}
+        if not self.roots:
+            return modules
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, "__file__", None)
+            if not filename or name.split(".")[0] in self.exclude:
+                continue
+            path = Path(filename)
+            if path.suffix != ".py":
+                continue
+            path = path.resolve()
+            if any(root == path.parent or root in path.parents for root in self.roots):
+                modules[name] = path
+        return modules
+
+    def imports_of(self, name: str, path: Path, mtime: float) -> Set[str]:
+        """The names imported by the module, cached until the file changes.
+
+        Parameters :
+        name (str) : the module name, used to resolve relative imports
+        path (Path) : the module source file
+        mtime (float) : the file mtime, used as the cache key
+        Returns : set of absolute module names, may include names which aren't modules
+        """
+        cached = self._imports.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        names: Set[str] = set()
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"), str(path))
+        except (OSError, SyntaxError, ValueError):
+            tree = ast.Module(body=[], type_ignores=[])
+        package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    parts = package.split(".")
+                    parent = ".".join(parts[: len(parts) - node.level + 1])
+                    base = f"{parent}.{base}" if base else parent
+                names.add(base)
+                # from package import submodule
+                names.update(f"{base}.{alias.name}" for alias in node.names)
+        self._imports[name] = (mtime, names)
+        return names
+
+    def snapshot(self) -> None:
+        """Record the mtime of tracked modules not seen before, call after each run.
+
+        The modules a run imported are recorded straight after it so an edit made before the
+        next run is seen as a change.
+        """
+        for name, path in self.tracked_modules().items():
+            if name not in self.mtimes:
+                try:
+                    self.mtimes[name] = path.stat().st_mtime
+                except OSError:
+                    pass
+
+    @staticmethod
+    def compiled_mtime(name: str) -> Optional[int]:
+        """The source mtime stored in the module's .pyc when it was compiled, if known."""
+        spec = getattr(sys.modules.get(name), "__spec__", None)
+        cached = getattr(spec, "cached", None)
+        if not cached or sys.dont_write_bytecode:
+            return None
+        try:
+            with open(cached, "rb") as pyc:
+                header = pyc.read(16)
+        except OSError:
+            return None
+        # magic number, flags (0 for timestamp based pycs), source mtime, source size
+        if (
+            len(header) < 16
+            or header[:4] != importlib.util.MAGIC_NUMBER
+            or int.from_bytes(header[4:8], "little") != 0
+        ):
+            return None
+        return int.from_bytes(header[8:12], "little")
+
+    def changed_modules(self) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """Find the changed modules and the dependency graph of the tracked modules.
+
+        Modules not seen by snapshot() are changed if their file is newer than the source their
+        .pyc was compiled from, without a .pyc they are recorded as unchanged.
+        Returns : the changed module names and a dict of module -> tracked modules it imports
+        """
+        modules = self.tracked_modules()
+        changed: Set[str] = set()
+        graph: Dict[str, Set[str]] = {}
+        for name, path in modules.items():
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if name not in self.mtimes:
+                compiled = self.compiled_mtime(name)
+                if compiled is not None and compiled != int(mtime) & 0xFFFFFFFF:
+                    changed.add(name)
+                else:
+                    self.mtimes[name] = mtime
+            elif self.mtimes[name] != mtime:
+                changed.add(name)
+            imported = self.imports_of(name, path, mtime)
+            graph[name] = {dep for dep in imported if dep in modules and dep != name}
+        return changed, graph
+
+    @staticmethod
+    def reload_order(changed: Set[str], graph: Dict[str, Set[str]]) -> List[str]:
+        """The changed modules and their dependents ordered so dependencies reload first.
+
+        Parameters :
+        changed (set) : the modules whose files changed
+        graph (dict) : module -> modules it imports
+        Returns : list of module names, any import cycles are reloaded in name order
+        """
+        dependents: Dict[str, Set[str]] = {name: set() for name in graph}
+        for name, deps in graph.items():
+            for dep in deps:
+                dependents[dep].add(name)
+        affected = set()
+        stack = list(changed)
+        while stack:
+            name = stack.pop()
+            if name not in affected:
+                affected.add(name)
+                stack.extend(dependents.get(name, ()))
+        # Kahn's algorithm over the affected sub graph
+        waiting = {name: graph.get(name, set()) & affected for name in affected}
+        order: List[str] = []
+        ready = sorted(name for name, deps in waiting.items() if not deps)
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            del waiting[name]
+            for dependent in sorted(dependents.get(name, ())):
+                if dependent in waiting:
+                    waiting[dependent].discard(name)
+                    if not waiting[dependent] and dependent not in ready:
+                        ready.append(dependent)
+        return order + sorted(waiting)
+
+    def reload_changed(self) -> Optional[reload_report]:
+        """Reload the changed modules and their dependents.
+
+        Returns : a reload_report or None if nothing had changed
+        """
+        start = time.perf_counter()
+        changed, graph = self.changed_modules()
+        if not changed:
+            return None
+        reloaded: List[str] = []
+        errors: List[str] = []
+        for name in self.reload_order(changed, graph):
+            module = sys.modules.get(name)
+            if module is None:
+                continue
+            try:
+                importlib.reload(module)
+                reloaded.append(name)
+            except Exception as error:
+                errors.append(f"{name} : {error!r}")
+            # record the mtime even on error so a broken file isn't retried every run
+            try:
+                self.mtimes[name] = Path(module.__file__).stat().st_mtime
+            except (OSError, TypeError):
+                self.mtimes.pop(name, None)
+        return reload_report(reloaded, errors, time.perf_counter() - start)
+
+
+def format_report(report: reload_report) -> str:
+    """Create the output window line for a reload_report."""
+    text = (
+        f"reloaded {len(report.modules)} modules in {report.elapsed:.3f}s : "
+        + ", ".join(report.modules)
+    )
+    if report.errors:
+        text += "\nreload failed " + "\n".join(report.errors)
+    return text
@@ -0,0 +1,112 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Capture of stdout / stderr while editor code is running.
+
+The code runs on the main thread so the output window can't update until it finishes. We buffer
+the writes and every interval seconds send all the complete lines as one batch then let Qt
+process paint events so the output appears while the script is still running.
+"""
+import io
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Tuple
+
+from PySide2.QtCore import QCoreApplication, QEventLoop
+
+from .LineBuffer import LineBuffer
+
+
+class BufferedOutputStream(io.TextIOBase):
+    """Thread safe line buffered stream which sends batches of lines to a callable."""
+
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        interval: float = 0.1,
+        process_events: bool = True,
+    ):
+        """
+        Parameters :
+        emit (callable) : called with the batched text, always on the main thread
+        interval (float) : minimum time in seconds between batches
+        process_events (bool) : let Qt repaint after each batch
+        """
+        super().__init__()
+        self.emit = emit
+        self.interval = interval
+        self.process_events = process_events
+        self._buffer = LineBuffer()
+        self._last_flush = time.perf_counter()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        newline = self._buffer.write(text)
+        # only the main thread can update the output, other threads wait for the next batch
+        if (
+            newline
+            and threading.current_thread() is threading.main_thread()
+            and time.perf_counter() - self._last_flush > self.interval
+        ):
+            self.send_lines()
+        return len(text)
+
+    def flush(self) -> None:
+        """Queue any partial line so it goes out with the next batch."""
+        self._buffer.flush()
+
+    def send_lines(self) -> None:
+        """Send everything queued as a single batch."""
+        text = self._buffer.take()
+        self._last_flush = time.perf_counter()
+        if text:
+            self.emit(text)
+            if self.process_events:
+                # user input is excluded so we can't re-enter the editor while running
+                QCoreApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+
+    def close(self) -> None:
+        self.flush()
+        self.send_lines()
+        super().close()
+
+
+@contextmanager
+def capture_output(
+    stdout_emit: Callable[[str], None],
+    stderr_emit: Callable[[str], None],
+    interval: float = 0.1,
+) -> Iterator[Tuple[BufferedOutputStream, BufferedOutputStream]]:
+    """Redirect stdout and stderr to BufferedOutputStreams for the duration of the block.
+
+    Parameters :
+    stdout_emit (callable) : receives batches of stdout text
+    stderr_emit (callable) : receives batches of stderr text
+    interval (float) : minimum time in seconds between batches
+    """
+    stdout = BufferedOutputStream(stdout_emit, interval)
+    stderr = BufferedOutputStream(stderr_emit, interval)
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        yield stdout, stderr
+    finally:
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+        # send anything left over
+        stdout.close()
+        stderr.close()
@@ -0,0 +1,61 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Cached text formats for the output window.
+
+Maya sends a lot of messages to the output window, building HTML for each one means Qt has to run
+its HTML parser for every line. Instead we create a QTextCharFormat once per message type and
+insert plain text with it, which is much cheaper.
+"""
+from typing import Dict, Tuple
+
+import maya.api.OpenMaya as OpenMaya
+from PySide2.QtGui import QBrush, QColor, QTextCharFormat
+
+
+def _create_format(style_colour: str) -> QTextCharFormat:
+    colour = QColor()
+    colour.setNamedColor(style_colour)
+    new_format = QTextCharFormat()
+    new_format.setForeground(QBrush(colour))
+    return new_format
+
+
+# not a Maya message type, used for the timing footer after a run
+timing_message = -1
+
+# message type : (prefix, format) these match the old html colours used in the message_callback
+message_formats: Dict[int, Tuple[str, QTextCharFormat]] = {
+    OpenMaya.MCommandMessage.kHistory: ("History : ", _create_format("lightblue")),
+    OpenMaya.MCommandMessage.kDisplay: ("", _create_format("yellow")),
+    OpenMaya.MCommandMessage.kInfo: ("Info : ", _create_format("white")),
+    OpenMaya.MCommandMessage.kWarning: ("Warning : ", _create_format("green")),
+    OpenMaya.MCommandMessage.kError: ("Error : ", _create_format("red")),
+    OpenMaya.MCommandMessage.kResult: ("Result :", _create_format("lightblue")),
+    timing_message: ("", _create_format("gray")),
+}
+
+default_format: Tuple[str, QTextCharFormat] = ("", _create_format("white"))
+# used for the ×N counter on repeated messages
+repeat_format = _create_format("darkgray")
+
+
+def message_format(mtype: int) -> Tuple[str, QTextCharFormat]:
+    """Get the prefix and cached format for a Maya message type.
+
+    Parameters :
+    mtype (int) : the MCommandMessage type
+    Returns : (prefix, QTextCharFormat) to use when inserting the message
+    """
+    return message_formats.get(mtype, default_format)
@@ -0,0 +1,175 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Console mode for the Python live window.
+
+Each cell entered is split into top level statements which are compiled and run one at a time in
+the persistent Maya __main__ namespace, like code.InteractiveConsole. If the last statement is an
+expression its value is echoed with a size capped repr and stored in _ . __future__ imports carry
+over to later cells. The console keeps its own input history and a bounded scrollback of cells and
+results, so only the newly entered cell is run and rendered.
+"""
+import __future__
+import __main__
+import ast
+import codeop
+import reprlib
+import sys
+import traceback
+from collections import deque, namedtuple
+from functools import reduce
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+console_cell = namedtuple("ConsoleCell", "source result error")
+
+_future_flags = reduce(
+    lambda flags, name: flags | getattr(__future__, name).compiler_flag,
+    __future__.all_feature_names,
+    0,
+)
+
+# repr used to echo values, big containers and strings are cut short
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = 50
+_repr.maxstring = _repr.maxother = 2000
+
+
+def short_repr(value: Any, limit: int = 4000) -> str:
+    """repr of the value with containers, strings and the total length capped."""
+    text = _repr.repr(value)
+    if len(text) > limit:
+        text = text[:limit] + "..."
+    return text
+
+
+class ConsoleSession:
+    """Incremental compile and run of console cells."""
+
+    def __init__(
+        self,
+        write_error: Callable[[str], None],
+        history_size: int = 500,
+    ):
+        """
+        Parameters :
+        write_error (callable) : used to show tracebacks
+        history_size (int) : number of cells kept in the input history and scrollback
+        """
+        self.write_error = write_error
+        self.flags = 0
+        self.history: Deque[str] = deque(maxlen=history_size)
+        self.scrollback: Deque[console_cell] = deque(maxlen=history_size)
+        self.history_index = 0
+
+    @staticmethod
+    def is_incomplete(source: str) -> bool:
+        """True if source needs more lines, for example an unfinished def or open bracket."""
+        try:
+            return codeop.compile_command(source, "<console>", "exec") is None
+        except (SyntaxError, ValueError, OverflowError):
+            # let run_cell report the error
+            return False
+
+    @staticmethod
+    def prompt(source: str) -> str:
+        """The cell as echoed to the output window with >>> and ... prompts."""
+        lines = source.rstrip("\n").split("\n")
+        return (
+            "\n".join(
+                (">>> " if index == 0 else "... ") + line
+                for index, line in enumerate(lines)
+            )
+            + "\n"
+        )
+
+    def _compile(self, node: ast.AST, filename: str, mode: str):
+        code = compile(node, filename, mode, self.flags, True)
+        # keep any __future__ features for later statements and cells
+        self.flags |= code.co_flags & _future_flags
+        return code
+
+    def run_cell(
+        self, source: str, filename: str, first_line: int = 1
+    ) -> Tuple[Any, bool]:
+        """Run each statement of the cell in __main__, returning the last expression's value.
+
+        Parameters :
+        source (str) : the cell text
+        filename (str) : used for tracebacks
+        first_line (int) : the editor line the cell starts at
+        Returns : (value, error) the value of a trailing expression or None, and True if a
+        statement raised, the traceback has already been written with write_error. The cell and
+        the short_repr of the value are added to the scrollback
+        """
+        self.add_history(source)
+        namespace = __main__.__dict__
+        value = None
+        error = False
+        try:
+            tree = compile(
+                "\n" * (first_line - 1) + source,
+                filename,
+                "exec",
+                ast.PyCF_ONLY_AST | self.flags,
+                True,
+            )
+            statements: List[ast.stmt] = tree.body  # type: ignore
+            for index, statement in enumerate(statements):
+                if index == len(statements) - 1 and isinstance(statement, ast.Expr):
+                    expression = ast.Expression(statement.value)
+                    value = eval(self._compile(expression, filename, "eval"), namespace)
+                else:
+                    module = ast.Module(body=[statement], type_ignores=[])
+                    exec(self._compile(module, filename, "exec"), namespace)
+        except SystemExit:
+            raise
+        except BaseException:
+            error = True
+            self.show_traceback()
+        if value is not None:
+            namespace["_"] = value
+        self.scrollback.append(
+            console_cell(source, None if value is None else short_repr(value), error)
+        )
+        return value, error
+
+    def show_traceback(self) -> None:
+        """Write the traceback without the console's own frame."""
+        exc_type, exc_value, tb = sys.exc_info()
+        if tb is not None and tb.tb_frame.f_code is self.run_cell.__code__:
+            tb = tb.tb_next
+        lines = traceback.format_exception(exc_type, exc_value, tb)
+        self.write_error("".join(lines))
+
+    def add_history(self, source: str) -> None:
+        source = source.rstrip("\n")
+        if source and (not self.history or self.history[-1] != source):
+            self.history.append(source)
+        self.history_index = len(self.history)
+
+    def previous_input(self) -> Optional[str]:
+        """Step back through the input history, None at the start."""
+        if self.history_index == 0:
+            return None
+        self.history_index -= 1
+        return self.history[self.history_index]
+
+    def next_input(self) -> str:
+        """Step forward through the input history, empty after the last cell."""
+        if self.history_index < len(self.history):
+            self.history_index += 1
+        if self.history_index == len(self.history):
+            return ""
+        return self.history[self.history_index]
@@ -16,15 +16,30 @@
 """PythonTextEdit and related classes this Class extends the QPlainTextEdit."""
 import ast
 from collections import namedtuple
-from typing import Any, Callable, Optional, Type
+from contextlib import ExitStack
+from typing import Any, Callable, Optional, Tuple, Type
 
 # import jedi
+import maya.api.OpenMaya as OpenMaya
 from maya import utils
 from PySide2.QtCore import *
 from PySide2.QtGui import *
 from PySide2.QtWidgets import *
 
+from .CmdsProfiler import CmdsProfiler
+from .CodeCells import cell_markers, code_cell
+from .CodeProfiler import CodeProfiler
+from .CodeRunner import execute_source
+from .ExecutionTimer import ExecutionTimer
+from .ExecutionWatchdog import ExecutionWatchdog, watchdog_settings
+from .FastExecution import fast_execution, fast_modes
+from .ImportProfiler import ImportProfiler
+from .LineProfiler import LineProfiler
+from .MemoryTracker import MemoryTracker
+from .OutputCapture import capture_output
+from .PythonConsole import ConsoleSession
 from .PythonHighlighter import PythonHighlighter
+from .ResultViewer import is_large
 from .TextEdit import TextEdit
 
 is_class = False
@@ -41,6 +56,11 @@ class PythonTextEdit(TextEdit):
 
     completer = QCompleter()
     code_model_changed = Signal()
+    profile_finished = Signal(list)
+    memory_finished = Signal(list)
+    imports_finished = Signal(list)
+    cell_marker = cell_markers["python"]
+    language = "python"
 
     def __init__(
         self,
@@ -67,6 +87,11 @@ class PythonTextEdit(TextEdit):
         self.execute_selected = False
         self.installEventFilter(self)
         self.live = live
+        self.capture_output = False
+        self.watchdog = watchdog_settings()
+        # incremental console for the live window, see set_console_mode
+        self.console: Optional[ConsoleSession] = None
+        self.cell_runner = self.run_cell_source
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
         # self.setCompleter(self.completer)
         self.copyAvailable.connect(self.selection_changed)
@@ -80,6 +105,7 @@ class PythonTextEdit(TextEdit):
         Ctrl (Command mac) + Return : execute code.
         Ctrl (Command mac) + S : save file.
         F5 : run current file
+        Ctrl (Command mac) + Up / Down : console input history
         Parameters :
         obj (QObject) : the object passing the event.
         event (QEvent) : the event to be processed.
@@ -97,6 +123,13 @@ class PythonTextEdit(TextEdit):
             elif event.key() == Qt.Key_S and event.modifiers() == Qt.ControlModifier:
                 self.save_file()
                 return True
+            elif (
+                self.console is not None
+                and event.key() in (Qt.Key_Up, Qt.Key_Down)
+                and event.modifiers() == Qt.ControlModifier
+            ):
+                self.recall_console_input(event.key() == Qt.Key_Up)
+                return True
             else:
                 return super().eventFilter(obj, event)
         else:
@@ -147,41 +180,195 @@ class PythonTextEdit(TextEdit):
     #             </html>"""
     #         QToolTip.showText(help_event.globalPos(), help_text)
 
-    def execute_code(self):
+    def execute_code(self, run_mode: str = "normal"):
         """Execute the code in the current Editor.
 
         This will either execute the selected text or the whole file dependant upon
         the execute_selected flag. Called from the event filter on CTR + Return.
+        Parameters :
+        run_mode (str) : normal or one of the profiling / fast modes see run_python
+        """
+        if run_mode == "normal" and self.console is not None:
+            self.run_console_cell()
+            return
+        if run_mode == "normal" and self.fast_mode:
+            run_mode = "fast"
+        # the text is taken now so editing while the run is queued doesn't change it
+        text, first_line = self.code_to_run()
+        selected = self.execute_selected
+        if self.live:
+            self.update_output.emit(self.toPlainText() + "\n")
+            self.draw_line.emit()
+            if not selected:
+                self.clear()
+        self.queue_run(
+            text,
+            run_mode,
+            lambda: self.run_and_show(text, run_mode, first_line, selected),
+        )
+
+    def run_and_show(
+        self, text: str, run_mode: str, first_line: int, selected: bool
+    ) -> None:
+        """Time and run the text, live windows show the result."""
+        with ExecutionTimer(
+            self.filename, "python", text, self.show_timing, run_mode
+        ) as timer:
+            value = self.run_python(text, run_mode, first_line)
+            timer.set_result(value)
+        # if we are a live window output the results
+        if self.live and value != None:
+            if selected:
+                self.draw_line.emit()
+            self.show_result(value)
+            if selected:
+                self.draw_line.emit()
+
+    def set_console_mode(self, state: bool) -> None:
+        """Turn the incremental console on or off, only used by the live window."""
+        if state and self.console is None:
+            self.console = ConsoleSession(self.write_error)
+        elif not state:
+            self.console = None
+
+    def run_console_cell(self) -> None:
+        """Echo the cell with prompts, clear it and run it statement by statement."""
+        text, first_line = self.code_to_run()
+        if not text.strip():
+            return
+        if self.console.is_incomplete(text):  # type: ignore
+            self.update_output_message.emit(
+                "incomplete input, finish the statement and run again",
+                OpenMaya.MCommandMessage.kWarning,
+            )
+            return
+        self.update_output.emit(self.console.prompt(text))  # type: ignore
+        if not self.execute_selected:
+            self.clear()
+        console = self.console
+        self.queue_run(
+            text,
+            "console",
+            lambda: self.run_console_source(console, text, first_line),  # type: ignore
+        )
+
+    def run_console_source(
+        self, console: ConsoleSession, text: str, first_line: int
+    ) -> None:
+        with ExitStack() as stack:
+            if self.capture_output:
+                stack.enter_context(
+                    capture_output(self.update_output.emit, self.write_error)
+                )
+            with ExecutionTimer(
+                self.filename, "python", text, self.show_timing, "console"
+            ) as timer:
+                value, error = utils.executeInMainThreadWithResult(
+                    console.run_cell, text, self.filename, first_line
+                )
+                timer.set_result(value)
+                if error:
+                    timer.set_error()
+        if value is not None and is_large(value):
+            # big containers get a summary linked to the ResultViewer
+            self.show_result(value)
+        elif value is not None:
+            # echo the size capped repr kept in the scrollback
+            self.update_output.emit(console.scrollback[-1].result + "\n")
+
+    def recall_console_input(self, previous: bool) -> None:
+        """Replace the editor text with the previous / next console input."""
+        if previous:
+            text = self.console.previous_input()  # type: ignore
+            if text is None:
+                return
+        else:
+            text = self.console.next_input()  # type: ignore
+        self.setPlainText(text)
+        self.moveCursor(QTextCursor.End)
+
+    def code_to_run(self) -> Tuple[str, int]:
+        """Get the selected text or the whole file if nothing is selected.
+
+        Returns : (text, first_line) where first_line is the editor line the text starts at
         """
         if self.execute_selected:
             cursor = self.textCursor()
-            text = cursor.selectedText()
             # returns a unicode paragraph instead of \n
             # so replace
-            text = text.replace("\u2029", "\n")
-            if self.live:
-                self.update_output.emit(self.toPlainText() + "\n")
-                self.draw_line.emit()
+            text = cursor.selectedText().replace("\u2029", "\n")
+            first_line = (
+                self.document().findBlock(cursor.selectionStart()).blockNumber()
+            )
+            return text, first_line + 1
+        return self.toPlainText() + "\n", 1
+
+    def run_python(
+        self, text: str, run_mode: str = "normal", first_line: int = 1
+    ) -> Any:
+        """Run the text in Maya returning the result.
+
+        If capture_output is set stdout and stderr are sent to the output window in
+        batches while the code runs rather than going via Maya. With the watchdog enabled
+        the stack is sampled while running and runs over the limit are interrupted if
+        auto_interrupt is set.
+        Parameters :
+        text (str) : the code to run
+        run_mode (str) : normal, profile to run under cProfile, line_profile, cmds_profile,
+        memory to diff tracemalloc snapshots, import_profile to time imports
+        or fast / fast_no_undo to suspend refresh and chunk / disable undo
+        first_line (int) : the editor line the text starts at
+        Returns : the result of the execution
+        """
+        with ExitStack() as stack:
+            if self.capture_output:
+                stack.enter_context(
+                    capture_output(self.update_output.emit, self.write_error)
+                )
+            if run_mode == "profile":
+                stack.enter_context(CodeProfiler(self.profile_finished.emit))
+            elif run_mode == "line_profile":
+                # enough lines for the text run, set_line_heat sizes the results to the editor
+                line_count = max(self.blockCount(), first_line + text.count("\n"))
+                stack.enter_context(
+                    LineProfiler(self.filename, line_count, self.set_line_heat)
+                )
+            elif run_mode == "memory":
+                stack.enter_context(
+                    MemoryTracker(self.memory_finished.emit, self.update_output.emit)
+                )
+            elif run_mode == "import_profile":
+                stack.enter_context(
+                    ImportProfiler(self.imports_finished.emit, self.update_output.emit)
+                )
+            elif run_mode == "cmds_profile":
+                stack.enter_context(CmdsProfiler(self.update_output.emit))
+            elif run_mode in fast_modes:
+                stack.enter_context(fast_execution(run_mode, self.filename))
+            # entered last so an interrupt can only land in the code being run
+            if self.watchdog.enabled:
+                stack.enter_context(
+                    ExecutionWatchdog(self.watchdog, self.update_output.emit)
+                )
+            # compile with our filename so profile results and tracebacks map to the
+            # editor, unchanged code comes from the code_cache
+            return execute_source(text, self.filename, first_line)
 
-            value = utils.executeInMainThreadWithResult(text)
-            if self.live and value != None:
-                value = str(value) + "\n"
-                self.draw_line.emit()
+    def run_cell_source(self, cell: code_cell) -> Any:
+        run_mode = "fast" if self.fast_mode else "normal"
+        return self.run_python(cell.source, run_mode, cell.first_line)
 
-                self.update_output_html.emit(value)
-                self.draw_line.emit()
+    def write_error(self, text: str) -> None:
+        """Send captured stderr to the output window as an error."""
+        self.update_output_message.emit(text, OpenMaya.MCommandMessage.kError)
 
-        else:
-            text_to_run = self.toPlainText() + "\n"
-            if self.live:
-                self.update_output.emit(text_to_run)
-                self.draw_line.emit()
-                self.clear()
-            value = utils.executeInMainThreadWithResult(text_to_run)
-            # if we are a live window output the results
-            if self.live and value != None:
-                value = str(value)
-                self.update_output.emit(value)
+    @Slot(bool)
+    def set_capture_output(self, state: bool) -> None:
+        self.capture_output = state
+
+    @Slot(object)
+    def set_watchdog(self, settings: watchdog_settings) -> None:
+        self.watchdog = settings
 
     def selection_changed(self, state):
         """Signal called when text is selected.
@@ -0,0 +1,338 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Run editor code in another Maya session through its commandPort.
+
+The other session opens a python command port, for example in its userSetup.py
+
+cmds.commandPort(name=":7002", sourceType="python")
+
+Connections are kept open in a CommandPortPool so each run doesn't pay for a new socket. The first
+request on a connection defines a small runner function in the remote __main__, later requests
+just call it. The commandPort only answers once the code has finished, so while it runs the
+remote stdout / stderr are streamed back over sockets the runner opens to an OutputListener in
+the editor. If the editor can't be reached the output is captured and returned with the json
+reply instead. CommandPortServer.py is a pure python stand in for testing without Maya.
+"""
+import base64
+import codecs
+import json
+import socket
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PySide2.QtCore import QObject, Signal
+
+# defined in the remote session by the first request on each connection
+_remote_runner = """
+def _maya_editor_run(encoded):
+    import base64, io, json, socket, sys, time, traceback
+    job = json.loads(base64.b64decode(encoded).decode("utf-8"))
+    connections = []
+    if job.get("output"):
+        try:
+            for name in ("stdout", "stderr"):
+                connection = socket.create_connection(tuple(job["output"]), timeout=10)
+                connections.append(connection)
+                connection.sendall(name.encode("ascii") + b"\\n")
+        except OSError:
+            for connection in connections:
+                connection.close()
+            connections = []
+    if connections:
+        stdout, stderr = [
+            io.TextIOWrapper(
+                connection.makefile("wb"), "utf-8", "replace", line_buffering=True
+            )
+            for connection in connections
+        ]
+    else:
+        stdout, stderr = io.StringIO(), io.StringIO()
+    old_streams = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = stdout, stderr
+    result = error = None
+    start = time.perf_counter()
+    try:
+        if job["language"] == "mel":
+            import maya.mel
+            result = maya.mel.eval(job["source"])
+        else:
+            try:
+                code = compile(job["source"], job["filename"], "eval")
+            except SyntaxError:
+                code = compile(job["source"], job["filename"], "exec")
+            result = eval(code, globals())
+    except BaseException:
+        error = traceback.format_exc()
+    finally:
+        sys.stdout, sys.stderr = old_streams
+        for stream, connection in zip((stdout, stderr), connections):
+            try:
+                stream.close()
+            except OSError:
+                pass
+            connection.close()
+    return json.dumps({
+        "streamed": bool(connections),
+        "stdout": "" if connections else stdout.getvalue(),
+        "stderr": "" if connections else stderr.getvalue(),
+        "result": None if result is None else repr(result)[:10000],
+        "error": error,
+        "wall": time.perf_counter() - start,
+    })
+"""
+_encoded_runner = base64.b64encode(_remote_runner.encode("utf-8")).decode("ascii")
+
+
+def parse_target(target: str) -> Tuple[str, int]:
+    """Split "host:port" (or just "port" for localhost) into host and port."""
+    host, _, port = target.rpartition(":")
+    return host or "localhost", int(port)
+
+
+class OutputListener:
+    """Receives the remote stdout / stderr as they are written.
+
+    The remote runner connects once per stream and sends the stream name as the first line, the
+    rest is the output. Each chunk received is passed to on_output from the reading thread.
+    """
+
+    def __init__(self, host: str, on_output: Callable[[str, str], None]):
+        """
+        Parameters :
+        host (str) : address of this machine as seen by the remote session
+        on_output (callable) : called with the stream name and text
+        """
+        self.on_output = on_output
+        self.socket = socket.create_server((host, 0))
+        self.address = self.socket.getsockname()[:2]
+        self.readers: List[threading.Thread] = []
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+    def _accept(self) -> None:
+        for _ in range(2):
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                # closed as the remote session couldn't connect
+                return
+            reader = threading.Thread(
+                target=self._read, args=(connection,), daemon=True
+            )
+            self.readers.append(reader)
+            reader.start()
+
+    def _read(self, connection: socket.socket) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        with connection:
+            data = b""
+            while b"\n" not in data:
+                chunk = connection.recv(65536)
+                if not chunk:
+                    return
+                data += chunk
+            name, _, data = data.partition(b"\n")
+            stream = name.decode("ascii", "replace")
+            if not data:
+                data = connection.recv(65536)
+            while data:
+                text = decoder.decode(data)
+                if text:
+                    self.on_output(stream, text)
+                data = connection.recv(65536)
+            text = decoder.decode(b"", final=True)
+            if text:
+                self.on_output(stream, text)
+
+    def close(self, streamed: bool, timeout: float = 5.0) -> None:
+        """Stop listening once the streams are done.
+
+        Parameters :
+        streamed (bool) : the remote session connected, wait for the rest of its output
+        timeout (float) : longest time to wait in seconds
+        """
+        if streamed:
+            self._acceptor.join(timeout)
+            for reader in list(self.readers):
+                reader.join(timeout)
+        self.socket.close()
+
+
+class CommandPortConnection:
+    """One persistent socket to a commandPort."""
+
+    def __init__(self, host: str, port: int, timeout: float = 600.0):
+        self.address = (host, port)
+        self.socket = socket.create_connection(self.address, timeout=timeout)
+        self.has_runner = False
+        # received data not yet returned as a reply
+        self.buffer = b""
+
+    def request(self, command: str) -> str:
+        """Send a single line command and wait for the reply.
+
+        Maya ends each reply with a null byte (normally after a new line), anything received
+        after it belongs to the next reply so is kept for the next request.
+        """
+        self.socket.sendall(command.encode("utf-8") + b"\n")
+        while b"\x00" not in self.buffer:
+            data = self.socket.recv(65536)
+            if not data:
+                raise ConnectionError(f"commandPort {self.address} closed")
+            self.buffer += data
+        reply, _, self.buffer = self.buffer.partition(b"\x00")
+        return reply.rstrip(b"\n").decode("utf-8")
+
+    def run(
+        self,
+        source: str,
+        filename: str,
+        language: str = "python",
+        on_output: Optional[Callable[[str, str], None]] = None,
+    ) -> dict:
+        """Run source in the remote session.
+
+        Parameters :
+        source (str) : the code to run
+        filename (str) : used for tracebacks
+        language (str) : python or mel
+        on_output (callable) : called with the stream name and text while the code runs, from
+        another thread, if not given the output is only returned with the reply
+        Returns : dict of stdout, stderr, result, error and wall, stdout and stderr are empty
+        when they were streamed
+        """
+        job_data = {"source": source, "filename": filename, "language": language}
+        listener = None
+        if on_output is not None:
+            listener = OutputListener(self.socket.getsockname()[0], on_output)
+            job_data["output"] = listener.address
+        job = json.dumps(job_data)
+        encoded = base64.b64encode(job.encode("utf-8")).decode("ascii")
+        call = f"_maya_editor_run('{encoded}')"
+        if not self.has_runner:
+            define = (
+                f"exec(__import__('base64').b64decode('{_encoded_runner}'), globals())"
+            )
+            call = f"({define}, {call})[1]"
+        result: dict = {}
+        try:
+            reply = self.request(call)
+            self.has_runner = True
+            try:
+                result = json.loads(reply)
+            except ValueError:
+                # not from our runner, most likely an error message from the port itself
+                result = {
+                    "stdout": "",
+                    "stderr": "",
+                    "result": None,
+                    "error": reply,
+                    "wall": 0.0,
+                }
+        finally:
+            if listener is not None:
+                listener.close(streamed=bool(result.get("streamed")))
+        return result
+
+    def close(self) -> None:
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+
+class CommandPortPool:
+    """Idle connections kept per address so they can be reused by the next run."""
+
+    def __init__(self, timeout: float = 600.0):
+        self.timeout = timeout
+        self.idle: Dict[Tuple[str, int], List[CommandPortConnection]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str, port: int) -> CommandPortConnection:
+        with self._lock:
+            connections = self.idle.get((host, port))
+            if connections:
+                return connections.pop()
+        return CommandPortConnection(host, port, self.timeout)
+
+    def release(self, connection: CommandPortConnection) -> None:
+        with self._lock:
+            self.idle.setdefault(connection.address, []).append(connection)
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections = [c for pool in self.idle.values() for c in pool]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+class RemoteExecutor(QObject):
+    """Runs code on remote targets from worker threads so the editor stays responsive.
+
+    Signals are emitted from the worker threads so are queued to the GUI thread.
+    """
+
+    # target, stream name (stdout / stderr), text
+    output = Signal(str, str, str)
+    # target, name run, the reply (result, error, wall)
+    finished = Signal(str, str, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = CommandPortPool()
+
+    def run(self, target: str, source: str, filename: str, language: str) -> None:
+        """Start running source on target ("host:port")."""
+        threading.Thread(
+            target=self._worker,
+            args=(target, source, filename, language),
+            daemon=True,
+        ).start()
+
+    def _worker(self, target: str, source: str, filename: str, language: str) -> None:
+        try:
+            host, port = parse_target(target)
+            # a pooled connection may have been closed by the other end so retry once
+            # with a new one, but never after a timeout as the code may still be running
+            for attempt in range(2):
+                connection = self.pool.acquire(host, port)
+                try:
+                    reply = connection.run(
+                        source,
+                        filename,
+                        language,
+                        on_output=lambda stream, text: self.output.emit(
+                            target, stream, text
+                        ),
+                    )
+                    self.pool.release(connection)
+                    break
+                except OSError as error:
+                    connection.close()
+                    reused = connection.has_runner
+                    if attempt == 1 or not reused or isinstance(error, socket.timeout):
+                        raise
+        except (OSError, ValueError) as error:
+            reply = {"result": None, "error": f"{target} : {error}", "wall": 0.0}
+        # only set when the output couldn't be streamed
+        for stream in ("stdout", "stderr"):
+            if reply.get(stream):
+                self.output.emit(target, stream, reply[stream])
+        self.finished.emit(target, filename, reply)
+
+    def shutdown(self) -> None:
+        self.pool.close_all()
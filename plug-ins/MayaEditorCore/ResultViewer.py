@@ -0,0 +1,185 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Viewer for large values returned by a run.
+
+Converting something like cmds.ls() in a big scene with str() and pushing it into the output window
+takes seconds and a lot of memory. Large values are shown as a one line summary (type, length and
+the first few items) linked to a ResultViewer, whose model only creates the text for rows as they
+are scrolled into view. The last few large values are kept in the result_store for the links.
+"""
+import reprlib
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence, Sized
+from itertools import islice
+from typing import Any, Iterator, List, Optional
+
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+from PySide2.QtWidgets import *
+
+# repr for a single item, nested containers are cut short
+_item_repr = reprlib.Repr()
+_item_repr.maxlevel = 2
+_item_repr.maxstring = _item_repr.maxother = 200
+
+
+def is_large(value: Any, max_items: int = 100, max_length: int = 2000) -> bool:
+    """True if the value is too big to be converted to text for the output window."""
+    if isinstance(value, (str, bytes)):
+        return len(value) > max_length
+    return isinstance(value, Sized) and len(value) > max_items
+
+
+def result_summary(value: Any, count: int = 10) -> str:
+    """Summarise the value as type, length and the first count items."""
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__} of length {len(value)} : {value[:200]!r}..."
+    items = value.items() if isinstance(value, Mapping) else value
+    first = [_item_repr.repr(item) for item in islice(items, count)]
+    more = ", ..." if len(value) > count else ""
+    return f"{type(value).__name__} of length {len(value)} : [{', '.join(first)}{more}]"
+
+
+class ResultStore:
+    """The last few large values so the summaries in the output window can open them."""
+
+    def __init__(self, max_size: int = 10):
+        self.max_size = max_size
+        self.values: OrderedDict = OrderedDict()
+        self.next_key = 0
+
+    def add(self, value: Any) -> int:
+        key = self.next_key
+        self.next_key += 1
+        self.values[key] = value
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+        return key
+
+    def get(self, key: int) -> Optional[Any]:
+        return self.values.get(key)
+
+
+result_store = ResultStore()
+
+
+class ResultModel(QAbstractListModel):
+    """List model of the items of a value, rows are added batch_size at a time by fetchMore."""
+
+    def __init__(self, value: Any, batch_size: int = 500, parent=None):
+        super().__init__(parent)
+        self.value = value
+        self.batch_size = batch_size
+        self.rows: List[str] = []
+        # items shown so far, kept so double click can open nested containers
+        self.items: List[Any] = []
+        if isinstance(value, str):
+            # a string is more useful one line per row
+            value = value.splitlines()
+        self.sequence = isinstance(value, Sequence) and not isinstance(value, bytes)
+        self.source = value
+        self.total = len(value) if isinstance(value, Sized) else None
+        self.iterator: Optional[Iterator] = None
+        if not self.sequence:
+            self.iterator = iter(value.items() if isinstance(value, Mapping) else value)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+        if role == Qt.DisplayRole:
+            return self.rows[index.row()]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        if self.sequence:
+            return len(self.rows) < self.total  # type: ignore
+        return self.iterator is not None
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        start = len(self.rows)
+        if self.sequence:
+            end = min(start + self.batch_size, self.total)  # type: ignore
+            batch = [self.source[row] for row in range(start, end)]
+        else:
+            try:
+                batch = list(islice(self.iterator, self.batch_size))  # type: ignore
+            except RuntimeError:
+                # container changed size while we were iterating
+                batch = []
+            if len(batch) < self.batch_size:
+                self.iterator = None
+        if not batch:
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+        for row, item in enumerate(batch, start):
+            if isinstance(self.value, Mapping):
+                key, item = item
+                self.rows.append(f"{_item_repr.repr(key)} : {_item_repr.repr(item)}")
+            else:
+                self.rows.append(f"[{row}] {_item_repr.repr(item)}")
+            self.items.append(item)
+        self.endInsertRows()
+
+
+class ResultViewer(QDialog):
+    """Scrolling view of a large value, double click a container item to open it."""
+
+    def __init__(self, value: Any, font: Optional[QFont] = None, parent=None):
+        """
+        Parameters :
+        value (any) : the value to show
+        font (QFont) : font for the list, the editor font
+        parent (QWidget) : parent widget
+        """
+        super().__init__(parent)
+        # viewers are opened and forgotten, free the value and model when closed
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.item_font = font
+        self.setWindowTitle(f"Result : {type(value).__name__}")
+        self.resize(700, 600)
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        self.summary = QLabel(result_summary(value, 3))
+        self.summary.setWordWrap(True)
+        layout.addWidget(self.summary)
+        self.model = ResultModel(value, parent=self)
+        self.view = QListView()
+        # uniform rows stop the view measuring every row it has fetched
+        self.view.setUniformItemSizes(True)
+        self.view.setModel(self.model)
+        if font is not None:
+            self.view.setFont(font)
+        self.view.doubleClicked.connect(self.open_item)
+        layout.addWidget(self.view)
+        self.count = QLabel("")
+        layout.addWidget(self.count)
+        self.model.rowsInserted.connect(self.update_count)
+        self.update_count()
+
+    def update_count(self) -> None:
+        total = "?" if self.model.total is None else self.model.total
+        self.count.setText(f"showing {self.model.rowCount()} of {total} items")
+
+    def open_item(self, index: QModelIndex) -> None:
+        item = self.model.items[index.row()]
+        if isinstance(item, Sized) and not isinstance(item, (str, bytes)) and item:
+            ResultViewer(item, self.item_font, self).show()
@@ -0,0 +1,32 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Names of the run modes.
+
+Kept free of Maya and Qt imports so EditorStandalone.py can check --mode before
+maya.standalone is initialized.
+"""
+
+# run modes using FastExecution, "fast" keeps undo as one chunk "fast_no_undo" disables it
+fast_modes = ("fast", "fast_no_undo")
+
+# modes a file can be run in by the HeadlessRunner
+run_modes = [
+    "normal",
+    "profile",
+    "line_profile",
+    "memory",
+    "import_profile",
+    "cmds_profile",
+] + sorted(fast_modes)
@@ -1,13 +1,37 @@
 import os
+import time
 from pathlib import Path
+from typing import List
 
 from PySide2.QtCore import *
 from PySide2.QtGui import *
 from PySide2.QtWidgets import *
 
+from .CodeProfiler import profile_data
+from .ExecutionQueue import queue_job
+from .ImportProfiler import import_data
 from .MelTextEdit import MelTextEdit
+from .MemoryTracker import memory_data
 from .PythonTextEdit import PythonTextEdit, class_model_data, code_model_data
 
+# sidebar_selector pages, the first three are set up in the ui file
+workspace_page = 0
+file_system_page = 1
+code_page = 2
+profiler_page = 3
+memory_page = 4
+queue_page = 5
+imports_page = 6
+# names of the pages added to the selector by the editor, in page order
+added_pages = {
+    profiler_page: "Profiler",
+    memory_page: "Memory",
+    queue_page: "Run Queue",
+    imports_page: "Imports",
+}
+# pages showing tables which can be sorted by column
+sortable_pages = (profiler_page, memory_page, imports_page)
+
 """
 This class contains the different models used by the sidebar, this allows us to switch the display
 from Active Files (Workspace mode), file system, and class / function navigator
@@ -32,6 +56,22 @@ class SideBarModels(QObject):
         filters = ["*.txt", "*.py", "*.mel", "*.md"]
         self.file_system_model.setNameFilters(filters)
         self.code_system_model = QStandardItemModel()
+        self.profiler_model = QStandardItemModel()
+        self.profiler_model.setHorizontalHeaderLabels(
+            ["Function", "Calls", "Self (s)", "Cumulative (s)", "Location"]
+        )
+        self.memory_model = QStandardItemModel()
+        self.memory_model.setHorizontalHeaderLabels(
+            ["Location", "Size Diff (KiB)", "Count Diff", "Size (KiB)", "Count"]
+        )
+        self.import_model = QStandardItemModel()
+        self.import_model.setHorizontalHeaderLabels(
+            ["Module", "Cumulative (ms)", "Self (ms)", "New Modules", "Status"]
+        )
+        self.queue_model = QStandardItemModel()
+        self.queue_model.setHorizontalHeaderLabels(
+            ["Job", "Name", "State", "Wait (s)", "Wall (s)"]
+        )
         if os.system == "Windows":
             # load icons
             self.class_icon = QIcon(
@@ -119,6 +159,112 @@ class SideBarModels(QObject):
         elif isinstance(widget, PythonTextEdit):
             self.create_python_model(widget)
 
+    @Slot(list)
+    def generate_profiler_model(self, results: List[profile_data]) -> None:
+        """
+        Fill the profiler model from the results of a Run with Profiler.
+        Numbers are set as DisplayRole data so the columns sort numerically, the filename
+        and line are stored on the function item so we can jump to the source
+        Parameters :
+        results (list) : the profile_data from the CodeProfiler
+        """
+        self.profiler_model.removeRows(0, self.profiler_model.rowCount())
+        for data in results:
+            function = QStandardItem(data.function)
+            function.setData(data.filename, Qt.UserRole + 1)
+            function.setData(data.line_number, Qt.UserRole + 2)
+            calls = QStandardItem()
+            calls.setData(data.calls, Qt.DisplayRole)
+            self_time = QStandardItem()
+            self_time.setData(round(data.self_time, 6), Qt.DisplayRole)
+            cumulative_time = QStandardItem()
+            cumulative_time.setData(round(data.cumulative_time, 6), Qt.DisplayRole)
+            location = QStandardItem(f"{Path(data.filename).name}:{data.line_number}")
+            location.setToolTip(data.filename)
+            row = [function, calls, self_time, cumulative_time, location]
+            for item in row:
+                item.setEditable(False)
+            self.profiler_model.appendRow(row)
+
+    @Slot(list)
+    def generate_memory_model(self, results: List[memory_data]) -> None:
+        """
+        Fill the memory model from the results of a Memory Tracking run.
+        As with the profiler the filename and line are stored on the location item
+        Parameters :
+        results (list) : the memory_data from the MemoryTracker
+        """
+        self.memory_model.removeRows(0, self.memory_model.rowCount())
+        for data in results:
+            location = QStandardItem(f"{Path(data.filename).name}:{data.line_number}")
+            location.setToolTip(data.filename)
+            location.setData(data.filename, Qt.UserRole + 1)
+            location.setData(data.line_number, Qt.UserRole + 2)
+            row = [location]
+            for value in (
+                round(data.size_diff / 1024, 2),
+                data.count_diff,
+                round(data.size / 1024, 2),
+                data.count,
+            ):
+                item = QStandardItem()
+                item.setData(value, Qt.DisplayRole)
+                row.append(item)
+            for item in row:
+                item.setEditable(False)
+            self.memory_model.appendRow(row)
+
+    @Slot(list)
+    def generate_import_model(self, results: List[import_data]) -> None:
+        """
+        Fill the import tree from an Import Profiler run, children are the imports done
+        while importing their parent. Already cached imports are shown greyed out.
+        Parameters :
+        results (list) : the top level import_data from the ImportProfiler
+        """
+        self.import_model.removeRows(0, self.import_model.rowCount())
+        self.append_imports(self.import_model.invisibleRootItem(), results)
+
+    def append_imports(self, parent: QStandardItem, results: List[import_data]) -> None:
+        for data in sorted(results, key=lambda data: data.cumulative, reverse=True):
+            name = QStandardItem(data.name)
+            row = [name]
+            for value in (
+                round(data.cumulative * 1000.0, 3),
+                round(data.self_time * 1000.0, 3),
+                data.new_modules,
+            ):
+                item = QStandardItem()
+                item.setData(value, Qt.DisplayRole)
+                row.append(item)
+            row.append(QStandardItem("new" if data.first_import else "cached"))
+            for item in row:
+                item.setEditable(False)
+                if not data.first_import:
+                    item.setForeground(QBrush(Qt.gray))
+            self.append_imports(name, data.children)
+            parent.appendRow(row)
+
+    def generate_queue_model(self, jobs: List[queue_job]) -> None:
+        """
+        Fill the run queue model, finished jobs first then the active and pending ones.
+        Parameters :
+        jobs (list) : the queue_jobs from ExecutionQueue.jobs
+        """
+        self.queue_model.removeRows(0, self.queue_model.rowCount())
+        for job in jobs:
+            waited = (job.started or time.perf_counter()) - job.queued
+            name = QStandardItem(Path(job.name).name)
+            name.setToolTip(job.name)
+            row = [QStandardItem(str(job.job_id)), name, QStandardItem(job.state)]
+            for value in (round(waited, 3), round(job.wall, 3)):
+                item = QStandardItem()
+                item.setData(value, Qt.DisplayRole)
+                row.append(item)
+            for item in row:
+                item.setEditable(False)
+            self.queue_model.appendRow(row)
+
     @Slot()
     def code_model_needs_update(self):
         if self.active_model == self.code_system_model:
@@ -129,9 +275,17 @@ class SideBarModels(QObject):
         # I know I could use a list of a dictionary to store this but I think this makes the
         # rest of the code much neater and we will only have 3-4 types to content with
         # Guess this is the C++ programmer in me coming out.
-        if index == 0:
+        if index == workspace_page:
             self.active_model = self.workspace
-        elif index == 1:
+        elif index == file_system_page:
             self.active_model = self.file_system_model
-        elif index == 2:
+        elif index == code_page:
             self.active_model = self.code_system_model
+        elif index == profiler_page:
+            self.active_model = self.profiler_model
+        elif index == memory_page:
+            self.active_model = self.memory_model
+        elif index == queue_page:
+            self.active_model = self.queue_model
+        elif index == imports_page:
+            self.active_model = self.import_model
@@ -0,0 +1,65 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Ask whether to interrupt a stalled run, started by the ExecutionWatchdog.
+
+While a run is stuck Maya's event loop is blocked, so the editor can't show a dialog or react to
+the Stop button. This is run as a script by mayapy (or any python interpreter) so the question is
+shown by a process with its own event loop. PySide2 is used if it can be imported, else tkinter.
+The exit code is the answer, 0 to interrupt the run, 1 to keep waiting and 2 if nothing could be
+shown.
+"""
+import sys
+
+
+def ask_qt(text: str) -> bool:
+    from PySide2.QtCore import Qt
+    from PySide2.QtWidgets import QApplication, QMessageBox
+
+    app = QApplication(sys.argv[:1])
+    box = QMessageBox(QMessageBox.Warning, "MayaEditor Watchdog", text)
+    interrupt = box.addButton("Interrupt", QMessageBox.AcceptRole)
+    box.addButton("Keep Waiting", QMessageBox.RejectRole)
+    box.setWindowFlags(box.windowFlags() | Qt.WindowStaysOnTopHint)
+    box.exec_()
+    return box.clickedButton() is interrupt
+
+
+def ask_tk(text: str) -> bool:
+    import tkinter
+    from tkinter import messagebox
+
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    return messagebox.askyesno("MayaEditor Watchdog", text, parent=root)
+
+
+def main() -> int:
+    elapsed = sys.argv[1] if len(sys.argv) > 1 else "?"
+    text = (
+        f"The editor run has taken {elapsed}s and Maya isn't responding.\n"
+        "Interrupt it with KeyboardInterrupt?"
+    )
+    for ask in (ask_qt, ask_tk):
+        try:
+            return 0 if ask(text) else 1
+        except Exception:
+            # toolkit missing or no display, try the next one
+            continue
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,7 +17,10 @@
 This is the base class of all the editor text edits
 
 """
-from typing import Any, Callable, Optional, Type
+import html
+import traceback
+from array import array
+from typing import Any, Callable, List, Optional, Type
 
 import maya.api.OpenMaya as OpenMaya
 from maya import utils
@@ -25,8 +28,14 @@ from PySide2.QtCore import *
 from PySide2.QtGui import *
 from PySide2.QtWidgets import *
 
+from .CodeCells import CellCache, cell_at_line, cell_name, code_cell, split_cells
+from .ExecutionQueue import ExecutionQueue
+from .ExecutionTimer import ExecutionTimer, execution_record, format_footer, source_hash
+from .FastExecution import fast_modes, speedup
 from .FindDialog import FindDialog
 from .LineNumberArea import LineNumberArea
+from .OutputFormats import message_format, repeat_format, timing_message
+from .ResultViewer import is_large, result_store, result_summary
 
 
 class TextEdit(QPlainTextEdit):
@@ -38,7 +47,18 @@ class TextEdit(QPlainTextEdit):
 
     update_output = Signal(str)
     update_output_html = Signal(str)
+    update_output_message = Signal(str, int)
     draw_line = Signal()
+    # key in the result_store of a large result summary clicked in the output
+    result_clicked = Signal(int)
+    # set by the code editors, see CodeCells
+    cell_marker: Optional[str] = None
+    language = ""
+    # set by the EditorDialog so runs are serialised, without it runs start straight away
+    execution_queue: Optional[ExecutionQueue] = None
+    # called with the editor as each of its queued runs starts and ends, set by the EditorDialog
+    before_run: Optional[Callable[["TextEdit"], None]] = None
+    after_run: Optional[Callable[["TextEdit"], None]] = None
     # find_dialog = FindDialog(None)  # QDialog(
     # #     None, Qt.Popup | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint
     # )
@@ -83,7 +103,25 @@ class TextEdit(QPlainTextEdit):
             self.blockCountChanged.connect(self.update_line_number_area_width)
             self.updateRequest.connect(self.update_line_number_area)
             self.cursorPositionChanged.connect(self.highlight_current_line)
+        # line profiler results indexed by block number, see set_line_heat
+        self.line_hits = array("L")
+        self.line_times = array("d")
+        # block count when the heat arrays were last matched to the document
+        self.heat_block_count = 0
+        self.document().contentsChange.connect(self.clear_line_heat)
         self.needs_saving = False
+        # per tab fast mode (refresh suspended, one undo chunk), see FastExecution
+        self.fast_mode = False
+        # last result of each # %% cell, see run_changed_cells
+        self.cell_cache = CellCache()
+        # runs the source of a cell in Maya, set by the code editors along with cell_marker
+        self.cell_runner: Optional[Callable[[code_cell], Any]] = None
+        # run length collapsing of repeated messages, see append_message
+        self.collapse_repeats = True
+        self.last_message = None
+        self.repeat_count = 0
+        self.repeat_position = 0
+        self.repeat_document_length = 0
         # hack as textChanged signal always called on set of text
         self.first_edit = False
         self.textChanged.connect(self.text_changed)
@@ -116,6 +154,8 @@ class TextEdit(QPlainTextEdit):
         Ctrl (Command mac) + + or = : zoom in.
         Ctrl (Command mac) + - : zoom out.
         Ctrl (Command mac) + G : goto line
+        Shift + Return : run cell and advance
+        Ctrl (Command mac) + Shift + Return : run cell
         Parameters :
         obj (QObject) : the object passing the event.
         event (QEvent) : the event to be processed.
@@ -143,6 +183,15 @@ class TextEdit(QPlainTextEdit):
             elif event.key() == Qt.Key_F and event.modifiers() == Qt.ControlModifier:
                 self.show_find_dialog()
                 return True
+            elif (
+                event.key() == Qt.Key_Return
+                and self.cell_runner is not None
+                and not self.isReadOnly()
+                and event.modifiers()
+                in (Qt.ShiftModifier, Qt.ControlModifier | Qt.ShiftModifier)
+            ):
+                self.run_cell(advance=event.modifiers() == Qt.ShiftModifier)
+                return True
             # filter out the return press when searching
             elif event.key() == Qt.Key_Return and not self.hasFocus():
                 return True
@@ -172,6 +221,98 @@ class TextEdit(QPlainTextEdit):
         else:
             return QPlainTextEdit.event(self, event)
 
+    def queue_run(self, text: str, run_mode: str, run: Callable[[], None]) -> None:
+        """Submit a run of text to the execution_queue.
+
+        Parameters :
+        text (str) : the code being run, identical pending runs are only queued once
+        run_mode (str) : the run mode
+        run (callable) : does the run
+        """
+
+        def job() -> None:
+            if TextEdit.before_run is not None:
+                TextEdit.before_run(self)
+            try:
+                run()
+            finally:
+                if TextEdit.after_run is not None:
+                    TextEdit.after_run(self)
+
+        if TextEdit.execution_queue is None:
+            job()
+        else:
+            TextEdit.execution_queue.submit(
+                self.filename, (self.filename, run_mode, source_hash(text)), job
+            )
+
+    def cells(self) -> List[code_cell]:
+        return split_cells(self.toPlainText(), self.cell_marker)  # type: ignore
+
+    def run_cell(self, advance: bool = False) -> None:
+        """Run the cell the cursor is in.
+
+        Parameters :
+        advance (bool) : move the cursor to the start of the next cell afterwards
+        """
+        cells = self.cells()
+        self.cell_cache.prune(cells)
+        cell = cell_at_line(cells, self.textCursor().blockNumber() + 1)
+        if cell is None:
+            return
+        self.queue_run(cell.source, "cell", lambda: self.run_code_cell(cell))
+        if advance and cell.index + 1 < len(cells):
+            self.goto_line(cells[cell.index + 1].first_line)
+
+    def run_changed_cells(self) -> None:
+        """Queue a run of the cells edited (or which raised) since their last run."""
+        cells = self.cells()
+        self.queue_run(
+            self.toPlainText(), "changed_cells", lambda: self.run_cell_list(cells)
+        )
+
+    def run_cell_list(self, cells: List[code_cell]) -> None:
+        """Run the changed cells in order, skipping the rest, see CellCache.is_changed."""
+        ran = skipped = 0
+        self.cell_cache.prune(cells)
+        for cell in cells:
+            if not self.cell_cache.is_changed(cell):
+                self.update_output_message.emit(
+                    self.cell_cache.skipped_message(cell), timing_message
+                )
+                skipped += 1
+                continue
+            ran += 1
+            if not self.run_code_cell(cell):
+                # later cells most likely depend on this one
+                break
+        self.update_output_message.emit(
+            f"{self.filename} : ran {ran} changed cells, skipped {skipped} unchanged",
+            timing_message,
+        )
+
+    def run_code_cell(self, cell: code_cell) -> bool:
+        """Time and run a cell storing the result in the cell_cache.
+
+        Parameters :
+        cell (CodeCell) : the cell to run
+        Returns : False if the cell raised
+        """
+        timer = ExecutionTimer(
+            self.filename, self.language, cell.source, self.show_timing, "cell"
+        )
+        try:
+            with timer:
+                timer.set_result(self.cell_runner(cell))  # type: ignore
+        except Exception:
+            self.update_output_message.emit(
+                f"{cell_name(cell)} failed\n{traceback.format_exc()}",
+                OpenMaya.MCommandMessage.kError,
+            )
+        finally:
+            self.cell_cache.store(cell, timer.record, timer.result_summary)  # type: ignore
+        return not timer.record.error  # type: ignore
+
     def goto_line(self, line_number: int = 0) -> None:
         """Goto the line entered from the dialog.
 
@@ -252,6 +393,70 @@ class TextEdit(QPlainTextEdit):
         self.moveCursor(QTextCursor.End)
         cursor = self.textCursor()
         cursor.insertHtml(f"<p><pre>{text}<pre></p>")
+        # so following text doesn't continue a result link
+        self.setCurrentCharFormat(QTextCharFormat())
+
+    def show_result(self, value: Any) -> None:
+        """Send the value a run returned to the output window.
+
+        Large values are shown as a summary linked to the ResultViewer rather than str(value).
+        """
+        if is_large(value):
+            key = result_store.add(value)
+            summary = html.escape(result_summary(value))
+            self.update_output_html.emit(f'<a href="result:{key}">{summary}</a>')
+        else:
+            self.update_output.emit(str(value) + "\n")
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        href = self.cursorForPosition(event.pos()).charFormat().anchorHref()
+        if href.startswith("result:") and not self.textCursor().hasSelection():
+            self.result_clicked.emit(int(href[len("result:") :]))
+        super().mouseReleaseEvent(event)
+
+    @Slot(str, int)
+    def append_message(self, message: str, mtype: int):
+        """Append a Maya message using the cached format for its type.
+
+        This avoids the html parser so is much faster than append_html for the
+        large number of messages Maya can generate. If the message is the same as the
+        previous one (and nothing else has been output since) we don't add a new line
+        but update a ×N counter at the end of the previous one.
+        Parameters :
+        message (str) : the message text
+        mtype (int) : the MCommandMessage type used to lookup prefix and colour
+        """
+        prefix, text_format = message_format(mtype)
+        self.moveCursor(QTextCursor.End)
+        cursor = self.textCursor()
+        if (
+            self.collapse_repeats
+            and (message, mtype) == self.last_message
+            and self.document().characterCount() == self.repeat_document_length
+        ):
+            self.repeat_count += 1
+            # replace the old counter (if any) with the new one
+            cursor.setPosition(self.repeat_position)
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            cursor.insertText(f"  \u00d7{self.repeat_count}", repeat_format)
+        else:
+            # each message starts on a new line like the old <pre> blocks
+            if not cursor.atBlockStart():
+                cursor.insertBlock()
+            cursor.insertText(prefix + message.rstrip("\n"), text_format)
+            self.last_message = (message, mtype)
+            self.repeat_count = 1
+            self.repeat_position = cursor.position()
+        self.repeat_document_length = self.document().characterCount()
+        # reset so plain text appended after isn't drawn in the message colour
+        self.setCurrentCharFormat(QTextCharFormat())
+
+    def show_timing(self, record: execution_record) -> None:
+        """Output the timing footer for a run, passed as on_finish to the ExecutionTimer."""
+        footer = format_footer(record)
+        if record.mode in fast_modes:
+            footer += speedup(record)
+        self.update_output_message.emit(footer, timing_message)
 
     @Slot()
     def append_line(self):
@@ -317,8 +522,20 @@ class TextEdit(QPlainTextEdit):
             # Just to make sure I use the right font
             height = self.fontMetrics().height()
             width = self.fontMetrics().averageCharWidth()
+            # line profiler heat strip, scaled so the slowest line is fully red
+            max_time = max(self.line_times) if self.line_times else 0.0
             while block.isValid() and (top <= event.rect().bottom()):
                 if block.isVisible() and (bottom >= event.rect().top()):
+                    if max_time > 0.0 and blockNumber < len(self.line_times):
+                        heat = self.line_times[blockNumber] / max_time
+                        if self.line_hits[blockNumber]:
+                            mypainter.fillRect(
+                                0,
+                                int(top),
+                                width // 2 + 2,
+                                int(bottom - top),
+                                QColor(255, int(200 * (1.0 - heat)), 0),
+                            )
                     number = str(blockNumber + 1) + " "
                     mypainter.setPen(Qt.yellow)
                     mypainter.drawText(
@@ -335,6 +552,59 @@ class TextEdit(QPlainTextEdit):
                 bottom = top + self.blockBoundingRect(block).height()
                 blockNumber += 1
 
+    def set_line_heat(self, hits: array, times: array) -> None:
+        """Set the line profiler results to draw in the line number area.
+
+        Parameters :
+        hits (array) : number of times each line was run indexed by block number
+        times (array) : cumulative time in seconds for each line indexed by block number
+        """
+        # one entry per block, the arrays may cover more or fewer lines than the document
+        count = self.blockCount()
+        padding = max(0, count - len(times))
+        self.line_hits = hits[:count] + array("L", [0] * padding)
+        self.line_times = times[:count] + array("d", [0.0] * padding)
+        self.heat_block_count = count
+        if self.show_line_numbers:
+            self.line_number_area.update()
+
+    def clear_line_heat(self, position: int, removed: int, added: int) -> None:
+        """Keep the line heat in step with the document as it is edited.
+
+        Connected to the document contentsChange signal, the blocks the edit removed are
+        replaced by the blocks it added, cleared as they are no longer the code that was
+        profiled, so the rest of the lines still line up with the code.
+        """
+        if not self.line_times:
+            return
+        count = self.blockCount()
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(position)
+        cursor.setPosition(
+            min(position + added, self.document().characterCount() - 1),
+            QTextCursor.KeepAnchor,
+        )
+        # selectedText uses the paragraph separator between blocks
+        added_blocks = cursor.selectedText().count("\u2029")
+        removed_blocks = added_blocks - (count - self.heat_block_count)
+        self.heat_block_count = count
+        first = self.document().findBlock(position).blockNumber()
+        end = first + removed_blocks + 1
+        self.line_hits[first:end] = array("L", [0] * (added_blocks + 1))
+        self.line_times[first:end] = array("d", [0.0] * (added_blocks + 1))
+        if not any(self.line_hits):
+            self.line_hits = array("L")
+            self.line_times = array("d")
+        if self.show_line_numbers:
+            self.line_number_area.update()
+
+    def line_heat_tooltip(self, pos: QPoint) -> str:
+        """Get the hits and time for the line at pos in the line number area."""
+        line = self.cursorForPosition(QPoint(0, pos.y())).blockNumber()
+        if line < len(self.line_hits) and self.line_hits[line]:
+            return f"hits {self.line_hits[line]} time {self.line_times[line] * 1000.0:.3f} ms"
+        return ""
+
     def highlight_current_line(self):
         """Highlight the current line."""
         extraSelections = []
@@ -0,0 +1,139 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Worker process for the WorkerPool.
+
+This is run as a script by mayapy (or any python interpreter) so must not import the
+MayaEditorCore package, only the standalone LineBuffer module next to it. Jobs are read as json lines from stdin and messages are written as json
+lines to stdout :
+
+job      {"id": 1, "source": "...", "filename": "test.py", "scene": "optional.ma"}
+ready    {"ready": true, "maya": true}
+output   {"id": 1, "stream": "stdout", "text": "..."}
+finished {"id": 1, "done": true, "result": "...", "error": null, "wall": 0.1}
+
+With --maya maya.standalone is initialized once at startup so jobs don't pay for it.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import traceback
+
+# run as a script so this directory is on sys.path, LineBuffer has no package imports
+from LineBuffer import LineBuffer
+
+_protocol = sys.stdout
+_protocol_lock = threading.Lock()
+
+
+def send(message: dict) -> None:
+    with _protocol_lock:
+        _protocol.write(json.dumps(message) + "\n")
+        _protocol.flush()
+
+
+class JobStream:
+    """Line buffered stream which sends each line back to the editor."""
+
+    def __init__(self, stream: str):
+        self.stream = stream
+        self.job_id = 0
+        self._buffer = LineBuffer()
+
+    def write(self, text: str) -> int:
+        if self._buffer.write(text):
+            self._send_lines()
+        return len(text)
+
+    def flush(self) -> None:
+        self._buffer.flush()
+        self._send_lines()
+
+    def _send_lines(self) -> None:
+        text = self._buffer.take()
+        if text:
+            send({"id": self.job_id, "stream": self.stream, "text": text})
+
+    def isatty(self) -> bool:
+        return False
+
+
+def run_job(job: dict, stdout: JobStream, stderr: JobStream) -> None:
+    stdout.job_id = stderr.job_id = job["id"]
+    namespace = {"__name__": "__main__", "__file__": job.get("filename", "<worker>")}
+    result = None
+    error = None
+    start = time.perf_counter()
+    try:
+        # batch jobs open a scene before running the script
+        scene = job.get("scene")
+        if scene:
+            import maya.cmds as cmds
+
+            cmds.file(scene, open=True, force=True)
+            namespace["scene_file"] = scene
+        code = compile(job["source"], job.get("filename", "<worker>"), "exec")
+        exec(code, namespace)
+        result = namespace.get("result")
+    except BaseException:
+        error = traceback.format_exc()
+    wall = time.perf_counter() - start
+    stdout.flush()
+    stderr.flush()
+    send(
+        {
+            "id": job["id"],
+            "done": True,
+            "result": None if result is None else repr(result)[:10000],
+            "error": error,
+            "wall": wall,
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MayaEditor worker process")
+    parser.add_argument(
+        "--maya", action="store_true", help="initialize maya.standalone"
+    )
+    args = parser.parse_args()
+    use_maya = False
+    if args.maya:
+        try:
+            import maya.standalone
+
+            maya.standalone.initialize(name="python")
+            use_maya = True
+        except ImportError:
+            pass
+    stdout = JobStream("stdout")
+    stderr = JobStream("stderr")
+    sys.stdout = stdout
+    sys.stderr = stderr
+    send({"ready": True, "maya": use_maya})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        if job.get("quit"):
+            break
+        run_job(job, stdout, stderr)
+    if use_maya:
+        maya.standalone.uninitialize()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# Copyright (C) 2022  Jonathan Macey
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Pool of pre-warmed mayapy worker processes.
+
+Scene independent work (file conversion, caches, reports) can be sent to a worker process so the
+interactive session stays responsive. The workers run WorkerMain.py and stay alive between jobs so
+Maya's startup cost is only paid once. Any python interpreter can be used as a stand in for mayapy.
+"""
+import json
+import shutil
+import subprocess
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from PySide2.QtCore import QObject, QTimer, Signal
+
+worker_script = str(Path(__file__).parent / "WorkerMain.py")
+
+
+def default_interpreter() -> str:
+    """Find mayapy next to the running Maya, else fall back to python3."""
+    executable = Path(sys.executable)
+    for name in ("mayapy", "mayapy.exe"):
+        mayapy = executable.with_name(name)
+        if mayapy.is_file():
+            return str(mayapy)
+    return shutil.which("mayapy") or shutil.which("python3") or sys.executable
+
+
+class WorkerProcess:
+    """A single worker process and the thread reading its messages."""
+
+    def __init__(self, pool: "WorkerPool", interpreter: str):
+        self.pool = pool
+        self.job_id: Optional[int] = None
+        self.ready = False
+        command = [interpreter, worker_script]
+        if "mayapy" in Path(interpreter).name:
+            command.append("--maya")
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self.reader = threading.Thread(target=self._read_messages, daemon=True)
+        self.reader.start()
+
+    def send(self, message: dict) -> None:
+        self.process.stdin.write(json.dumps(message) + "\n")  # type: ignore
+        self.process.stdin.flush()  # type: ignore
+
+    def _read_messages(self) -> None:
+        for line in self.process.stdout:  # type: ignore
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # not from the protocol (e.g. maya startup messages) so pass it on
+                message = {"id": self.job_id, "stream": "stdout", "text": line}
+            self.pool.message_received(self, message)
+        self.pool.worker_exited(self)
+
+    def stop(self) -> None:
+        """Ask the worker to quit, it is killed from a thread if it hasn't within 5 seconds."""
+        try:
+            self.send({"quit": True})
+            self.process.stdin.close()  # type: ignore
+        except (OSError, ValueError):
+            self.process.kill()
+            return
+        threading.Thread(target=self._wait_or_kill, daemon=True).start()
+
+    def terminate(self) -> None:
+        """Stop the worker now even if it is running a job, without waiting for it."""
+        try:
+            self.process.terminate()
+        except OSError:
+            return
+        threading.Thread(target=self._wait_or_kill, daemon=True).start()
+
+    def _wait_or_kill(self) -> None:
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class WorkerPool(QObject):
+    """Schedules jobs over a number of WorkerProcesses.
+
+    Signals are emitted from the reader threads so are queued to the GUI thread.
+    """
+
+    # job id, stream name (stdout / stderr), text
+    output = Signal(int, str, str)
+    # job id, the finished message (result, error, wall)
+    job_finished = Signal(int, dict)
+
+    def __init__(
+        self,
+        interpreter: str = "",
+        size: int = 2,
+        parent=None,
+        max_failed_starts: int = 3,
+    ):
+        """
+        Parameters :
+        interpreter (str) : mayapy or python used to run the workers, found if not given
+        size (int) : number of worker processes
+        parent (QObject) : parent object
+        max_failed_starts (int) : workers which exit before they are ready this many times in
+        a row stop the pool starting any more
+        """
+        super().__init__(parent)
+        self.interpreter = interpreter or default_interpreter()
+        self.size = size
+        self.max_failed_starts = max_failed_starts
+        self.workers: List[WorkerProcess] = []
+        self.jobs: Deque[dict] = deque()
+        self.job_names: Dict[int, str] = {}
+        # workers which couldn't be started or exited before they were ready, in a row
+        self.failed_starts = 0
+        self.start_error = ""
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._shutting_down = False
+
+    def can_start(self) -> bool:
+        return not self._shutting_down and self.failed_starts < self.max_failed_starts
+
+    def start(self) -> None:
+        """Start the workers now so they are warm before the first job."""
+        with self._lock:
+            while len(self.workers) < self.size and self.can_start():
+                try:
+                    self.workers.append(WorkerProcess(self, self.interpreter))
+                except OSError as error:
+                    # interpreter missing or not executable, retrying won't help
+                    self.failed_starts = self.max_failed_starts
+                    self.start_error = f"can't start {self.interpreter} : {error}"
+
+    def submit(self, source: str, filename: str, scene: str = "") -> int:
+        """Queue a script to run in the next free worker.
+
+        Parameters :
+        source (str) : the code to run
+        filename (str) : used for tracebacks and output
+        scene (str) : optional Maya scene the worker opens before running the script
+        Returns : the job id, job_finished is never emitted for it before submit returns
+        """
+        self.start()
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+            self.job_names[job_id] = filename
+            can_run = bool(self.workers)
+            if can_run:
+                job = {"id": job_id, "source": source, "filename": filename}
+                if scene:
+                    job["scene"] = scene
+                self.jobs.append(job)
+        if can_run:
+            self._dispatch()
+        else:
+            # fail from the event loop so the caller has the job id before job_finished
+            error = self.start_error or "no worker processes"
+            QTimer.singleShot(0, lambda: self.fail_job(job_id, error))
+        return job_id
+
+    def fail_job(self, job_id: int, error: str) -> None:
+        self.job_finished.emit(job_id, {"id": job_id, "error": error, "wall": 0.0})
+
+    def pending(self) -> int:
+        return len(self.jobs)
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            for worker in self.workers:
+                if not self.jobs:
+                    return
+                if worker.ready and worker.job_id is None:
+                    job = self.jobs.popleft()
+                    worker.job_id = job["id"]
+                    worker.send(job)
+
+    def message_received(self, worker: WorkerProcess, message: dict) -> None:
+        """Called from the worker reader thread for every message."""
+        if message.get("ready"):
+            worker.ready = True
+            self.failed_starts = 0
+        elif message.get("done"):
+            job_id = message["id"]
+            worker.job_id = None
+            self.job_finished.emit(job_id, message)
+        elif "stream" in message:
+            self.output.emit(message["id"] or 0, message["stream"], message["text"])
+        self._dispatch()
+
+    def worker_exited(self, worker: WorkerProcess) -> None:
+        """Fail the job of a worker which died and start a replacement.
+
+        Workers which keep exiting before they are ready (a broken interpreter or startup
+        script) aren't replaced after max_failed_starts, the waiting jobs are failed instead.
+        """
+        with self._lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            if not worker.ready and not self._shutting_down:
+                self.failed_starts += 1
+                self.start_error = "worker process exited on startup"
+        if worker.job_id is not None:
+            self.fail_job(worker.job_id, "worker process exited")
+        self.start()
+        with self._lock:
+            jobs = [] if self.workers else list(self.jobs)
+            if not self.workers:
+                self.jobs.clear()
+        for job in jobs:
+            self.fail_job(job["id"], self.start_error or "no worker processes")
+
+    def shutdown(self, terminate: bool = False) -> None:
+        """Stop the workers without waiting for them to exit.
+
+        Parameters :
+        terminate (bool) : stop the workers straight away rather than after their current job,
+        the jobs they were running are failed by worker_exited
+        """
+        self._shutting_down = True
+        with self._lock:
+            workers = list(self.workers)
+            self.workers.clear()
+            self.jobs.clear()
+        for worker in workers:
+            if terminate:
+                worker.terminate()
+            else:
+                worker.stop()
@@ -0,0 +1,15 @@
+"""Make the MayaEditorCore modules importable without Maya.
+
+The package __init__ imports the editor UI which needs maya and PySide2, so an empty package is
+registered instead and the pure python modules are imported from it directly.
+"""
+import sys
+import types
+from pathlib import Path
+
+_package_path = Path(__file__).resolve().parent.parent / "plug-ins" / "MayaEditorCore"
+
+if "MayaEditorCore" not in sys.modules:
+    package = types.ModuleType("MayaEditorCore")
+    package.__path__ = [str(_package_path)]
+    sys.modules["MayaEditorCore"] = package
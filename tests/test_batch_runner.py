@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+QtWidgets = pytest.importorskip("PySide2.QtWidgets")
+pytest.importorskip("maya.cmds")
+
+from MayaEditorCore.BatchRunner import BatchJournal, BatchRunner
+from MayaEditorCore.ExecutionTimer import source_hash
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+if not isinstance(app, QtWidgets.QApplication):
+    pytest.skip("a QCoreApplication already exists", allow_module_level=True)
+
+source = "result = scene_file\n"
+
+
+class Settings:
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def value(self, key, default=None, type=None):
+        return self.interpreter
+
+
+def make_runner(tmp_path, interpreter):
+    editor = SimpleNamespace(
+        toPlainText=lambda: source.rstrip("\n"), filename=str(tmp_path / "job.py")
+    )
+    tab = SimpleNamespace(count=lambda: 0, widget=lambda index: editor)
+    dialog = SimpleNamespace(
+        ui=SimpleNamespace(editor_tab=tab), settings=Settings(interpreter)
+    )
+    runner = BatchRunner(dialog)
+    runner.script_tab.addItem("job.py", 0)
+    runner.journal_name.setText(str(tmp_path / "journal.jsonl"))
+    return runner
+
+
+def wait_for(condition, timeout=10.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            return False
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.01)
+    return True
+
+
+def status(runner, row):
+    return runner.table.item(row, 1).text()
+
+
+def test_missing_interpreter_fails_the_rows(tmp_path):
+    runner = make_runner(tmp_path, str(tmp_path / "no_such_mayapy"))
+    runner.add_scene("a.ma")
+    runner.add_scene("b.ma")
+    runner.run()
+    assert wait_for(lambda: runner.run_button.isEnabled())
+    assert [status(runner, row) for row in range(2)] == ["failed", "failed"]
+    assert not runner.stop_button.isEnabled()
+    assert "can't start" in runner.table.item(0, 3).text()
+
+
+def test_journal_only_skips_scenes_done_by_the_same_script(tmp_path):
+    journal = BatchJournal(str(tmp_path / "journal.jsonl"))
+    for scene, script_hash in (("a.ma", source_hash(source)), ("b.ma", "other")):
+        journal.append(
+            {
+                "scene": scene,
+                "source_hash": script_hash,
+                "status": "ok",
+                "wall": 1.0,
+                "result": "done",
+            }
+        )
+    runner = make_runner(tmp_path, str(tmp_path / "no_such_mayapy"))
+    runner.add_scene("a.ma")
+    runner.add_scene("b.ma")
+    runner.run()
+    assert wait_for(lambda: runner.run_button.isEnabled())
+    assert status(runner, 0) == "ok (journal)"
+    assert status(runner, 1) == "failed"
+    entries = [json.loads(line) for line in open(journal.filename)]
+    assert entries[-1]["scene"] == "b.ma"
+    assert entries[-1]["source_hash"] == source_hash(source)
+
+
+def test_journal_skips_a_partly_written_line(tmp_path):
+    journal = BatchJournal(str(tmp_path / "journal.jsonl"))
+    journal.append({"scene": "a.ma", "source_hash": "1", "status": "ok"})
+    with open(journal.filename, "a") as journal_file:
+        journal_file.write('{"scene": "b.ma", "sta')
+    journal = BatchJournal(journal.filename)
+    assert list(journal.load()) == [("a.ma", "1")]
+    journal.append({"scene": "c.ma", "source_hash": "1", "status": "ok"})
+    assert list(journal.load()) == [("a.ma", "1"), ("c.ma", "1")]
@@ -0,0 +1,97 @@
+from MayaEditorCore.CodeCells import (
+    CellCache,
+    cell_at_line,
+    cell_key,
+    cell_name,
+    split_cells,
+)
+from MayaEditorCore.ExecutionTimer import ExecutionTimer
+
+source = """import math
+# %% setup
+x = 1
+
+# %% compute
+y = x + 1
+"""
+
+
+def run_record(cell, error=False):
+    with ExecutionTimer("a.py", "python", cell.source, mode="cell") as timer:
+        if error:
+            timer.set_error()
+    return timer.record
+
+
+def test_split_cells():
+    cells = split_cells(source, "# %%")
+    assert [cell.title for cell in cells] == ["", "setup", "compute"]
+    assert [(cell.first_line, cell.last_line) for cell in cells] == [
+        (1, 1),
+        (2, 4),
+        (5, 7),
+    ]
+    assert cells[1].source == "# %% setup\nx = 1\n"
+    assert [cell.index for cell in cells] == [0, 1, 2]
+
+
+def test_split_cells_blank_before_first_marker():
+    cells = split_cells("\n\n// %% first\nprint 1;\n", "// %%")
+    assert len(cells) == 1
+    assert cells[0].title == "first"
+    assert cells[0].first_line == 3
+
+
+def test_split_cells_no_markers():
+    cells = split_cells("x = 1\ny = 2", "# %%")
+    assert len(cells) == 1
+    assert cells[0].source == "x = 1\ny = 2\n"
+
+
+def test_cell_at_line_and_name():
+    cells = split_cells(source, "# %%")
+    assert cell_at_line(cells, 3).title == "setup"
+    assert cell_at_line(cells, 100).title == "compute"
+    assert cell_at_line([], 1) is None
+    assert cell_name(cells[1]) == "cell 2 'setup'"
+    assert cell_name(cells[0]) == "cell 1"
+
+
+def test_cache_changed_and_error():
+    cache = CellCache()
+    cell = split_cells(source, "# %%")[1]
+    assert cache.is_changed(cell)
+    cache.store(cell, run_record(cell), "1")
+    assert not cache.is_changed(cell)
+    assert "unchanged, skipped" in cache.skipped_message(cell)
+    cache.store(cell, run_record(cell, error=True), "")
+    assert cache.is_changed(cell)
+
+
+def test_cache_edit_invalidates():
+    cache = CellCache()
+    cell = split_cells(source, "# %%")[1]
+    cache.store(cell, run_record(cell), "")
+    edited = split_cells(source.replace("x = 1", "x = 2"), "# %%")[1]
+    assert cache.is_changed(edited)
+
+
+def test_cache_survives_cells_moving():
+    cache = CellCache()
+    cells = split_cells(source, "# %%")
+    for cell in cells:
+        cache.store(cell, run_record(cell), "")
+    # a new cell inserted after the first moves the later cells down one index
+    moved = split_cells(
+        source.replace("# %% setup", "# %% new\nz = 0\n# %% setup"), "# %%"
+    )
+    assert [cache.is_changed(cell) for cell in moved] == [False, True, False, False]
+
+
+def test_cache_prune():
+    cache = CellCache()
+    cells = split_cells(source, "# %%")
+    for cell in cells:
+        cache.store(cell, run_record(cell), "")
+    cache.prune(cells[1:])
+    assert set(cache.results) == {cell_key(cell) for cell in cells[1:]}
@@ -0,0 +1,32 @@
+import traceback
+
+import pytest
+
+pytest.importorskip("maya.utils")
+
+from MayaEditorCore.CodeRunner import CodeCache, compile_source, run_code
+
+
+def test_expression_returns_value():
+    assert run_code(compile_source("1 + 2", "editor.py")) == 3
+    assert run_code(compile_source("value = 1", "editor.py")) is None
+
+
+def test_selection_keeps_editor_line_numbers():
+    code = compile_source("a = 1\nraise ValueError('selection')", "editor.py", 10)
+    with pytest.raises(ValueError) as error:
+        run_code(code)
+    frame = traceback.extract_tb(error.tb)[-1]
+    assert (frame.filename, frame.lineno) == ("editor.py", 11)
+
+
+def test_code_cache_hits_and_size():
+    cache = CodeCache(max_size=2)
+    first = cache.get("x = 1", "editor.py")
+    assert cache.get("x = 1", "editor.py") is first
+    # the same source starting on another line is compiled again
+    assert cache.get("x = 1", "editor.py", 5) is not first
+    cache.get("x = 2", "editor.py")
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(cache.code_objects) == 2
+    assert cache.get("x = 1", "editor.py") is not first
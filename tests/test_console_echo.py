@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+QtWidgets = pytest.importorskip("PySide2.QtWidgets")
+pytest.importorskip("maya.utils")
+
+from MayaEditorCore.PythonTextEdit import PythonTextEdit
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+if not isinstance(app, QtWidgets.QApplication):
+    pytest.skip("a QCoreApplication already exists", allow_module_level=True)
+
+
+def run_cells(*cells):
+    editor = PythonTextEdit(read_only=False, filename="live.py", live=True)
+    editor.set_console_mode(True)
+    output = []
+    editor.update_output.connect(output.append)
+    editor.update_output_html.connect(output.append)
+    for cell in cells:
+        editor.run_console_source(editor.console, cell, 1)
+    return output
+
+
+def test_values_are_echoed_with_repr():
+    assert run_cells("'text'", "console_value = 1", "[1, 2]") == [
+        "'text'\n",
+        "[1, 2]\n",
+    ]
+
+
+def test_echo_is_capped():
+    (echo,) = run_cells("[[0] * 40] * 40")
+    assert len(echo) < 4100 and echo.endswith("...\n")
+
+
+def test_large_values_link_to_the_viewer():
+    (link,) = run_cells("list(range(1000))")
+    assert link.startswith('<a href="result:')
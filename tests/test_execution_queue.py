@@ -0,0 +1,64 @@
+import pytest
+
+QtCore = pytest.importorskip("PySide2.QtCore")
+
+from MayaEditorCore.ExecutionQueue import ExecutionQueue
+
+app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def run_all(queue):
+    while queue.pending:
+        queue.run_next()
+
+
+def test_identical_pending_runs_are_queued_once():
+    queue = ExecutionQueue()
+    ran = []
+    first = queue.submit("a.py", ("a.py", "normal", "1"), lambda: ran.append(1))
+    assert queue.submit("a.py", ("a.py", "normal", "1"), lambda: ran.append(2)) == first
+    queue.submit("a.py", ("a.py", "profile", "1"), lambda: ran.append(3))
+    queue.submit("b.py", ("b.py", "normal", "1"), lambda: ran.append(4))
+    run_all(queue)
+    assert ran == [1, 3, 4]
+    assert [job.state for job in queue.jobs()] == ["done", "done", "done"]
+
+
+def test_finished_runs_can_be_queued_again():
+    queue = ExecutionQueue()
+    ran = []
+    queue.submit("a.py", ("a.py", "normal", "1"), lambda: ran.append(1))
+    run_all(queue)
+    queue.submit("a.py", ("a.py", "normal", "1"), lambda: ran.append(2))
+    run_all(queue)
+    assert ran == [1, 2]
+
+
+def test_job_started_while_running_waits():
+    queue = ExecutionQueue()
+    ran = []
+
+    def first():
+        queue.submit("b.py", ("b.py", "normal", "1"), lambda: ran.append("second"))
+        # processing events inside a job must not start the next one
+        queue.run_next()
+        ran.append("first")
+
+    queue.submit("a.py", ("a.py", "normal", "1"), first)
+    run_all(queue)
+    assert ran == ["first", "second"]
+
+
+def test_error_state_and_cancel():
+    queue = ExecutionQueue()
+
+    def fail():
+        raise RuntimeError("failed")
+
+    queue.submit("a.py", ("a.py", "normal", "1"), fail)
+    queue.submit("b.py", ("b.py", "normal", "1"), lambda: None)
+    with pytest.raises(RuntimeError):
+        queue.run_next()
+    assert queue.jobs()[0].state == "error"
+    queue.cancel_pending()
+    assert [job.state for job in queue.jobs()] == ["error"]
@@ -0,0 +1,26 @@
+import pytest
+
+from MayaEditorCore.ExecutionTimer import ExecutionTimer, source_hash
+
+
+def test_record():
+    with ExecutionTimer("a.py", "python", "x = 1", mode="fast") as timer:
+        timer.set_result([1, 2, 3])
+    record = timer.record
+    assert (record.name, record.language, record.mode) == ("a.py", "python", "fast")
+    assert record.source_hash == source_hash("x = 1")
+    assert not record.error
+    assert timer.result_summary == "[1, 2, 3]"
+
+
+def test_exception_marks_error():
+    with pytest.raises(ValueError):
+        with ExecutionTimer("a.py", "python", "raise ValueError") as timer:
+            raise ValueError
+    assert timer.record.error
+
+
+def test_set_error():
+    with ExecutionTimer("a.py", "python", "1 / 0") as timer:
+        timer.set_error()
+    assert timer.record.error
@@ -0,0 +1,93 @@
+import ctypes
+import sys
+import time
+
+import pytest
+
+from MayaEditorCore import ExecutionWatchdog as watchdog_module
+from MayaEditorCore.ExecutionWatchdog import ExecutionWatchdog, watchdog_settings
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_auto_interrupt_stops_the_run():
+    reports = []
+    settings = watchdog_settings(True, 5, 0.2, True)
+    with pytest.raises(KeyboardInterrupt):
+        with ExecutionWatchdog(settings, reports.append) as watchdog:
+            busy(5.0)
+    assert watchdog.interrupted
+    assert ExecutionWatchdog.active is None
+    assert "(interrupted)" in reports[0]
+
+
+def test_no_interrupt_without_auto_interrupt():
+    reports = []
+    settings = watchdog_settings(True, 5, 0.1, False)
+    with ExecutionWatchdog(settings, reports.append) as watchdog:
+        busy(0.3)
+    assert not watchdog.interrupted
+    assert watchdog.sample_count > 0
+
+
+def test_interrupt_after_exit_is_ignored():
+    settings = watchdog_settings(True, 5, 30, False)
+    with ExecutionWatchdog(settings, lambda text: None) as watchdog:
+        pass
+    watchdog.interrupt()
+    assert not watchdog.interrupted
+    assert not ExecutionWatchdog.interrupt_active()
+
+
+def prompt_answering(tmp_path, monkeypatch, source):
+    script = tmp_path / "prompt.py"
+    script.write_text(source)
+    monkeypatch.setattr(watchdog_module, "prompt_script", str(script))
+    return watchdog_settings(True, 5, 0.1, False, sys.executable)
+
+
+def test_prompt_can_interrupt(tmp_path, monkeypatch):
+    settings = prompt_answering(tmp_path, monkeypatch, "raise SystemExit(0)\n")
+    with pytest.raises(KeyboardInterrupt):
+        with ExecutionWatchdog(settings, lambda text: None) as watchdog:
+            busy(10.0)
+    assert watchdog.interrupted
+
+
+def test_prompt_can_keep_waiting(tmp_path, monkeypatch):
+    settings = prompt_answering(tmp_path, monkeypatch, "raise SystemExit(1)\n")
+    with ExecutionWatchdog(settings, lambda text: None) as watchdog:
+        busy(0.6)
+    assert not watchdog.interrupted
+
+
+def test_prompt_is_closed_when_the_run_finishes(tmp_path, monkeypatch):
+    settings = prompt_answering(tmp_path, monkeypatch, "import time\ntime.sleep(30)\n")
+    started = time.perf_counter()
+    with ExecutionWatchdog(settings, lambda text: None) as watchdog:
+        busy(0.4)
+    assert time.perf_counter() - started < 5.0
+    assert not watchdog.interrupted
+
+
+def test_pending_interrupt_is_cancelled_after_another_error(monkeypatch):
+    calls = []
+
+    class PythonApi:
+        @staticmethod
+        def PyThreadState_SetAsyncExc(thread_id, exception):
+            calls.append(exception)
+            return 1
+
+    # record the interrupt rather than raise it, as if the run was stuck in C code
+    monkeypatch.setattr(ctypes, "pythonapi", PythonApi)
+    settings = watchdog_settings(True, 5, 30, False)
+    with pytest.raises(ValueError):
+        with ExecutionWatchdog(settings, lambda text: None) as watchdog:
+            watchdog.interrupt()
+            raise ValueError("raised before the interrupt")
+    assert calls[-1] is None
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("maya.cmds")
+
+from MayaEditorCore import HeadlessRunner
+from MayaEditorCore.RunModes import fast_modes
+
+
+def test_run_modes_include_the_fast_modes():
+    assert set(fast_modes) <= set(HeadlessRunner.run_modes)
+    assert HeadlessRunner.run_modes[0] == "normal"
+
+
+def test_scene_error_is_reported(tmp_path, monkeypatch):
+    script = tmp_path / "job.py"
+    script.write_text("value = 1\n")
+
+    def fail_open(*args, **kwargs):
+        raise RuntimeError("scene.ma can't be opened")
+
+    monkeypatch.setattr(HeadlessRunner.cmds, "file", fail_open)
+    report = HeadlessRunner.run_files([str(script)], scene="scene.ma")
+    assert "scene.ma can't be opened" in report["scene_error"]
+    assert [result["file"] for result in report["results"]] == [str(script)]
+    assert report["errors"] == 1
+    report = HeadlessRunner.run_files(
+        [str(script)], scene="scene.ma", stop_on_error=True
+    )
+    assert report["results"] == [] and report["errors"] == 1
@@ -0,0 +1,94 @@
+import threading
+
+from MayaEditorCore.ExecutionTimer import ExecutionTimer
+from MayaEditorCore.HistoryStore import HistoryStore, trigrams
+
+
+def add_run(store, name, source, result=""):
+    timer = ExecutionTimer(name, "python", source)
+    with timer:
+        pass
+    store.add(timer.record, source, result)
+
+
+def test_trigrams():
+    assert trigrams("AbCd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_search_matches_source_substring(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "a.py", "import maya.cmds as cmds\ncmds.polyCube()")
+    add_run(store, "b.py", "print('hello world')")
+    assert [entry.name for entry in store.search("polycube")] == ["a.py"]
+    assert [entry.name for entry in store.search("HELLO")] == ["b.py"]
+    assert store.search("not in any source") == []
+
+
+def test_search_trigrams_without_substring(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    # every trigram of "abcd" is in the source but "abcd" isn't
+    add_run(store, "a.py", "abc bcd")
+    assert store.search("abcd") == []
+
+
+def test_search_short_text_and_order(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "first.py", "x = 1")
+    add_run(store, "second.py", "y = 2")
+    add_run(store, "third.py", "x = 3")
+    assert [entry.name for entry in store.search("x")] == ["third.py", "first.py"]
+    assert [entry.name for entry in store.search()] == [
+        "third.py",
+        "second.py",
+        "first.py",
+    ]
+    assert len(store.search(limit=2)) == 2
+
+
+def test_search_name_and_result(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "rigging.py", "pass", result="joint1")
+    assert [entry.name for entry in store.search("rigging")] == ["rigging.py"]
+    assert [entry.name for entry in store.search("joint")] == ["rigging.py"]
+
+
+def test_reload_from_disk(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "a.py", "value = 42")
+    add_run(store, "a.py", "value = 42")
+    reopened = HistoryStore(str(tmp_path))
+    assert len(reopened.entries) == 2
+    assert len(reopened.offsets) == 1
+    assert [entry.name for entry in reopened.search("value = 42")] == ["a.py", "a.py"]
+
+
+def test_search_while_adding(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "seed.py", "counter = 0")
+
+    def add_runs():
+        for count in range(200):
+            add_run(store, f"run{count}.py", f"counter = {count}")
+
+    thread = threading.Thread(target=add_runs)
+    thread.start()
+    while thread.is_alive():
+        store.search("counter")
+    thread.join()
+    assert len(store.search("counter", limit=1000)) == 201
+
+
+def test_add_after_a_partly_written_line(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "a.py", "x = 1")
+    # a crash while writing leaves the last line of each file without a newline
+    for path in (store.sources_file, store.runs_file):
+        with open(path, "a") as broken:
+            broken.write('{"hash": "broken", "sour')
+    store = HistoryStore(str(tmp_path))
+    add_run(store, "b.py", "y = 2")
+    store = HistoryStore(str(tmp_path))
+    assert [entry.name for entry in store.entries] == ["a.py", "b.py"]
+    assert store.source(store.entries[1].source_hash) == "y = 2"
+    assert [entry.name for entry in store.search("y = 2")] == ["b.py"]
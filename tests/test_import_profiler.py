@@ -0,0 +1,53 @@
+import builtins
+import sys
+
+from MayaEditorCore.ImportProfiler import ImportProfiler
+
+
+def write_modules(tmp_path, monkeypatch):
+    (tmp_path / "profiled_child.py").write_text("import time\ntime.sleep(0.02)\n")
+    (tmp_path / "profiled_parent.py").write_text(
+        "import time\nimport profiled_child\ntime.sleep(0.02)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("profiled_parent", "profiled_child"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+def test_import_tree_and_self_time(tmp_path, monkeypatch):
+    write_modules(tmp_path, monkeypatch)
+    results = []
+    with ImportProfiler(results.extend, min_cached_time=1.0):
+        import profiled_parent  # noqa: F401
+    assert [data.name for data in results] == ["profiled_parent"]
+    parent = results[0]
+    assert parent.first_import and parent.new_modules == 2
+    # the cached import of time is quicker than min_cached_time so left out
+    assert [data.name for data in parent.children] == ["profiled_child"]
+    child = parent.children[0]
+    assert child.first_import and child.new_modules == 1
+    assert child.cumulative >= 0.02
+    assert parent.cumulative >= child.cumulative + 0.02
+    assert abs(parent.self_time - (parent.cumulative - child.cumulative)) < 1e-9
+
+
+def test_cached_import_is_not_new(tmp_path, monkeypatch):
+    write_modules(tmp_path, monkeypatch)
+    import profiled_parent  # noqa: F401
+
+    results = []
+    with ImportProfiler(results.extend, min_cached_time=0.0):
+        import profiled_parent  # noqa: F401,F811
+    assert len(results) == 1
+    assert not results[0].first_import and results[0].new_modules == 0
+
+
+def test_import_restored_and_report(tmp_path, monkeypatch):
+    write_modules(tmp_path, monkeypatch)
+    original = builtins.__import__
+    reports = []
+    with ImportProfiler(report=reports.append):
+        import profiled_parent  # noqa: F401,F811
+    assert builtins.__import__ is original
+    assert reports[0].startswith("import profile : ")
+    assert "2 modules loaded for the first time" in reports[0]
@@ -0,0 +1,33 @@
+import threading
+
+from MayaEditorCore.LineBuffer import LineBuffer
+
+
+def test_only_complete_lines_are_taken():
+    buffer = LineBuffer()
+    assert not buffer.write("par")
+    assert buffer.take() == ""
+    assert buffer.write("tial\nnext")
+    assert buffer.take() == "partial\n"
+    buffer.flush()
+    assert buffer.take() == "next"
+    buffer.flush()
+    assert buffer.take() == ""
+
+
+def test_writes_from_threads_are_not_lost():
+    buffer = LineBuffer()
+
+    def writer(name):
+        for count in range(200):
+            for char in f"{name} {count}\n":
+                buffer.write(char)
+
+    threads = [threading.Thread(target=writer, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    text = buffer.take()
+    assert text.count("\n") == 400
+    assert len(text) == 2 * sum(len(f"a {count}\n") for count in range(200))
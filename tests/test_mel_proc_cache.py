@@ -0,0 +1,65 @@
+from MayaEditorCore.MelProcCache import MelProcCache, split_procs
+
+source = """// proc in a comment { not a proc }
+global proc string first(string $name)
+{
+    if ($name == "}") { return "brace"; }
+    return $name;
+}
+print "proc second() {";
+proc int second()
+{
+    /* } */
+    return 2;
+}
+print(first("x"));
+"""
+
+
+def test_split_procs_finds_top_level_procs():
+    procs, statements = split_procs(source)
+    assert [proc.name for proc in procs] == ["first", "second"]
+    assert procs[0].source.startswith("global proc string first")
+    assert procs[0].source.endswith("return $name;\n}")
+    assert source[procs[1].start : procs[1].end] == procs[1].source
+
+
+def test_split_procs_keeps_line_numbers():
+    procs, statements = split_procs(source)
+    assert statements.count("\n") == source.count("\n")
+    lines = statements.splitlines()
+    for line in ('print "proc second() {";', 'print(first("x"));'):
+        assert lines.index(line) == source.splitlines().index(line)
+    assert "return" not in statements
+
+
+def test_unchanged_procs_are_skipped():
+    cache = MelProcCache()
+    evaluated = []
+    value, report = cache.run(source, lambda text: evaluated.append(text) or 1)
+    assert (report.sourced, report.skipped) == (2, 0)
+    assert len(evaluated) == 3 and value == 1
+    evaluated.clear()
+    changed = source.replace("return 2;", "return 3;")
+    value, report = cache.run(changed, evaluated.append)
+    assert (report.sourced, report.skipped) == (1, 1)
+    assert evaluated[0].startswith("proc int second") and "return 3;" in evaluated[0]
+
+
+def test_failed_proc_is_sourced_again():
+    cache = MelProcCache()
+
+    def fail(text):
+        if text.startswith("proc int second"):
+            raise RuntimeError("syntax error")
+
+    try:
+        cache.run(source, fail)
+    except RuntimeError:
+        pass
+    assert "first" in cache.hashes and "second" not in cache.hashes
+    _, report = cache.run(source, lambda text: None)
+    assert (report.sourced, report.skipped) == (1, 1)
+    cache.clear()
+    _, report = cache.run(source, lambda text: None)
+    assert report.sourced == 2
@@ -0,0 +1,136 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+from MayaEditorCore.ModuleReloader import ModuleReloader, format_report
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """A folder on sys.path, yields a function which writes a module into it."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    written = []
+
+    def write(name, source, age=0):
+        path = tmp_path / f"{name}.py"
+        path.write_text(source)
+        # step the mtime so edits are seen whatever the file system resolution
+        mtime = 1_600_000_000 + age
+        os.utime(path, (mtime, mtime))
+        importlib.invalidate_caches()
+        written.append(name)
+        return path
+
+    yield tmp_path, write
+    for name in written:
+        sys.modules.pop(name, None)
+
+
+def test_edit_after_first_import_with_snapshot(package, monkeypatch):
+    folder, write = package
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    write("reload_first", "X = 1\n")
+    reloader = ModuleReloader()
+    reloader.set_roots([str(folder)])
+    # run 1 imports the module, the editor snapshots after the run
+    module = importlib.import_module("reload_first")
+    reloader.snapshot()
+    write("reload_first", "X = 2\n", age=10)
+    report = reloader.reload_changed()
+    assert report.modules == ["reload_first"]
+    assert module.X == 2
+    assert reloader.reload_changed() is None
+
+
+def test_edit_after_first_import_without_snapshot(package, monkeypatch):
+    folder, write = package
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    write("reload_pyc", "X = 1\n")
+    # the .pyc written by the import records the source mtime it was compiled from
+    module = importlib.import_module("reload_pyc")
+    write("reload_pyc", "X = 2\n", age=10)
+    reloader = ModuleReloader()
+    reloader.set_roots([str(folder)])
+    report = reloader.reload_changed()
+    assert report is not None and report.modules == ["reload_pyc"]
+    assert module.X == 2
+
+
+def test_unchanged_modules_are_not_reloaded(package):
+    folder, write = package
+    write("reload_same", "X = 1\n")
+    importlib.import_module("reload_same")
+    reloader = ModuleReloader()
+    reloader.set_roots([str(folder)])
+    assert reloader.reload_changed() is None
+    reloader.snapshot()
+    assert reloader.reload_changed() is None
+
+
+def test_dependents_reload_after_dependency(package):
+    folder, write = package
+    write("reload_base", "VALUE = 1\n")
+    write("reload_user", "import reload_base\nVALUE = reload_base.VALUE\n")
+    user = importlib.import_module("reload_user")
+    reloader = ModuleReloader()
+    reloader.set_roots([str(folder)])
+    reloader.snapshot()
+    write("reload_base", "VALUE = 2\n", age=10)
+    report = reloader.reload_changed()
+    assert report.modules == ["reload_base", "reload_user"]
+    assert user.VALUE == 2
+    assert "reloaded 2 modules" in format_report(report)
+
+
+def test_reload_error_is_reported(package):
+    folder, write = package
+    write("reload_broken", "X = 1\n")
+    importlib.import_module("reload_broken")
+    reloader = ModuleReloader()
+    reloader.set_roots([str(folder)])
+    reloader.snapshot()
+    write("reload_broken", "raise ValueError('broken')\n", age=10)
+    report = reloader.reload_changed()
+    assert report.modules == [] and "broken" in report.errors[0]
+    # not retried until it is edited again
+    assert reloader.reload_changed() is None
+
+
+def test_modules_outside_roots_are_ignored(package, tmp_path_factory):
+    _, write = package
+    write("reload_elsewhere", "X = 1\n")
+    importlib.import_module("reload_elsewhere")
+    reloader = ModuleReloader()
+    reloader.set_roots([str(tmp_path_factory.mktemp("other"))])
+    assert "reload_elsewhere" not in reloader.tracked_modules()
+
+
+def test_reload_order_dependencies_first():
+    graph = {"a": set(), "b": {"a"}, "c": {"b"}, "d": set()}
+    assert ModuleReloader.reload_order({"a"}, graph) == ["a", "b", "c"]
+    assert ModuleReloader.reload_order({"b"}, graph) == ["b", "c"]
+    assert ModuleReloader.reload_order({"d"}, graph) == ["d"]
+    assert ModuleReloader.reload_order(set(), graph) == []
+
+
+def test_reload_order_diamond():
+    graph = {
+        "base": set(),
+        "left": {"base"},
+        "right": {"base"},
+        "top": {"left", "right"},
+    }
+    assert ModuleReloader.reload_order({"base"}, graph) == [
+        "base",
+        "left",
+        "right",
+        "top",
+    ]
+
+
+def test_reload_order_cycle():
+    graph = {"a": {"b"}, "b": {"a"}, "c": {"a"}}
+    # the cycle can't be ordered so is reloaded in name order
+    assert ModuleReloader.reload_order({"a"}, graph) == ["a", "b", "c"]
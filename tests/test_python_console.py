@@ -0,0 +1,79 @@
+import __main__
+
+from MayaEditorCore.PythonConsole import ConsoleSession, console_cell, short_repr
+
+
+def make_session():
+    errors = []
+    return ConsoleSession(errors.append), errors
+
+
+def test_trailing_expression_value():
+    session, errors = make_session()
+    value, error = session.run_cell("console_x = 20\nconsole_x + 1\n", "<test>")
+    assert (value, error) == (21, False)
+    assert __main__.__dict__["_"] == 21
+    assert errors == []
+
+
+def test_error_is_reported_and_returned():
+    session, errors = make_session()
+    value, error = session.run_cell("console_y = 1\n1 / 0\n", "<test>", first_line=10)
+    assert (value, error) == (None, True)
+    # statements before the error have run
+    assert __main__.__dict__["console_y"] == 1
+    assert "ZeroDivisionError" in errors[0]
+    assert "line 11" in errors[0]
+
+
+def test_syntax_error():
+    session, errors = make_session()
+    assert session.run_cell("def (:\n", "<test>") == (None, True)
+    assert "SyntaxError" in errors[0]
+
+
+def test_future_flags_carry_over():
+    session, _ = make_session()
+    session.run_cell("from __future__ import annotations\n", "<test>")
+    session.run_cell("def console_f(a: undefined_name): pass\n", "<test>")
+    assert __main__.__dict__["console_f"].__annotations__ == {"a": "undefined_name"}
+
+
+def test_is_incomplete():
+    assert ConsoleSession.is_incomplete("def f():\n")
+    assert ConsoleSession.is_incomplete("x = (1,\n")
+    assert not ConsoleSession.is_incomplete("x = 1\n")
+
+
+def test_input_history():
+    session, _ = make_session()
+    for source in ("a = 1", "b = 2", "b = 2"):
+        session.run_cell(source, "<test>")
+    assert list(session.history) == ["a = 1", "b = 2"]
+    assert session.previous_input() == "b = 2"
+    assert session.previous_input() == "a = 1"
+    assert session.previous_input() is None
+    assert session.next_input() == "b = 2"
+    assert session.next_input() == ""
+
+
+def test_short_repr_keeps_quotes_and_caps_the_length():
+    assert short_repr("text") == "'text'"
+    assert len(short_repr(list(range(10000)))) < 1000
+    assert short_repr("x" * 10000, limit=100).endswith("...")
+    assert len(short_repr("x" * 10000, limit=100)) == 103
+
+
+def test_scrollback_records_cells_and_is_bounded():
+    errors = []
+    session = ConsoleSession(errors.append, history_size=2)
+    session.run_cell("'first'", "<test>")
+    session.run_cell("console_z = 1", "<test>")
+    session.run_cell("1 / 0", "<test>")
+    assert list(session.scrollback) == [
+        console_cell("console_z = 1", None, False),
+        console_cell("1 / 0", None, True),
+    ]
+    session.run_cell("['a'] * 100", "<test>")
+    assert session.scrollback[-1].result.startswith("['a', 'a'")
+    assert session.scrollback[-1].result.endswith("...]")
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+pytest.importorskip("PySide2.QtCore")
+
+from MayaEditorCore.CommandPortServer import CommandPortServer
+from MayaEditorCore.RemoteExecution import CommandPortConnection
+
+
+@pytest.fixture
+def server():
+    server = CommandPortServer(0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def connection(server):
+    connection = CommandPortConnection("localhost", server.server_address[1], 10.0)
+    yield connection
+    connection.close()
+
+
+def test_run_returns_result_and_output(connection):
+    reply = connection.run("print('hello')\n6 * 7\n", "job.py")
+    assert reply["error"] is None
+    assert reply["stdout"] == "hello\n"
+    assert reply["streamed"] is False
+    assert connection.has_runner
+    # the runner is already defined for the next request
+    reply = connection.run("6 * 7", "job.py")
+    assert reply["result"] == "42"
+
+
+def test_run_reports_errors(connection):
+    reply = connection.run("1 / 0", "job.py")
+    assert "ZeroDivisionError" in reply["error"]
+    reply = connection.run("print('still running')", "job.py")
+    assert reply["error"] is None
+    assert reply["stdout"] == "still running\n"
+
+
+def test_output_is_streamed_while_running(connection):
+    received = []
+    first_line = threading.Event()
+
+    def on_output(stream, text):
+        received.append((stream, text))
+        first_line.set()
+
+    # the first line has to arrive while the remote code is still sleeping
+    source = (
+        "import sys\n"
+        "print('started')\n"
+        "sys.stderr.write('warning\\n')\n"
+        "__import__('time').sleep(0.5)\n"
+        "print('done')\n"
+    )
+    runner = threading.Thread(
+        target=lambda: received.append(
+            ("reply", connection.run(source, "job.py", on_output=on_output))
+        )
+    )
+    runner.start()
+    assert first_line.wait(5.0)
+    assert not any(stream == "reply" for stream, _ in received)
+    runner.join(10.0)
+    reply = received.pop()[1]
+    assert reply["error"] is None
+    assert reply["streamed"] is True
+    assert reply["stdout"] == ""
+    stdout = "".join(text for stream, text in received if stream == "stdout")
+    stderr = "".join(text for stream, text in received if stream == "stderr")
+    assert stdout == "started\ndone\n"
+    assert stderr == "warning\n"
+
+
+def test_replies_stay_in_order(connection):
+    # two commands in one request give two replies, the second is kept for the next request
+    assert connection.request("1 + 1\n2 + 2") == "2"
+    assert connection.request("3 + 3") == "4"
+    assert connection.request("4 + 4") == "6"
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PySide2.QtCore")
+
+from MayaEditorCore.WorkerPool import WorkerPool
+
+app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def wait_for(condition, timeout=10.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            return False
+        QtCore.QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def pool():
+    # any python interpreter stands in for mayapy
+    pool = WorkerPool(sys.executable, 1)
+    pool.finished = {}
+    pool.lines = []
+    pool.job_finished.connect(
+        lambda job_id, message: pool.finished.__setitem__(job_id, message)
+    )
+    pool.output.connect(lambda job_id, stream, text: pool.lines.append((job_id, text)))
+    yield pool
+    pool.shutdown(terminate=True)
+
+
+def test_job_result_and_output(pool):
+    job_id = pool.submit("print('hello')\nresult = 6 * 7\n", "job.py")
+    assert wait_for(lambda: job_id in pool.finished)
+    message = pool.finished[job_id]
+    assert message["result"] == "42" and message["error"] is None
+    assert (job_id, "hello\n") in pool.lines
+
+
+def test_job_error_keeps_the_worker(pool):
+    failed = pool.submit("raise ValueError('bad job')\n", "job.py")
+    assert wait_for(lambda: failed in pool.finished)
+    assert "ValueError: bad job" in pool.finished[failed]["error"]
+    worker = pool.workers[0]
+    job_id = pool.submit("result = 1\n", "job.py")
+    assert wait_for(lambda: job_id in pool.finished)
+    assert pool.workers == [worker]
+
+
+def test_crashed_worker_is_replaced(pool):
+    crashed = pool.submit("import os\nos._exit(3)\n", "job.py")
+    assert wait_for(lambda: crashed in pool.finished)
+    assert pool.finished[crashed]["error"] == "worker process exited"
+    job_id = pool.submit("result = 'again'\n", "job.py")
+    assert wait_for(lambda: job_id in pool.finished)
+    assert pool.finished[job_id]["result"] == "'again'"
+
+
+def test_terminate_does_not_wait_for_the_job(pool):
+    job_id = pool.submit("import time\ntime.sleep(30)\n", "job.py")
+    assert wait_for(lambda: pool.workers and pool.workers[0].job_id == job_id)
+    process = pool.workers[0].process
+    started = time.perf_counter()
+    pool.shutdown(terminate=True)
+    assert time.perf_counter() - started < 1.0
+    assert wait_for(lambda: job_id in pool.finished)
+    assert pool.finished[job_id]["error"] == "worker process exited"
+    assert wait_for(lambda: process.poll() is not None)
+
+
+def test_stop_lets_idle_workers_quit(pool):
+    pool.start()
+    assert wait_for(lambda: pool.workers[0].ready)
+    process = pool.workers[0].process
+    pool.shutdown()
+    assert wait_for(lambda: process.poll() is not None)
+    assert process.returncode == 0
+
+
+def test_missing_interpreter_fails_the_job(tmp_path):
+    pool = WorkerPool(str(tmp_path / "no_such_mayapy"), 2)
+    finished = {}
+    pool.job_finished.connect(
+        lambda job_id, message: finished.__setitem__(job_id, message)
+    )
+    job_id = pool.submit("print('never runs')", "job.py")
+    # the caller must be able to record the job before it finishes
+    assert finished == {}
+    assert wait_for(lambda: job_id in finished)
+    assert "can't start" in finished[job_id]["error"]
+    assert not pool.workers and not pool.can_start()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a shell script interpreter")
+def test_workers_exiting_on_startup_are_not_respawned(tmp_path):
+    interpreter = tmp_path / "broken_mayapy"
+    interpreter.write_text("#!/bin/sh\nexit 1\n")
+    interpreter.chmod(0o755)
+    pool = WorkerPool(str(interpreter), 2, max_failed_starts=3)
+    finished = {}
+    pool.job_finished.connect(
+        lambda job_id, message: finished.__setitem__(job_id, message)
+    )
+    job_id = pool.submit("result = 1\n", "job.py")
+    assert wait_for(lambda: job_id in finished)
+    assert finished[job_id]["error"] == "worker process exited on startup"
+    assert wait_for(lambda: not pool.workers)
+    assert pool.failed_starts >= 3 and not pool.can_start()